@@ -0,0 +1,103 @@
+import pytest
+
+from batch_retrieval import BatchRetriever, chroma_where
+from embedding_engine import hashing_embedding
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from vector_store import NumpyVectorStore
+
+DOCUMENTS = {
+    'flow': 'Flow states arise when challenge matches skill',
+    'trust': 'Remote teams build trust through reliable rituals',
+    'both': 'Teams in flow trust each other',
+    'plan': 'Planning strengths keep projects on schedule',
+}
+
+
+class RecordingCollection:
+    """Passes calls through to a collection, keeping the arguments of each ``query``/``get``."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.queries = []
+        self.gets = []
+
+    def query(self, **kwargs):
+        self.queries.append(kwargs)
+        return self.collection.query(**kwargs)
+
+    def get(self, **kwargs):
+        self.gets.append(kwargs)
+        return self.collection.get(**kwargs)
+
+
+@pytest.fixture
+def collections(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    found = {}
+    for name in ('ast', 'teams'):
+        collection = store.get_or_create_collection(name)
+        collection.upsert(ids=list(DOCUMENTS), documents=list(DOCUMENTS.values()),
+                          metadatas=[{'content_type': 'team_dynamics' if 'team' in text.lower() else 'core'}
+                                     for text in DOCUMENTS.values()])
+        found[name] = RecordingCollection(collection)
+    return found
+
+
+def test_chroma_where_wraps_several_fields_in_and():
+    assert chroma_where(None) is None
+    assert chroma_where({'a': 1}) == {'a': 1}
+    assert chroma_where({'a': 1, 'b': 2}) == {'$and': [{'a': 1}, {'b': 2}]}
+
+
+def test_one_query_call_per_collection_with_deduplicated_texts(collections):
+    embedded = []
+
+    def embed(texts):
+        embedded.append(list(texts))
+        return [hashing_embedding(text) for text in texts]
+
+    with BatchRetriever(embed_queries=embed) as retriever:
+        results = retriever.search(collections, {
+            'ast': ['team trust', 'Team  Trust', 'flow skill'],
+            'teams': ['team trust']
+        }, n_results=2)
+
+    assert embedded == [['team trust', 'flow skill']]
+    assert [len(call['query_embeddings']) for call in collections['ast'].queries] == [2]
+    assert [len(call['query_embeddings']) for call in collections['teams'].queries] == [1]
+    assert results['ast']['Team  Trust'] == results['ast']['team trust']
+    assert results['ast']['flow skill'][0]['id'] == 'flow'
+    assert set(results['teams']) == {'team trust'}
+
+
+def test_where_filters_are_passed_to_the_collection(collections):
+    with BatchRetriever() as retriever:
+        results = retriever.search(collections, {'ast': ['team trust']}, n_results=4,
+                                   where={'content_type': 'team_dynamics'})
+
+    assert collections['ast'].queries[0]['where'] == {'content_type': 'team_dynamics'}
+    assert {match['id'] for match in results['ast']['team trust']} == {'trust', 'both'}
+
+
+def test_hybrid_search_fuses_vector_and_lexical_rankings(tmp_path, collections):
+    index = BM25Index(str(tmp_path / 'ast.npz'))
+    index.add([{'id': doc_id, 'title': '', 'content': text, 'metadata': {}} for doc_id, text in DOCUMENTS.items()])
+
+    with BatchRetriever(lexical_indexes={'ast': index}) as retriever:
+        matches = retriever.search(collections, {'ast': ['flow trust']}, n_results=2)['ast']['flow trust']
+
+    vector = collections['ast'].collection.query(query_texts=['flow trust'], n_results=8)['ids'][0]
+    lexical = [doc_id for doc_id, _ in index.search('flow trust', 8)]
+    expected = [doc_id for doc_id, _ in reciprocal_rank_fusion([vector, lexical])[:2]]
+    assert [match['id'] for match in matches] == expected
+    assert matches[0]['id'] == 'both'
+
+
+def test_close_shuts_down_the_thread_pool(collections):
+    retriever = BatchRetriever(max_workers=2)
+    retriever.search(collections, {'ast': ['flow']})
+    retriever.close()
+
+    assert retriever._executor._shutdown
+    with pytest.raises(RuntimeError):
+        retriever.search(collections, {'ast': ['flow']})
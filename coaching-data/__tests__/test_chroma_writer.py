@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from chroma_writer import ChromaBatchWriter, ChromaWriteError
+
+
+class FakeCollection:
+    """Rejects any upsert containing a bad ID; fails the first ``flaky`` calls outright."""
+
+    def __init__(self, bad_ids=(), flaky=0):
+        self.bad_ids = set(bad_ids)
+        self.flaky = flaky
+        self.calls = []
+        self.stored = {}
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        self.calls.append(list(ids))
+        if self.flaky:
+            self.flaky -= 1
+            raise ConnectionError("temporarily unavailable")
+        if self.bad_ids.intersection(ids):
+            raise ValueError("invalid record")
+        self.stored.update(zip(ids, documents))
+
+
+def upsert(writer, collection, count):
+    ids = [f'id-{i}' for i in range(count)]
+    return asyncio.run(writer.upsert(collection, 'test', ids, [f'doc {i}' for i in ids], [{} for _ in ids]))
+
+
+def test_split_respects_record_and_byte_limits():
+    writer = ChromaBatchWriter(max_records=3, max_bytes=100)
+    assert writer.split([10] * 7) == [range(0, 3), range(3, 6), range(6, 7)]
+    assert writer.split([60, 60, 30, 10]) == [range(0, 1), range(1, 4)]
+    # A record larger than the byte limit still gets a batch of its own
+    assert writer.split([500, 10]) == [range(0, 1), range(1, 2)]
+
+
+def test_transient_failures_are_retried():
+    writer = ChromaBatchWriter(max_records=10, max_retries=3, base_backoff=0)
+    collection = FakeCollection(flaky=2)
+    upsert(writer, collection, 5)
+    assert len(collection.stored) == 5
+    assert writer.stats['test']['retries'] == 2
+
+
+def test_a_bad_record_is_isolated_by_bisection():
+    writer = ChromaBatchWriter(max_records=8, max_retries=1, base_backoff=0)
+    collection = FakeCollection(bad_ids={'id-5'})
+    with pytest.raises(ChromaWriteError) as error:
+        upsert(writer, collection, 8)
+
+    assert error.value.failed_ids == ['id-5']
+    assert set(collection.stored) == {f'id-{i}' for i in range(8)} - {'id-5'}
+    assert writer.stats['test']['failed_ids'] == ['id-5']
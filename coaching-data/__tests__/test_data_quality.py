@@ -0,0 +1,71 @@
+import numpy as np
+
+from data_quality import DataQualityStage, MinHasher, lsh_bands, stable_content_hash
+
+BASE = ("Teams with a balance of thinking, acting, feeling and planning strengths reach flow more often "
+        "when roles are explicit, feedback is frequent and the work has clear goals that stretch everyone "
+        "slightly beyond their current skill level without tipping into anxiety or boredom.")
+
+
+def chunk(chunk_id, content):
+    return {'id': chunk_id, 'title': chunk_id, 'content': content, 'metadata': {'source_file': 'team.md'}}
+
+
+def test_lsh_bands_cover_every_permutation():
+    for num_perm, threshold in ((128, 0.85), (128, 0.5), (64, 0.9)):
+        bands, rows = lsh_bands(num_perm, threshold)
+        assert bands * rows == num_perm
+
+
+def test_batched_signatures_match_single_signatures():
+    hasher = MinHasher(num_perm=64)
+    texts = [BASE, BASE.upper(), "short", "", "another text entirely about remote trust"]
+    batched = hasher.signatures(texts)
+    assert batched.shape == (len(texts), 64)
+    for text, signature in zip(texts, batched):
+        assert np.array_equal(signature, hasher.signature(text))
+    assert hasher.signatures([]).shape == (0, 64)
+
+
+def test_signature_agreement_estimates_jaccard_similarity():
+    hasher = MinHasher()
+    near = BASE.replace("frequent", "regular")
+    similar = (hasher.signature(BASE) == hasher.signature(near)).mean()
+    different = (hasher.signature(BASE) == hasher.signature("Completely unrelated words about onboarding")).mean()
+    assert similar > 0.6
+    assert different < 0.1
+
+
+def test_stable_content_hash_normalizes_whitespace_only():
+    assert stable_content_hash("Flow  State\n") == stable_content_hash("Flow State")
+    assert stable_content_hash("Flow State") != stable_content_hash("flow state")
+
+
+def test_stage_finds_exact_and_near_duplicates_within_a_batch():
+    stage = DataQualityStage(drop_duplicates=False, threshold=0.7)
+    results = stage.add_many([
+        chunk('a', BASE),
+        chunk('b', BASE),
+        chunk('c', BASE.replace("frequent", "regular")),
+        chunk('d', "Remote teams build trust through small reliable rituals."),
+    ])
+
+    assert results[0] is None and results[3] is None
+    assert results[1]['exact'] and results[1]['duplicate_of'] == 'a'
+    assert not results[2]['exact'] and results[2]['duplicate_of'] == 'a'
+    assert [duplicate['id'] for duplicate in stage.duplicates] == ['b', 'c']
+
+
+def test_filter_drops_duplicates_across_batches():
+    chunks = [chunk(f'unique-{i}', f"{BASE} Variation number {i} adds words like {'x' * i}") for i in range(3)]
+    chunks += [chunk(f'filler-{i}', f"Distinct filler text {i} {i * 7} {i * 13}") for i in range(100)]
+    chunks.append(chunk('late-copy', BASE + " Variation number 0 adds words like "))
+
+    stage = DataQualityStage(drop_duplicates=True)
+    kept = [c['id'] for c in stage.filter(chunks)]
+
+    assert 'late-copy' not in kept
+    assert len(kept) == len(chunks) - stage.dropped
+    report = stage.report()['validation_results']
+    assert report['duplicates_dropped'] == stage.dropped
+    assert report['exact_duplicates'] + report['near_duplicates'] == report['duplicates']
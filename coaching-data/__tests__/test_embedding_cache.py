@@ -0,0 +1,74 @@
+from embedding_cache import EmbeddingCache, cache_key, normalize_text, open_embedding_cache
+
+MODEL = 'amazon.titan-embed-text-v2:0'
+
+
+def test_keys_follow_model_dimensions_and_normalized_text():
+    assert normalize_text("  Flow\n\tstate  ") == "Flow state"
+    assert cache_key(MODEL, 1024, "Flow  state") == cache_key(MODEL, 1024, "Flow state\n")
+    assert cache_key(MODEL, 1024, "Flow state") != cache_key(MODEL, 512, "Flow state")
+    assert cache_key(MODEL, 1024, "Flow state") != cache_key('other-model', 1024, "Flow state")
+
+
+def test_hits_and_misses(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / 'cache.sqlite'))
+    assert cache.get_many(MODEL, 4, ['a', 'b']) == [None, None]
+    cache.put_many(MODEL, 4, ['a'], [[0.5, 0.25, 0.0, -1.0]])
+
+    assert cache.get_many(MODEL, 4, ['a', 'b', 'a ']) == [[0.5, 0.25, 0.0, -1.0], None, [0.5, 0.25, 0.0, -1.0]]
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (2, 3, 1)
+    cache.close()
+
+
+def test_get_or_compute_only_computes_misses(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / 'cache.sqlite'))
+    computed = []
+
+    def compute(text):
+        computed.append(text)
+        return [1.0, 2.0]
+
+    assert cache.get_or_compute(MODEL, 2, 'text', compute) == [1.0, 2.0]
+    assert cache.get_or_compute(MODEL, 2, 'text', compute) == [1.0, 2.0]
+    assert computed == ['text']
+    cache.close()
+
+
+def test_entries_persist_across_reopen(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = EmbeddingCache(path)
+    cache.put_many(MODEL, 2, ['a', 'b'], [[1.0, 0.0], [0.0, 1.0]])
+    cache.put_many(MODEL, 2, ['a'], [[0.5, 0.5]])
+    size = cache.total_bytes
+    cache.close()
+
+    reopened = EmbeddingCache(path)
+    assert reopened.total_bytes == size == 16
+    assert reopened.get_many(MODEL, 2, ['a', 'b']) == [[0.5, 0.5], [0.0, 1.0]]
+    reopened.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    # Room for four 2-d float32 vectors; eviction goes down to 90% of that
+    cache = EmbeddingCache(str(tmp_path / 'cache.sqlite'), max_bytes=32)
+    for text in ('a', 'b', 'c', 'd'):
+        cache.put_many(MODEL, 2, [text], [[1.0, 1.0]])
+    cache.get_many(MODEL, 2, ['a'])
+    cache.put_many(MODEL, 2, ['e'], [[1.0, 1.0]])
+
+    present = [text for text, vector in zip('abcde', cache.get_many(MODEL, 2, list('abcde'))) if vector]
+    assert present == ['a', 'd', 'e']
+    assert cache.stats()['evictions'] == 2
+    assert cache.total_bytes == 24
+    cache.close()
+
+
+def test_cache_can_be_disabled(monkeypatch, tmp_path):
+    monkeypatch.setenv('EMBEDDING_CACHE_PATH', 'off')
+    assert open_embedding_cache() is None
+    monkeypatch.setenv('EMBEDDING_CACHE_PATH', str(tmp_path / 'cache.sqlite'))
+    monkeypatch.setenv('EMBEDDING_CACHE_MAX_MB', '1')
+    cache = open_embedding_cache()
+    assert cache.max_bytes == 1024 * 1024
+    cache.close()
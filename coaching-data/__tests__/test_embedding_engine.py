@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from embedding_engine import (
+    AdaptiveTokenBucket, ConcurrentEmbeddingEngine, EmbeddingThrottled, EmbeddingUnavailable,
+    hashing_embedding, is_retryable_error, is_throttling_error
+)
+
+
+class ClientError(Exception):
+    """Shaped like botocore's ClientError: the parsed error response is on ``response``."""
+
+    def __init__(self, code, status=400):
+        super().__init__(code)
+        self.response = {'Error': {'Code': code}, 'ResponseMetadata': {'HTTPStatusCode': status}}
+
+
+class EndpointConnectionError(Exception):
+    pass
+
+
+def engine_for(embed_fn, **kwargs):
+    options = dict(max_concurrency=4, requests_per_second=1000, max_retries=3, base_backoff=0.001)
+    options.update(kwargs)
+    return ConcurrentEmbeddingEngine(embed_fn, **options)
+
+
+def test_errors_are_classified_for_retry():
+    assert is_throttling_error(EmbeddingThrottled())
+    assert is_throttling_error(ClientError('ThrottlingException'))
+    for error in (EmbeddingThrottled(), EmbeddingUnavailable(), TimeoutError(), ConnectionResetError(),
+                  EndpointConnectionError(), ClientError('ModelTimeoutException'), ClientError('Unknown', 503)):
+        assert is_retryable_error(error), error
+    for error in (ValueError("bad input"), ClientError('ValidationException'), ClientError('AccessDeniedException', 403)):
+        assert not is_retryable_error(error), error
+
+
+def test_results_keep_input_order():
+    texts = [f"text {i}" for i in range(30)]
+    engine = engine_for(hashing_embedding)
+    assert asyncio.run(engine.embed_all(texts)) == [hashing_embedding(text) for text in texts]
+    assert engine.stats['succeeded'] == 30 and engine.stats['failed'] == 0
+
+
+def test_transient_failures_are_retried():
+    calls = {}
+    lock = threading.Lock()
+
+    def flaky(text):
+        with lock:
+            calls[text] = calls.get(text, 0) + 1
+            attempt = calls[text]
+        if attempt == 1:
+            raise EmbeddingThrottled() if text.endswith('0') else EmbeddingUnavailable()
+        return [1.0]
+
+    engine = engine_for(flaky)
+    assert asyncio.run(engine.embed_all([f"text {i}" for i in range(10)])) == [[1.0]] * 10
+    assert engine.stats['retries'] == 10
+    assert engine.stats['throttled'] == 1
+
+
+def test_items_failing_every_attempt_come_back_as_none():
+    def embed(text):
+        if text == 'down':
+            raise EmbeddingUnavailable()
+        return [1.0]
+
+    engine = engine_for(embed)
+    assert asyncio.run(engine.embed_all(['ok', 'down', 'ok'])) == [[1.0], None, [1.0]]
+    assert engine.stats['failed'] == 1
+    assert engine.stats['retries'] == 2
+
+
+def test_non_retryable_errors_are_raised_without_retrying():
+    calls = []
+
+    def embed(text):
+        calls.append(text)
+        if text == 'denied':
+            raise ClientError('AccessDeniedException', 403)
+        time.sleep(0.01)
+        return [1.0]
+
+    engine = engine_for(embed, max_concurrency=2)
+    with pytest.raises(ClientError):
+        asyncio.run(engine.embed_all(['denied'] + [f"text {i}" for i in range(50)]))
+    assert calls.count('denied') == 1
+    assert engine.stats['retries'] == 0
+    # The remaining items are cancelled rather than embedded
+    assert len(calls) < 10
+
+
+def test_token_bucket_waits_outside_its_lock():
+    bucket = AdaptiveTokenBucket(rate=20)
+
+    async def run():
+        for _ in range(20):
+            await bucket.acquire()
+        waiters = [asyncio.ensure_future(bucket.acquire()) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        assert not bucket._lock.locked()
+        assert not any(waiter.done() for waiter in waiters)
+        start = time.monotonic()
+        await asyncio.gather(*waiters)
+        return time.monotonic() - start
+
+    # Four tokens at 20 per second, reserved in turn
+    assert 0.1 <= asyncio.run(run()) < 0.5
+
+
+def test_throttle_halves_the_rate_once_per_cooldown():
+    bucket = AdaptiveTokenBucket(rate=10, cooldown=60)
+    bucket.on_throttle()
+    bucket.on_throttle()
+    assert bucket.rate == 5
+    bucket.on_success()
+    assert bucket.rate == 5.5
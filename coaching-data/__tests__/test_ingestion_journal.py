@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from ingestion_journal import IngestionJournal, open_ingestion_journal
+
+
+def chunks(*ids):
+    return [{'id': chunk_id, 'content': chunk_id} for chunk_id in ids]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'journal.sqlite')
+
+
+def test_resume_skips_chunks_recorded_by_the_interrupted_run(path):
+    journal = IngestionJournal(path)
+    run_id = journal.start('full')
+    journal.record('vector', chunks('a', 'b'))
+    journal.record('postgres', chunks('a'))
+    journal.close()
+
+    resumed = IngestionJournal(path)
+    assert resumed.start('full', resume=True) == run_id
+    assert resumed.resumed
+    assert [c['id'] for c in resumed.pending('vector', chunks('a', 'b', 'c'))] == ['c']
+    assert [c['id'] for c in resumed.pending('postgres', chunks('a', 'b', 'c'))] == ['b', 'c']
+    resumed.close()
+
+
+def test_finished_run_is_not_resumed(path):
+    journal = IngestionJournal(path)
+    first = journal.start('full')
+    journal.record('vector', chunks('a'))
+    journal.finish()
+    journal.close()
+
+    resumed = IngestionJournal(path)
+    assert resumed.start('full', resume=True) != first
+    assert not resumed.resumed
+    assert len(resumed.pending('vector', chunks('a'))) == 1
+    resumed.close()
+
+
+def test_resume_only_continues_a_run_of_the_same_mode(path):
+    journal = IngestionJournal(path)
+    journal.start('full')
+    journal.record('vector', chunks('a'))
+    journal.close()
+
+    resumed = IngestionJournal(path)
+    resumed.start('incremental', resume=True)
+    assert not resumed.resumed
+    assert len(resumed.pending('vector', chunks('a'))) == 1
+    resumed.close()
+
+
+def test_new_run_without_resume_discards_checkpoints(path):
+    journal = IngestionJournal(path)
+    journal.start('full')
+    journal.record('vector', chunks('a'))
+    journal.close()
+
+    fresh = IngestionJournal(path)
+    fresh.start('full')
+    fresh.close()
+
+    resumed = IngestionJournal(path)
+    resumed.start('full', resume=True)
+    assert len(resumed.pending('vector', chunks('a'))) == 1
+    resumed.close()
+
+
+def test_wrap_skips_written_chunks_and_records_only_what_the_writer_stored(path):
+    journal = IngestionJournal(path)
+    journal.start('full')
+    journal.record('vector', chunks('a'))
+    written = []
+
+    async def writer(batch):
+        written.append([c['id'] for c in batch])
+        return [c for c in batch if c['id'] != 'c']
+
+    asyncio.run(journal.wrap('vector', writer)(chunks('a', 'b', 'c')))
+
+    assert written == [['b', 'c']]
+    assert [c['id'] for c in journal.pending('vector', chunks('a', 'b', 'c'))] == ['c']
+    assert journal.stats()['skipped'] == {'vector': 1}
+    assert journal.stats()['recorded'] == {'vector': 2}
+    journal.close()
+
+
+def test_failed_write_is_not_recorded(path):
+    journal = IngestionJournal(path)
+    journal.start('full')
+
+    async def writer(batch):
+        raise RuntimeError("store unavailable")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(journal.wrap('vector', writer)(chunks('a')))
+    assert len(journal.pending('vector', chunks('a'))) == 1
+    journal.close()
+
+
+def test_journal_can_be_disabled(monkeypatch, path):
+    monkeypatch.setenv('INGEST_JOURNAL_PATH', 'off')
+    assert open_ingestion_journal() is None
+    monkeypatch.setenv('INGEST_JOURNAL_PATH', path)
+    journal = open_ingestion_journal()
+    assert isinstance(journal, IngestionJournal)
+    journal.close()
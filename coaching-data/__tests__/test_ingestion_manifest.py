@@ -0,0 +1,83 @@
+import json
+import uuid
+
+from ingestion_manifest import IngestionManifest, MANIFEST_VERSION, content_chunk_id, chunk_entries, file_digest
+
+
+def make_chunk(chunk_id, content, source='team_profiles'):
+    return {'id': chunk_id, 'content': content, 'source': source, 'metadata': {'title': chunk_id}}
+
+
+def test_content_chunk_id_is_a_deterministic_uuid():
+    chunk_id = content_chunk_id('AST_Compendium.md', 'chunk', 'Flow', 'Flow is a state...')
+    assert chunk_id == content_chunk_id('AST_Compendium.md', 'chunk', 'Flow', 'Flow is a state...')
+    assert str(uuid.UUID(chunk_id)) == chunk_id
+
+
+def test_content_chunk_id_depends_on_every_part():
+    base = content_chunk_id('file.md', 'team', 'Alpha', 'body')
+    assert content_chunk_id('file.md', 'team', 'Alpha', 'body!') != base
+    assert content_chunk_id('other.md', 'team', 'Alpha', 'body') != base
+    # Parts are separated, so moving text between them changes the ID
+    assert content_chunk_id('ab', 'c') != content_chunk_id('a', 'bc')
+
+
+def test_file_digest_tracks_file_bytes(tmp_path):
+    path = tmp_path / 'team.md'
+    path.write_text('# Team\n')
+    digest = file_digest(str(path))
+    assert digest == file_digest(str(path))
+    path.write_text('# Team!\n')
+    assert file_digest(str(path)) != digest
+
+
+def test_diff_chunks_on_an_empty_manifest_treats_everything_as_new(tmp_path):
+    manifest = IngestionManifest(str(tmp_path / 'manifest.json'))
+    chunks = [make_chunk('a', 'one'), make_chunk('b', 'two')]
+    changed, removed = manifest.diff_chunks('team.md', chunks)
+    assert changed == chunks
+    assert removed == {}
+
+
+def test_diff_chunks_returns_only_changed_and_removed_chunks(tmp_path):
+    manifest = IngestionManifest(str(tmp_path / 'manifest.json'))
+    manifest.record_file('team.md', 'digest-1', chunk_entries([
+        make_chunk('a', 'one'), make_chunk('b', 'two'), make_chunk('c', 'three')
+    ]))
+
+    fresh = [make_chunk('a', 'one'), make_chunk('b', 'two, edited'), make_chunk('d', 'four')]
+    changed, removed = manifest.diff_chunks('team.md', fresh)
+
+    assert [chunk['id'] for chunk in changed] == ['b', 'd']
+    assert removed == {'c': 'team_profiles'}
+
+
+def test_diff_chunks_collapses_repeated_ids(tmp_path):
+    manifest = IngestionManifest(str(tmp_path / 'manifest.json'))
+    changed, _ = manifest.diff_chunks('team.md', [make_chunk('a', 'one'), make_chunk('a', 'one')])
+    assert len(changed) == 1
+
+
+def test_missing_files_lists_chunks_of_deleted_sources(tmp_path):
+    manifest = IngestionManifest(str(tmp_path / 'manifest.json'))
+    manifest.record_file('kept.md', 'd1', chunk_entries([make_chunk('a', 'one')]))
+    manifest.record_file('gone.md', 'd2', chunk_entries([make_chunk('b', 'two', source='AST_Compendium')]))
+    assert manifest.missing_files(['kept.md']) == {'gone.md': {'b': 'AST_Compendium'}}
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / 'manifest.json')
+    manifest = IngestionManifest(path)
+    manifest.record_file('team.md', 'digest-1', chunk_entries([make_chunk('a', 'one')]))
+    manifest.save()
+
+    loaded = IngestionManifest(path).load()
+    assert loaded.is_unchanged('team.md', 'digest-1')
+    assert not loaded.is_unchanged('team.md', 'digest-2')
+    assert loaded.diff_chunks('team.md', [make_chunk('a', 'one')]) == ([], {})
+
+
+def test_load_ignores_an_unsupported_version(tmp_path):
+    path = tmp_path / 'manifest.json'
+    path.write_text(json.dumps({'version': MANIFEST_VERSION + 1, 'files': {'team.md': {'digest': 'x'}}}))
+    assert IngestionManifest(str(path)).load().files == {}
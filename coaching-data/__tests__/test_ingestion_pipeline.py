@@ -0,0 +1,161 @@
+import asyncio
+import itertools
+
+import pytest
+
+from ingestion_pipeline import BatchingSink, ChunkRouter, PipelineStage, StagedPipeline, stream_chunks
+
+
+def chunks(count):
+    return [{'id': f'chunk-{i}', 'source': 'AST_Compendium'} for i in range(count)]
+
+
+def recording_sink(name, batch_size, batches, **kwargs):
+    async def writer(batch):
+        batches.append([chunk['id'] for chunk in batch])
+    return BatchingSink(name, writer, batch_size, **kwargs)
+
+
+def test_router_sends_chunks_to_their_source_sinks_and_catch_alls():
+    ast, teams, everything = [], [], []
+    router = ChunkRouter()
+    router.add_sink(recording_sink('ast', 10, ast), 'AST_Compendium')
+    router.add_sink(recording_sink('teams', 10, teams), 'team_profiles')
+    router.add_sink(recording_sink('all', 10, everything))
+    mixed = [{'id': 'a1', 'source': 'AST_Compendium'}, {'id': 't1', 'source': 'team_profiles'},
+             {'id': 'a1', 'source': 'AST_Compendium'}, {'id': 'x1', 'source': 'unknown'}]
+
+    assert asyncio.run(stream_chunks(mixed, router)) == 3
+    assert ast == [['a1']]
+    assert teams == [['t1']]
+    assert everything == [['a1', 't1', 'x1']]
+    assert router.stats()['all'] == {'chunks': 3, 'batches': 1}
+
+
+def test_sink_flushes_full_batches_then_the_partial_remainder():
+    batches = []
+    router = ChunkRouter()
+    router.add_sink(recording_sink('ast', 4, batches), 'AST_Compendium')
+
+    async def run():
+        for chunk in chunks(10):
+            await router.route(chunk)
+        assert [len(batch) for batch in batches] == [4, 4]
+        await router.close()
+
+    asyncio.run(run())
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert sum(batches, []) == [chunk['id'] for chunk in chunks(10)]
+
+
+def test_background_writes_stay_within_max_in_flight():
+    in_flight, peak, written = [0], [0], []
+
+    async def writer(batch):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.005)
+        in_flight[0] -= 1
+        written.extend(batch)
+
+    router = ChunkRouter()
+    sink = router.add_sink(BatchingSink('ast', writer, batch_size=2, max_in_flight=3))
+    asyncio.run(stream_chunks(chunks(30), router))
+
+    assert peak[0] == 3
+    assert len(written) == 30
+    assert (sink.chunks_written, sink.batches_written) == (30, 15)
+
+
+def test_failed_background_write_is_raised():
+    async def writer(batch):
+        await asyncio.sleep(0.001)
+        if batch[0]['id'] == 'chunk-4':
+            raise RuntimeError("store unavailable")
+
+    router = ChunkRouter()
+    router.add_sink(BatchingSink('ast', writer, batch_size=2, max_in_flight=2))
+    with pytest.raises(RuntimeError, match="store unavailable"):
+        asyncio.run(stream_chunks(chunks(20), router))
+
+
+def test_multi_worker_stages_deliver_every_item():
+    delivered = []
+
+    async def embed(batch):
+        await asyncio.sleep(0.001)
+        return [dict(chunk, embedded=True) for chunk in batch]
+
+    async def store(batch):
+        await asyncio.sleep(0.002)
+        delivered.extend(batch)
+        return batch
+
+    stages = [PipelineStage('embed', embed, workers=3), PipelineStage('store', store, workers=2)]
+    pipeline = StagedPipeline(stages, batch_size=4, queue_size=2)
+
+    assert asyncio.run(pipeline.run(chunks(50))) == 50
+    assert sorted(chunk['id'] for chunk in delivered) == sorted(chunk['id'] for chunk in chunks(50))
+    assert all(chunk['embedded'] for chunk in delivered)
+
+    stats = pipeline.stats()
+    assert stats['stages']['parse']['items'] == 50
+    assert stats['stages']['embed']['batches'] == 13
+    assert stats['stages']['store']['items'] == 50
+    assert stats['bottleneck'] in ('parse', 'embed', 'store')
+
+
+def test_empty_input_ends_every_stage():
+    async def passthrough(batch):
+        return batch
+
+    stages = [PipelineStage('one', passthrough, workers=2), PipelineStage('two', passthrough, workers=3)]
+    assert asyncio.run(StagedPipeline(stages).run([])) == 0
+
+
+def test_stage_failure_cancels_the_others_and_is_reraised():
+    parsed = []
+    slow_batches_finished = []
+
+    def endless():
+        for i in itertools.count():
+            parsed.append(i)
+            yield {'id': f'chunk-{i}', 'source': 'AST_Compendium'}
+
+    async def embed(batch):
+        if int(batch[0]['id'].split('-')[1]) >= 20:
+            raise RuntimeError("embedding service down")
+        return batch
+
+    async def store(batch):
+        await asyncio.sleep(10)
+        slow_batches_finished.append(batch)
+
+    stages = [PipelineStage('embed', embed), PipelineStage('store', store)]
+    pipeline = StagedPipeline(stages, batch_size=10, queue_size=1)
+
+    with pytest.raises(RuntimeError, match="embedding service down"):
+        asyncio.run(asyncio.wait_for(pipeline.run(endless()), timeout=5))
+
+    assert len(parsed) < 100
+    assert slow_batches_finished == []
+
+
+def test_full_queues_apply_backpressure():
+    async def fast(batch):
+        return batch
+
+    async def slow(batch):
+        await asyncio.sleep(0.005)
+        return batch
+
+    stages = [PipelineStage('fast', fast), PipelineStage('slow', slow)]
+    pipeline = StagedPipeline(stages, batch_size=2, queue_size=2)
+    asyncio.run(pipeline.run(chunks(40)))
+
+    stats = pipeline.stats()
+    for name in ('fast', 'slow'):
+        assert stats['stages'][name]['max_queue_depth'] <= pipeline.queue_size
+    assert stats['stages']['slow']['max_queue_depth'] == pipeline.queue_size
+    assert stats['stages']['fast']['blocked_seconds'] > 0
+    assert stats['bottleneck'] == 'slow'
@@ -0,0 +1,68 @@
+import glob
+import os
+import random
+
+import pytest
+
+from keyword_classifier import VOCABULARY_PATH, KeywordClassifier, KeywordMatcher
+
+SOURCE_FILES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'source-files', '*.md')
+
+
+def naive_find(keywords, text):
+    return {k.lower() for k in keywords if k and k.lower() in text.lower()}
+
+
+def test_overlapping_and_nested_keywords_match_like_substring_checks():
+    keywords = ['hr', 'three', 'he', 'she', 'hers', 'his', 'flow', 'flow state', 'low']
+    matcher = KeywordMatcher(keywords)
+    for text in ('Three people', 'ushers', 'Flow State', 'a slow flow', 'HR team', 'nothing here', ''):
+        assert matcher.find(text) == naive_find(keywords, text), text
+    assert matcher.find('three') == {'hr', 'three'}
+
+
+def test_random_texts_match_like_substring_checks():
+    rng = random.Random(4)
+    keywords = [''.join(rng.choice('abc') for _ in range(rng.randint(1, 4))) for _ in range(40)]
+    matcher = KeywordMatcher(keywords)
+    for _ in range(200):
+        text = ''.join(rng.choice('abcA ') for _ in range(rng.randint(0, 30)))
+        assert matcher.find(text) == naive_find(keywords, text)
+
+
+def test_vocabulary_matches_substring_checks_on_team_profiles():
+    classifier = KeywordClassifier.from_file()
+    files = sorted(glob.glob(SOURCE_FILES))[:5]
+    if not files:
+        pytest.skip("no source files")
+    for path in files:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        assert classifier.find(text) == naive_find(classifier.matcher.keywords, text)
+
+
+def test_classification_keeps_first_label_wins_order():
+    classifier = KeywordClassifier({
+        'key_concepts': ['Flow State', 'planning'],
+        'departments': {
+            'fallback': 'other',
+            'labels': [
+                {'label': 'engineering', 'keywords': ['engineer', 'developer']},
+                {'label': 'hr', 'keywords': ['hr', 'people ops']}
+            ]
+        }
+    })
+
+    hits = classifier.find("Our Developer and HR partners", "reach flow state through planning")
+    assert classifier.concepts(hits) == ['flow state', 'planning']
+    assert classifier.classify('departments', hits) == 'engineering'
+    assert classifier.classify('departments', classifier.find("People Ops")) == 'hr'
+    assert classifier.classify('departments', classifier.find("finance")) == 'other'
+
+
+def test_vocabulary_file_version_is_checked(tmp_path):
+    assert KeywordClassifier.from_file(VOCABULARY_PATH).label_sets
+    path = tmp_path / 'vocabulary.json'
+    path.write_text('{"version": 99}')
+    with pytest.raises(ValueError):
+        KeywordClassifier.from_file(str(path))
@@ -0,0 +1,57 @@
+import pytest
+
+from lexical_index import BM25Index, reciprocal_rank_fusion, RRF_K
+
+
+def chunk(chunk_id, content, content_type='', title=''):
+    return {'id': chunk_id, 'title': title, 'content': content, 'metadata': {'content_type': content_type}}
+
+
+def test_rrf_scores_sum_reciprocal_ranks():
+    fused = dict(reciprocal_rank_fusion([['a', 'b'], ['b', 'c']]))
+    assert fused['b'] == pytest.approx(1 / (RRF_K + 2) + 1 / (RRF_K + 1))
+    assert fused['a'] == pytest.approx(1 / (RRF_K + 1))
+    assert fused['c'] == pytest.approx(1 / (RRF_K + 2))
+
+
+def test_rrf_prefers_ids_ranked_by_both_lists():
+    fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['d', 'b']])
+    assert [doc_id for doc_id, _ in fused][:1] == ['b']
+    assert {doc_id for doc_id, _ in fused} == {'a', 'b', 'c', 'd'}
+
+
+def test_rrf_of_no_rankings_is_empty():
+    assert reciprocal_rank_fusion([]) == []
+    assert reciprocal_rank_fusion([[], []]) == []
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = BM25Index(str(tmp_path / 'index.npz'))
+    index.add([
+        chunk('flow', 'Flow states arise when challenge matches skill', 'core_methodology'),
+        chunk('trust', 'Remote teams build trust through reliable rituals', 'team_dynamics'),
+        chunk('both', 'Teams in flow trust each other', 'team_dynamics'),
+    ])
+    return index
+
+
+def test_bm25_ranks_chunks_containing_the_query_terms(index):
+    results = index.search('flow challenge', 3)
+    assert [doc_id for doc_id, _ in results] == ['flow', 'both']
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_bm25_filters_on_metadata(index):
+    assert [doc_id for doc_id, _ in index.search('flow', 3, {'content_type': 'team_dynamics'})] == ['both']
+    with pytest.raises(ValueError):
+        index.search('flow', 3, {'title': 'Flow'})
+
+
+def test_bm25_remove_save_and_reload(index, tmp_path):
+    index.remove(['flow'])
+    index.save()
+
+    reloaded = BM25Index(str(tmp_path / 'index.npz'))
+    assert len(reloaded) == 2
+    assert [doc_id for doc_id, _ in reloaded.search('flow', 3)] == ['both']
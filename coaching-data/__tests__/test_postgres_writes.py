@@ -0,0 +1,94 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from pg_pool import PostgresPool
+from process_ast_knowledge import ASTKnowledgeProcessor, MAX_BIND_PARAMETERS
+
+QUERY = """
+INSERT INTO vector_embeddings (id, content_id, collection_name)
+VALUES %s
+ON CONFLICT (content_id, collection_name) DO UPDATE SET id = EXCLUDED.id
+"""
+
+
+class FakeCursor:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, params):
+        assert statement.count('%s') == len(params)
+        self.statements.append((statement, params))
+
+
+@pytest.fixture
+def processor(monkeypatch, tmp_path):
+    monkeypatch.setenv('LEXICAL_INDEX_PATH', str(tmp_path / 'lexical'))
+    return ASTKnowledgeProcessor(pg_batch_size=100000)
+
+
+def test_bulk_upsert_pages_stay_under_the_bind_parameter_limit(processor):
+    cursor = FakeCursor()
+    rows = [(f'id-{i}', f'chunk-{i}', 'ast_methodology') for i in range(50000)]
+    asyncio.run(processor._bulk_upsert(cursor, 'vector_embeddings', QUERY, rows, [1, 2]))
+
+    assert len(cursor.statements) == 3
+    assert all(len(params) <= MAX_BIND_PARAMETERS for _, params in cursor.statements)
+    assert sum(len(params) for _, params in cursor.statements) == 3 * len(rows)
+    assert processor.pg_write_stats['vector_embeddings']['rows'] == len(rows)
+    assert processor.pg_write_stats['vector_embeddings']['batches'] == 3
+
+
+def test_bulk_upsert_collapses_rows_sharing_a_conflict_key(processor):
+    processor.pg_batch_size = 2
+    cursor = FakeCursor()
+    rows = [('old', 'chunk-1', 'ast_methodology'), ('other', 'chunk-2', 'ast_methodology'),
+            ('team', 'chunk-1', 'team_profiles'), ('new', 'chunk-1', 'ast_methodology')]
+    asyncio.run(processor._bulk_upsert(cursor, 'vector_embeddings', QUERY, rows, [1, 2]))
+
+    params = [value for _, page in cursor.statements for value in page]
+    assert [len(page) for _, page in cursor.statements] == [6, 3]
+    assert params[0::3] == ['new', 'other', 'team']
+    assert cursor.statements[0][0].count('(%s, %s, %s)') == 2
+
+
+def test_bulk_upsert_of_no_rows_writes_nothing(processor):
+    cursor = FakeCursor()
+    asyncio.run(processor._bulk_upsert(cursor, 'vector_embeddings', QUERY, [], [1, 2]))
+    assert cursor.statements == []
+    assert processor.pg_write_stats == {}
+
+
+class FakeConnectionPool:
+    """Stands in for AsyncConnectionPool with a fixed number of connections."""
+
+    def __init__(self, size):
+        self.free = asyncio.Semaphore(size)
+
+    @asynccontextmanager
+    async def connection(self):
+        async with self.free:
+            yield object()
+
+
+def test_pool_stats_report_checkout_waits_and_peak_use():
+    pool = PostgresPool('host=localhost', min_size=1, max_size=2)
+
+    async def write():
+        async with pool.connection():
+            await asyncio.sleep(0.02)
+
+    async def run():
+        pool.pool = FakeConnectionPool(pool.max_size)
+        await asyncio.gather(*(write() for _ in range(6)))
+
+    asyncio.run(run())
+    stats = pool.stats()
+    assert stats['checkouts'] == 6
+    assert stats['peak_in_use'] == 2
+    assert pool.in_use == 0
+    # Four writers queued behind the two connections, the last two for about two writes
+    assert stats['wait_ms_max'] >= 30
+    assert stats['wait_ms_p50'] <= stats['wait_ms_p95'] <= stats['wait_ms_max']
+    assert stats['wait_ms_total'] >= 4 * 15
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from vector_store import NumpyVectorStore, quantize, synthetic_embeddings
+
+
+def unit_vectors(count=200, dimensions=64, seed=3):
+    vectors = np.random.default_rng(seed).normal(size=(count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_float32_is_returned_unchanged():
+    vectors = unit_vectors()
+    codes, scales = quantize(vectors, 'float32')
+    assert codes is vectors and scales is None
+
+
+def test_float16_halves_the_width():
+    vectors = unit_vectors()
+    codes, scales = quantize(vectors, 'float16')
+    assert codes.dtype == np.float16 and scales is None
+    assert np.allclose(codes.astype(np.float32), vectors, atol=1e-3)
+
+
+def test_int8_codes_times_scales_reconstruct_the_vectors():
+    vectors = unit_vectors()
+    codes, scales = quantize(vectors, 'int8')
+    assert codes.dtype == np.int8 and scales.shape == (len(vectors),)
+    assert np.abs(codes).max() == 127
+    assert np.allclose(codes * scales[:, None], vectors, atol=scales.max())
+
+
+def test_int8_handles_zero_vectors_and_empty_input():
+    codes, scales = quantize(np.zeros((1, 4), dtype=np.float32), 'int8')
+    assert not codes.any() and scales[0] == 1.0
+    codes, scales = quantize(np.zeros((0, 4), dtype=np.float32), 'int8')
+    assert codes.shape == (0, 4) and scales.shape == (0,)
+
+
+def test_unknown_quantization_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        quantize(unit_vectors(), 'int4')
+    with pytest.raises(ValueError):
+        NumpyVectorStore(str(tmp_path), quantization='int4').get_or_create_collection('test')
+
+
+@pytest.mark.parametrize('quantization', ['float16', 'int8'])
+def test_quantized_queries_are_rescored_with_exact_similarities(tmp_path, quantization):
+    vectors = synthetic_embeddings(500, 64)
+    ids = [f'id-{i}' for i in range(len(vectors))]
+    queries = vectors[:5] + 0.05 * unit_vectors(5, 64, seed=9)
+
+    exact = NumpyVectorStore(str(tmp_path / 'exact'), quantization='float32').get_or_create_collection('test')
+    compact = NumpyVectorStore(str(tmp_path / quantization), quantization=quantization).get_or_create_collection('test')
+    for collection in (exact, compact):
+        collection.upsert(ids=ids, embeddings=vectors.tolist())
+    assert compact.memory_bytes() < exact.memory_bytes()
+
+    expected = exact.query(query_embeddings=queries.tolist(), n_results=10)
+    results = compact.query(query_embeddings=queries.tolist(), n_results=10)
+    assert results['ids'] == expected['ids']
+    assert np.allclose(results['distances'], expected['distances'], atol=1e-6)
@@ -0,0 +1,78 @@
+import time
+
+from retrieval_cache import RetrievalCache, VERSION_KEY, bump_collection_version, collection_version, normalize_query
+from vector_store import NumpyVectorStore
+
+MATCHES = [{'id': 'a', 'content': 'flow', 'metadata': {}, 'distance': 0.1}]
+
+
+def test_keys_normalize_queries_and_filters():
+    cache = RetrievalCache(max_entries=10, ttl_seconds=60)
+    assert normalize_query("  Flow\tSTATE ") == "flow state"
+    assert cache.key('ast', 1, 3, "Flow  State") == cache.key('ast', 1, 3, "flow state")
+    assert cache.key('ast', 1, 3, "q", {'b': 1, 'a': 2}) == cache.key('ast', 1, 3, "q", {'a': 2, 'b': 1})
+    assert cache.key('ast', 1, 3, "q") != cache.key('ast', 2, 3, "q")
+    assert cache.key('ast', 1, 3, "q") != cache.key('ast', 1, 5, "q")
+    assert cache.key('ast', 1, 3, "q") != cache.key('ast', 1, 3, "q", {'a': 1})
+
+
+def test_hits_and_misses():
+    cache = RetrievalCache(max_entries=10, ttl_seconds=60)
+    key = cache.key('ast', 0, 3, "flow")
+    assert cache.get(key) is None
+    cache.put(key, MATCHES)
+
+    assert cache.get(cache.key('ast', 0, 3, "FLOW")) == MATCHES
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+
+
+def test_entries_expire_after_the_ttl():
+    cache = RetrievalCache(max_entries=10, ttl_seconds=0.05)
+    key = cache.key('ast', 0, 3, "flow")
+    cache.put(key, MATCHES)
+    assert cache.get(key) == MATCHES
+    time.sleep(0.1)
+
+    assert cache.get(key) is None
+    assert cache.stats()['expirations'] == 1
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = RetrievalCache(max_entries=2, ttl_seconds=60)
+    keys = [cache.key('ast', 0, 3, query) for query in ('a', 'b', 'c')]
+    cache.put(keys[0], MATCHES)
+    cache.put(keys[1], MATCHES)
+    cache.get(keys[0])
+    cache.put(keys[2], MATCHES)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == MATCHES and cache.get(keys[2]) == MATCHES
+    assert cache.stats()['evictions'] == 1
+
+
+def test_new_ingest_version_drops_only_that_collections_entries():
+    cache = RetrievalCache(max_entries=10, ttl_seconds=60)
+    assert not cache.observe_version('ast', 1)
+    assert not cache.observe_version('teams', 1)
+    cache.put(cache.key('ast', 1, 3, "flow"), MATCHES)
+    cache.put(cache.key('teams', 1, 3, "flow"), MATCHES)
+
+    assert not cache.observe_version('ast', 1)
+    assert cache.observe_version('ast', 2)
+    assert cache.get(cache.key('ast', 1, 3, "flow")) is None
+    assert cache.get(cache.key('teams', 1, 3, "flow")) == MATCHES
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_bump_collection_version_keeps_other_metadata(tmp_path):
+    collection = NumpyVectorStore(str(tmp_path)).get_or_create_collection(
+        'ast', metadata={'description': 'AST methodology', 'hnsw:space': 'cosine'})
+    assert collection_version(collection) == 0
+
+    assert bump_collection_version(collection) == 1
+    assert bump_collection_version(collection) == 2
+    assert collection.metadata == {'description': 'AST methodology', VERSION_KEY: 2}
+    reloaded = NumpyVectorStore(str(tmp_path)).get_collection('ast')
+    assert collection_version(reloaded) == 2
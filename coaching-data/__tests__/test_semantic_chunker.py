@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+from semantic_chunker import SemanticChunker, estimate_tokens, token_bucket
+
+COMPENDIUM = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'source-files', 'AST_Compendium.md')
+
+DOCUMENT = """# Guide
+
+Intro paragraph for the whole guide.
+
+## Strengths
+
+Thinking, acting, feeling and planning.
+
+### Thinking
+
+Analysis and ideas.
+
+## Flow
+
+Clear goals and feedback.
+"""
+
+
+def sentences(count, prefix="Sentence"):
+    return ' '.join(f"{prefix} number {i} has exactly eight tokens here." for i in range(count))
+
+
+def test_token_estimate_and_buckets():
+    assert estimate_tokens("Flow, state!") == 4
+    assert token_bucket(0) == '0-63'
+    assert token_bucket(128) == '128-255'
+    assert token_bucket(5000) == '2048+'
+
+
+def test_overlap_must_be_smaller_than_the_chunk():
+    with pytest.raises(ValueError):
+        SemanticChunker(max_tokens=50, overlap_tokens=50)
+
+
+def test_sections_follow_the_heading_hierarchy():
+    sections = SemanticChunker().sections(DOCUMENT)
+    assert [(path, heading) for path, heading, _ in sections] == [
+        (['Guide'], '# Guide'),
+        (['Guide', 'Strengths'], '## Strengths'),
+        (['Guide', 'Strengths', 'Thinking'], '### Thinking'),
+        (['Guide', 'Flow'], '## Flow'),
+    ]
+    assert sections[1][2] == "Thinking, acting, feeling and planning."
+
+
+def test_small_sections_merge_into_one_chunk():
+    chunks = list(SemanticChunker(max_tokens=400, overlap_tokens=20).chunk(DOCUMENT))
+    assert len(chunks) == 1
+    # Merged subsections deepen the path while they stay nested under it
+    assert chunks[0]['heading_path'] == ['Guide', 'Strengths', 'Thinking']
+    assert chunks[0]['content'].startswith("# Guide\n\nIntro paragraph")
+    assert chunks[0]['content'].endswith("## Flow\n\nClear goals and feedback.")
+
+
+def test_sections_large_enough_are_chunked_separately():
+    document = f"# Guide\n\n{sentences(8, 'Intro')}\n\n## Flow\n\n{sentences(8, 'Flow')}\n"
+    chunks = list(SemanticChunker(max_tokens=100, overlap_tokens=10, min_tokens=20).chunk(document))
+    assert [chunk['heading_path'] for chunk in chunks] == [['Guide'], ['Guide', 'Flow']]
+    assert chunks[1]['content'].startswith("## Flow")
+
+
+def test_long_sections_split_with_sentence_overlap():
+    chunker = SemanticChunker(max_tokens=60, overlap_tokens=20)
+    chunks = list(chunker.chunk(f"## Flow\n\n{sentences(30)}"))
+
+    assert len(chunks) > 3
+    for chunk in chunks:
+        assert chunk['token_count'] <= 60
+        assert chunk['token_count'] == estimate_tokens(chunk['content'])
+        assert chunk['heading_path'] == ['Flow']
+    for previous, current in zip(chunks, chunks[1:]):
+        # The next chunk repeats the previous chunk's last two sentences (16 tokens)
+        tail = '. '.join(previous['content'].split('. ')[-2:])
+        assert current['content'].startswith(tail)
+
+
+def test_over_long_sentences_fall_back_to_word_windows():
+    chunks = list(SemanticChunker(max_tokens=30, overlap_tokens=5).chunk(' '.join(['word'] * 100)))
+    assert all(chunk['token_count'] <= 30 for chunk in chunks)
+    assert sum(chunk['content'].count('word') for chunk in chunks) >= 100
+
+
+@pytest.mark.skipif(not os.path.exists(COMPENDIUM), reason="compendium not available")
+def test_compendium_chunks_stay_within_the_token_budget():
+    with open(COMPENDIUM, 'r', encoding='utf-8') as f:
+        text = f.read()
+    chunks = list(SemanticChunker(max_tokens=400, overlap_tokens=50).chunk(text))
+
+    assert len(chunks) > 10
+    assert max(chunk['token_count'] for chunk in chunks) <= 400
+    assert all(chunk['token_count'] == estimate_tokens(chunk['content']) for chunk in chunks)
+    assert all(chunk['heading_path'] for chunk in chunks[1:])
@@ -0,0 +1,97 @@
+from team_section_extractor import TeamSectionExtractor
+
+SECTION = """## Team Falcon
+
+### Team Composition
+- **Ana Ruiz** (Product Lead) – Former designer with ten years in fintech
+* **Ben Cole** (Engineer) - Backend specialist
+- A note without a member entry
+
+### Strengths Distribution
+**Thinking Dominant**: Ana, Ben
+Feeling Dominant: Cara
+
+### Flow Synergies
+- **Paired planning**: Ana and Ben plan sprints together
+- Not a synergy line
+
+### Key Insights
+The team plans well under pressure. Short one. Feedback loops are fast and honest!
+
+### ANA RUIZ (Product Lead)
+Ana sets direction for the team.
+
+**Strengths Profile:**
+1. Thinking (38%) – Strategic analysis
+2. Planning (27%) - Roadmap structure
+
+Not part of the list
+3. Feeling (20%) – Should be ignored
+
+**Flow State Indicators:**
+- Deep focus in the morning
+* Clear weekly goals
+
+**Coaching Notes:**
+- Not a flow indicator
+
+### Team Dynamics
+Not an individual profile.
+"""
+
+
+def extractor():
+    return TeamSectionExtractor(SECTION)
+
+
+def test_team_name_and_composition():
+    team = extractor()
+
+    assert team.team_name() == 'Team Falcon'
+    assert team.team_composition() == [
+        {'name': 'Ana Ruiz', 'role': 'Product Lead', 'background': 'Former designer with ten years in fintech'},
+        {'name': 'Ben Cole', 'role': 'Engineer', 'background': 'Backend specialist'},
+    ]
+
+
+def test_strengths_distribution_reads_bold_and_plain_lines():
+    assert extractor().strengths_distribution() == {
+        'Thinking': ['Ana', 'Ben'],
+        'Feeling': ['Cara'],
+    }
+
+
+def test_flow_synergies_and_insights():
+    team = extractor()
+
+    assert team.flow_synergies() == ['Paired planning: Ana and Ben plan sprints together']
+    assert team.team_insights() == [
+        'The team plans well under pressure',
+        'Feedback loops are fast and honest',
+    ]
+
+
+def test_individual_profiles():
+    profiles = extractor().individual_profiles()
+
+    assert len(profiles) == 1
+    profile = profiles[0]
+    assert profile['name_role'] == 'ANA RUIZ (Product Lead)'
+    assert profile['content'].startswith('Ana sets direction for the team.')
+    assert profile['content'].endswith('- Not a flow indicator')
+    assert profile['strengths'] == {
+        'Thinking': {'percentage': '38%', 'description': 'Strategic analysis'},
+        'Planning': {'percentage': '27%', 'description': 'Roadmap structure'},
+    }
+    assert profile['flow_indicators'] == ['Deep focus in the morning', 'Clear weekly goals']
+
+
+def test_section_without_team_headings():
+    team = TeamSectionExtractor("Just a paragraph with no headings.")
+
+    assert team.team_name() is None
+    assert team.team_composition() == []
+    assert team.strengths_distribution() == {}
+    assert team.flow_synergies() == []
+    assert team.team_insights() == []
+    assert team.individual_profiles() == []
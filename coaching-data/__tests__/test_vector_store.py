@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import pytest
+
+from vector_store import NumpyVectorStore
+
+
+def ids_of(results):
+    return results['ids'][0]
+
+
+def test_query_returns_nearest_records_with_cosine_distances(tmp_path):
+    collection = NumpyVectorStore(str(tmp_path)).get_or_create_collection('test')
+    collection.upsert(ids=['x', 'y', 'xy'], documents=['x', 'y', 'xy'],
+                      embeddings=[[1, 0], [0, 1], [1, 1]])
+
+    results = collection.query(query_embeddings=[[1, 0.1]], n_results=2)
+    assert ids_of(results) == ['x', 'xy']
+    assert results['distances'][0][0] < results['distances'][0][1]
+
+
+def test_upsert_replaces_and_delete_removes(tmp_path):
+    collection = NumpyVectorStore(str(tmp_path)).get_or_create_collection('test')
+    collection.upsert(ids=['a', 'b'], documents=['old a', 'b'], embeddings=[[1, 0], [0, 1]])
+    collection.upsert(ids=['a'], documents=['new a'], embeddings=[[0, 1]])
+    collection.delete(ids=['b'])
+
+    assert collection.count() == 1
+    assert collection.get(ids=['a', 'b'])['documents'] == ['new a']
+    assert collection.get()['ids'] == ['a']
+
+
+def test_writes_are_logged_until_flush_compacts_them(tmp_path):
+    collection = NumpyVectorStore(str(tmp_path)).get_or_create_collection('test')
+    for i in range(3):
+        collection.upsert(ids=[f'id-{i}'], embeddings=[[1, i]])
+    files = os.listdir(collection.directory)
+    assert 'log.jsonl' in files
+    assert sum(name.startswith('shard-') for name in files) == 3
+
+    collection.flush()
+    files = os.listdir(collection.directory)
+    assert 'log.jsonl' not in files
+    assert not any(name.startswith('shard-') for name in files)
+    assert NumpyVectorStore(str(tmp_path)).get_collection('test').count() == 3
+
+
+def test_a_reader_sees_writes_made_through_another_store(tmp_path):
+    writer = NumpyVectorStore(str(tmp_path)).get_or_create_collection('test')
+    writer.upsert(ids=['a'], embeddings=[[1, 0]])
+    reader_store = NumpyVectorStore(str(tmp_path))
+    assert reader_store.get_collection('test').count() == 1
+
+    writer.upsert(ids=['b'], embeddings=[[0, 1]])
+    assert reader_store.get_collection('test').count() == 2
+
+    writer.flush()
+    writer.delete(ids=['a'])
+    assert reader_store.get_collection('test').get()['ids'] == ['b']
+
+
+def test_a_torn_log_line_is_dropped_on_load(tmp_path):
+    collection = NumpyVectorStore(str(tmp_path)).get_or_create_collection('test')
+    collection.upsert(ids=['a'], embeddings=[[1, 0]])
+    with open(os.path.join(collection.directory, 'log.jsonl'), 'a', encoding='utf-8') as f:
+        f.write('{"op": "upsert", "ids": ["b"')
+
+    reloaded = NumpyVectorStore(str(tmp_path)).get_collection('test')
+    assert reloaded.get()['ids'] == ['a']
+    reloaded.upsert(ids=['c'], embeddings=[[0, 1]])
+    assert NumpyVectorStore(str(tmp_path)).get_collection('test').get()['ids'] == ['a', 'c']
+
+
+def test_embeddings_must_match_the_collection_dimension(tmp_path):
+    collection = NumpyVectorStore(str(tmp_path)).get_or_create_collection('test')
+    collection.upsert(ids=['a'], embeddings=[[1, 0]])
+    with pytest.raises(ValueError, match='dimension'):
+        collection.upsert(ids=['b'], embeddings=[[1, 0, 0]])
+    assert np.isclose(collection.query(query_embeddings=[[1, 0]], n_results=1)['distances'][0][0], 0.0, atol=1e-6)
+
+
+@pytest.mark.parametrize('quantization', ['float32', 'int8'])
+def test_streamed_upserts_grow_buffers_geometrically(tmp_path, quantization):
+    collection = NumpyVectorStore(str(tmp_path), quantization=quantization).get_or_create_collection('test')
+    vectors = np.eye(8, dtype=np.float32)[np.arange(200) % 8] + np.linspace(0, 1, 200, dtype=np.float32)[:, None]
+    buffers = set()
+    for i, vector in enumerate(vectors):
+        collection.upsert(ids=[f'id-{i}'], embeddings=[vector.tolist()])
+        buffers.add(id(collection._buffers['vectors']))
+
+    assert len(buffers) <= 10
+    collection.upsert(ids=['id-3', 'id-3'], embeddings=[vectors[5].tolist(), vectors[7].tolist()])
+    collection.delete(ids=['id-0'])
+    collection.upsert(ids=['id-new'], embeddings=[vectors[1].tolist()])
+
+    assert collection.count() == 200
+    # The last of repeated IDs in a batch wins
+    row = collection._positions['id-3']
+    assert np.allclose(collection._vectors[row], vectors[7] / np.linalg.norm(vectors[7]))
+    reloaded = NumpyVectorStore(str(tmp_path), quantization=quantization).get_collection('test')
+    assert reloaded.get()['ids'] == collection.get()['ids']
+    assert np.allclose(np.asarray(reloaded._vectors), np.asarray(collection._vectors))
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Batched Multi-Query Retrieval
+=============================
+
+Answers many queries against several ChromaDB collections with one
+``query()`` call per collection. Queries are deduplicated (after the same
+normalization the retrieval cache uses), embedded once even when several
+collections receive the same text, and the per-collection calls run in
+parallel on a thread pool since the Chroma client is blocking.
+
+Results keep the shape ``ASTCoachingDemo.search_ast_knowledge`` returns:
+a list of ``{'content', 'metadata', 'distance'}`` dicts (plus the chunk
+``id``) per query. With BM25 indexes (``lexical_index.py``) the vector and
+lexical rankings are fused.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable
+
+from retrieval_cache import normalize_query
+from lexical_index import BM25Index, reciprocal_rank_fusion
+
+MAX_CONTENT_CHARS = 500
+# Candidates taken from each ranking before reciprocal-rank fusion, as a multiple of n_results
+HYBRID_CANDIDATES = 4
+
+
+def chroma_where(where: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Equality filters in Chroma's ``where`` syntax (several fields need ``$and``)."""
+    if not where:
+        return None
+    if len(where) == 1:
+        return dict(where)
+    return {'$and': [{field: value} for field, value in where.items()]}
+
+
+def format_match(doc_id: str, document: str, metadata: Optional[Dict[str, Any]], distance: Optional[float]) -> Dict:
+    return {
+        'id': doc_id,
+        'content': document[:MAX_CONTENT_CHARS] + "..." if len(document) > MAX_CONTENT_CHARS else document,
+        'metadata': metadata or {},
+        'distance': distance
+    }
+
+
+def format_matches(results: Dict[str, Any], index: int = 0) -> List[Dict]:
+    """Matches for the index-th query of a Chroma ``query()`` result."""
+    ids = results['ids'][index]
+    documents = results['documents'][index] if results.get('documents') else []
+    metadatas = results['metadatas'][index] if results.get('metadatas') else None
+    distances = results['distances'][index] if results.get('distances') else None
+
+    return [
+        format_match(ids[i], doc, metadatas[i] if metadatas else None, distances[i] if distances else 0)
+        for i, doc in enumerate(documents or [])
+    ]
+
+
+class BatchRetriever:
+    """
+    One batched ``query()`` per collection for any number of queries. Collections
+    with a BM25 index in ``lexical_indexes`` are searched hybrid: vector and
+    lexical rankings are fused by reciprocal rank, and chunks found only
+    lexically are fetched with one ``get()`` per collection (their ``distance``
+    is None).
+    """
+
+    def __init__(self, embed_queries: Optional[Callable[[List[str]], List[List[float]]]] = None,
+                 max_workers: Optional[int] = None, lexical_indexes: Optional[Dict[str, BM25Index]] = None):
+        # Without embed_queries, collections embed query_texts with their own embedding function
+        self.embed_queries = embed_queries
+        self.lexical_indexes = lexical_indexes or {}
+        self.max_workers = max_workers or int(os.getenv('RETRIEVAL_MAX_WORKERS', '4'))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def close(self):
+        """Shut down the query thread pool."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'BatchRetriever':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def search(self, collections: Dict[str, Any], queries: Dict[str, List[str]], n_results: int = 3,
+               where: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, List[Dict]]]:
+        """
+        Run ``queries`` (collection name -> query texts) against ``collections``
+        (name -> Chroma collection), keeping only chunks whose metadata equals
+        ``where`` (e.g. ``{'content_type': 'core_methodology'}``). Returns
+        collection name -> query -> matches for every query passed in,
+        duplicates included.
+        """
+        # First spelling of each normalized query is the one sent to Chroma
+        unique: Dict[str, Dict[str, str]] = {}
+        for name, texts in queries.items():
+            unique[name] = {}
+            for text in texts:
+                unique[name].setdefault(normalize_query(text), text)
+
+        embeddings: Dict[str, List[float]] = {}
+        if self.embed_queries:
+            texts = list(dict.fromkeys(text for by_key in unique.values() for text in by_key.values()))
+            if texts:
+                embeddings = {normalize_query(text): vector for text, vector in zip(texts, self.embed_queries(texts))}
+
+        def run(name: str) -> Dict[str, List[Dict]]:
+            keys = list(unique[name])
+            if not keys:
+                return {}
+            if self.embed_queries:
+                arguments = {'query_embeddings': [embeddings[key] for key in keys]}
+            else:
+                arguments = {'query_texts': [unique[name][key] for key in keys]}
+            if where:
+                arguments['where'] = chroma_where(where)
+
+            lexical = self.lexical_indexes.get(name)
+            if lexical is None:
+                results = collections[name].query(**arguments, n_results=n_results)
+                return {key: format_matches(results, i) for i, key in enumerate(keys)}
+            return self._hybrid(collections[name], lexical, unique[name], arguments, n_results, where)
+
+        names = [name for name in queries if unique[name]]
+        by_collection = dict(zip(names, self._executor.map(run, names)))
+
+        return {
+            name: {text: list(by_collection[name][normalize_query(text)]) for text in texts}
+            for name, texts in queries.items()
+        }
+
+    def _hybrid(self, collection, lexical: BM25Index, queries: Dict[str, str], arguments: Dict[str, Any],
+                n_results: int, where: Optional[Dict[str, Any]]) -> Dict[str, List[Dict]]:
+        candidates = n_results * HYBRID_CANDIDATES
+        results = collection.query(**arguments, n_results=candidates, include=['documents', 'metadatas', 'distances'])
+
+        records: Dict[str, Dict] = {}
+        fused: Dict[str, List[str]] = {}
+        for i, key in enumerate(queries):
+            vector_ids = results['ids'][i]
+            for match in format_matches(results, i):
+                records[match['id']] = match
+            lexical_ids = [doc_id for doc_id, _ in lexical.search(queries[key], candidates, where)]
+            fused[key] = [doc_id for doc_id, _ in reciprocal_rank_fusion([vector_ids, lexical_ids])[:n_results]]
+
+        missing = list(dict.fromkeys(doc_id for ids in fused.values() for doc_id in ids if doc_id not in records))
+        if missing:
+            fetched = collection.get(ids=missing, include=['documents', 'metadatas'])
+            for j, doc_id in enumerate(fetched['ids']):
+                records[doc_id] = format_match(doc_id, fetched['documents'][j] or '', fetched['metadatas'][j], None)
+
+        # An ID the index knows but the collection no longer has (deleted since the index was saved) is skipped
+        return {key: [records[doc_id] for doc_id in ids if doc_id in records] for key, ids in fused.items()}
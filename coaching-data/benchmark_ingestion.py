@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Ingestion Benchmark Suite
+=========================
+
+Generates synthetic corpora at multiples of ``source-files`` and times each
+ingestion stage against local stand-ins:
+
+- parse:    compendium chunking and team-section extraction
+- classify: content-type, key-concept and department classification
+- embed:    ConcurrentEmbeddingEngine over the stub embedder
+- chroma:   ``_store_chunks_in_collection`` into an in-process ChromaDB (or the
+            NumPy index from ``vector_store``)
+- postgres: the three ``_store_*`` methods, quoting every statement's
+            parameters with a cursor that discards them (or a real database
+            with ``--pg-dsn``, rolled back afterwards)
+
+Results are written as JSON so runs can be diffed between releases:
+
+    python3 coaching-data/benchmark_ingestion.py --scales 1 10 --output coaching-data/benchmark_ingestion.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import logging
+import platform
+import tempfile
+from datetime import datetime
+from typing import Dict, Any, Callable
+
+import psycopg
+from psycopg.types.json import Jsonb
+
+from process_ast_knowledge import ASTKnowledgeProcessor
+from embedding_engine import ConcurrentEmbeddingEngine, stub_embed_fn
+from synthetic_corpus import SyntheticCorpusGenerator, corpus_baseline
+from vector_store import open_vector_store
+
+RESULTS_VERSION = 1
+
+
+class DiscardingCursor:
+    """Postgres stand-in: quotes parameters as a client-side driver would and counts the statements it receives."""
+
+    def __init__(self):
+        self.statements = 0
+        self.bytes = 0
+
+    def _quote(self, value) -> str:
+        if value is None:
+            return 'NULL'
+        if isinstance(value, Jsonb):
+            value = json.dumps(value.obj)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, (int, float)):
+            return str(value)
+        return "'" + str(value).replace("'", "''") + "'"
+
+    async def execute(self, statement, params=None):
+        self.statements += 1
+        self.bytes += len(statement) + sum(len(self._quote(param).encode('utf-8')) for param in params or ())
+
+    async def close(self):
+        pass
+
+
+def record(stages: Dict[str, Dict[str, Any]], name: str, items: int, seconds: float, **extra):
+    stages[name] = {
+        'items': items,
+        'seconds': round(seconds, 4),
+        'items_per_second': round(items / seconds, 1) if seconds > 0 else None,
+        **extra
+    }
+
+
+def timed(stages: Dict[str, Dict[str, Any]], name: str, items: int, fn: Callable[[], Any]) -> Any:
+    start = time.perf_counter()
+    result = fn()
+    record(stages, name, items, time.perf_counter() - start)
+    return result
+
+
+def open_chroma_collections(kind: str) -> Dict[str, Any]:
+    """Empty in-process collections for the chroma stage, keyed by chunk source."""
+    if kind == 'ephemeral':
+        import chromadb
+        client = chromadb.EphemeralClient()
+    else:
+        client = open_vector_store(kind, tempfile.mkdtemp(prefix='ast-bench-chroma-'))
+
+    collections = {}
+    for source, name in (('AST_Compendium', 'bench_ast_methodology'), ('team_profiles', 'bench_team_profiles')):
+        # The ephemeral client is shared across scales, so start each scale empty
+        try:
+            client.delete_collection(name)
+        except Exception:
+            pass
+        collections[source] = client.create_collection(name, embedding_function=None)
+    return collections
+
+
+async def run_scale(scale: float, args, baseline: Dict[str, int]) -> Dict[str, Any]:
+    corpus_dir = tempfile.mkdtemp(prefix=f'ast-bench-{scale:g}x-')
+    stages: Dict[str, Dict[str, Any]] = {}
+
+    try:
+        files = max(1, round(baseline['team_files'] * scale)) + 1
+        corpus = timed(stages, 'generate', files,
+                       lambda: SyntheticCorpusGenerator(args.seed).write(corpus_dir, scale, baseline))
+
+        processor = ASTKnowledgeProcessor(pg_batch_size=args.pg_batch_size, parse_workers=args.parse_workers)
+        batch_size = processor.ingest_batch_size
+
+        def parse():
+            ast_chunks = list(processor.iter_ast_compendium(corpus['compendium_path']))
+            team_chunks = list(processor.iter_team_profiles(corpus['team_pattern']))
+            return ast_chunks, team_chunks
+
+        ast_chunks, team_chunks = timed(stages, 'parse', corpus['team_files'] + 1, parse)
+        chunks = ast_chunks + team_chunks
+
+        def classify():
+            for chunk in ast_chunks:
+                processor._classify_content_type(chunk['title'], chunk['content'])
+                processor._extract_key_concepts(chunk['content'])
+            for chunk in team_chunks:
+                processor._classify_department(chunk['name'], chunk['content'])
+
+        timed(stages, 'classify', len(chunks), classify)
+
+        engine = ConcurrentEmbeddingEngine(
+            stub_embed_fn(dimensions=args.dimensions, latency=args.embed_latency),
+            max_concurrency=args.embed_concurrency,
+            requests_per_second=args.embed_rps
+        )
+        texts = [chunk['content'] for chunk in chunks]
+        start = time.perf_counter()
+        embeddings = await engine.embed_all(texts)
+        record(stages, 'embed', len(texts), time.perf_counter() - start,
+               latency_per_call=args.embed_latency, concurrency=args.embed_concurrency)
+
+        collections = open_chroma_collections(args.chroma)
+        start = time.perf_counter()
+        for source, collection in collections.items():
+            indexed = [(chunk, embedding) for chunk, embedding in zip(chunks, embeddings) if chunk['source'] == source]
+            for i in range(0, len(indexed), batch_size):
+                batch = indexed[i:i + batch_size]
+                await processor._store_chunks_in_collection(
+                    [chunk for chunk, _ in batch], collection, source,
+                    embeddings=[embedding for _, embedding in batch]
+                )
+        record(stages, 'chroma', len(chunks), time.perf_counter() - start, backend=args.chroma)
+
+        if args.pg_dsn:
+            connection = await psycopg.AsyncConnection.connect(args.pg_dsn)
+            cursor = connection.cursor()
+        else:
+            connection, cursor = None, DiscardingCursor()
+
+        start = time.perf_counter()
+        try:
+            for i in range(0, len(ast_chunks), batch_size):
+                await processor._store_knowledge_base(ast_chunks[i:i + batch_size], cursor)
+            for i in range(0, len(team_chunks), batch_size):
+                await processor._store_team_profiles(team_chunks[i:i + batch_size], cursor)
+            for i in range(0, len(chunks), batch_size):
+                await processor._store_vector_metadata(chunks[i:i + batch_size], cursor)
+        finally:
+            if connection:
+                await connection.rollback()
+                await connection.close()
+        rows = sum(table['rows'] for table in processor.pg_write_stats.values())
+        record(stages, 'postgres', rows, time.perf_counter() - start,
+               backend='postgresql' if args.pg_dsn else 'discarding-cursor', tables=processor.pg_write_stats)
+
+        return {
+            'scale': scale,
+            'corpus': {
+                'files': corpus['team_files'] + 1,
+                'bytes': corpus['bytes'],
+                'ast_chunks': len(ast_chunks),
+                'team_chunks': len(team_chunks)
+            },
+            'stages': stages,
+            'total_seconds': round(sum(stage['seconds'] for name, stage in stages.items() if name != 'generate'), 4)
+        }
+    finally:
+        if args.keep_corpus:
+            print(f"📁 Kept {scale:g}x corpus at {corpus_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+
+async def run_benchmarks(args) -> Dict[str, Any]:
+    baseline = corpus_baseline()
+    results = []
+    for scale in args.scales:
+        result = await run_scale(scale, args, baseline)
+        results.append(result)
+        summary = ', '.join(f"{name} {stage['seconds']}s" for name, stage in result['stages'].items())
+        print(f"⏱️ {scale:g}x ({result['corpus']['bytes']:,} bytes): {summary}", file=sys.stderr)
+
+    return {
+        'version': RESULTS_VERSION,
+        'timestamp': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'config': {
+            'seed': args.seed,
+            'baseline': baseline,
+            'embed_latency': args.embed_latency,
+            'embed_concurrency': args.embed_concurrency,
+            'dimensions': args.dimensions,
+            'chroma': args.chroma,
+            'postgres': 'postgresql' if args.pg_dsn else 'discarding-cursor',
+            'pg_batch_size': args.pg_batch_size,
+            'parse_workers': args.parse_workers
+        },
+        'results': results
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the AST ingestion stages on synthetic corpora")
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 10, 100],
+                        help="Corpus sizes as multiples of source-files")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--embed-latency', type=float, default=0.0, help="Stub seconds per embed call")
+    parser.add_argument('--embed-concurrency', type=int, default=8)
+    parser.add_argument('--embed-rps', type=float, default=1e6, help="Initial embed requests per second")
+    parser.add_argument('--dimensions', type=int, default=1024)
+    parser.add_argument('--chroma', choices=['ephemeral', 'persistent', 'numpy'], default='ephemeral',
+                        help="Vector store for the chroma stage (numpy: in-process vector_store index)")
+    parser.add_argument('--pg-dsn', default=None,
+                        help="Benchmark against this PostgreSQL database (writes are rolled back)")
+    parser.add_argument('--pg-batch-size', type=int, default=None)
+    parser.add_argument('--parse-workers', type=int, default=None)
+    parser.add_argument('--keep-corpus', action='store_true', help="Leave the generated corpora on disk")
+    parser.add_argument('--output', help="Also write the results to this JSON file")
+    parser.add_argument('--verbose', action='store_true', help="Keep the processors' per-batch INFO logging")
+    args = parser.parse_args()
+
+    # Per-batch log lines would otherwise dominate the timings of the small stages
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    results = asyncio.run(run_benchmarks(args))
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
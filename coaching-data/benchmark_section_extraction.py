@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Team Section Extraction Benchmark
+=================================
+
+Times the single-pass ``TeamSectionExtractor`` against the per-extractor regex
+functions it replaced, over every team section in ``source-files``, and reports
+how often each extractor's output agrees.
+
+    python3 coaching-data/benchmark_section_extraction.py --repeat 50
+"""
+
+import re
+import json
+import glob
+import time
+import argparse
+from typing import List, Dict, Any, Callable
+
+from process_ast_knowledge import ASTKnowledgeProcessor, TEAM_FILES_PATTERN
+from team_section_extractor import TeamSectionExtractor
+
+EXTRACTORS = ['team_composition', 'strengths_distribution', 'flow_synergies', 'team_insights', 'individual_profiles']
+
+
+class LegacySectionExtraction:
+    """The original regex extractors from ``ASTKnowledgeProcessor``, kept as the baseline."""
+
+    def _extract_team_composition(self, section: str) -> List[Dict[str, str]]:
+        """Extract team member composition."""
+        composition = []
+        
+        # Look for member patterns
+        member_patterns = [
+            r'[*-]\s*\*\*([^*]+)\*\*\s*\(([^)]+)\)\s*[–-]\s*([^\n]+)',
+            r'###\s+([A-Z\s]+)\s*\([^)]+\)\n[^#]+?Background:\s*([^\n]+)'
+        ]
+        
+        for pattern in member_patterns:
+            matches = re.finditer(pattern, section, re.MULTILINE)
+            for match in matches:
+                if len(match.groups()) >= 3:
+                    member = {
+                        'name': match.group(1).strip(),
+                        'role': match.group(2).strip(),
+                        'background': match.group(3).strip()
+                    }
+                    composition.append(member)
+                    
+        return composition
+        
+    def _extract_strengths_distribution(self, section: str) -> Dict[str, List[str]]:
+        """Extract strengths distribution information."""
+        distribution = {}
+        
+        strength_patterns = [
+            r'\*\*(\w+)\s+Dominant\*\*:\s*([^\n]+)',
+            r'(\w+)\s+Dominant:\s*([^\n]+)'
+        ]
+        
+        for pattern in strength_patterns:
+            matches = re.finditer(pattern, section, re.IGNORECASE)
+            for match in matches:
+                strength = match.group(1).strip().title()
+                members = [m.strip() for m in match.group(2).split(',')]
+                distribution[strength] = members
+                
+        return distribution
+        
+    def _extract_flow_synergies(self, section: str) -> List[str]:
+        """Extract flow synergies information."""
+        synergies = []
+        
+        # Look for flow synergies section
+        synergies_match = re.search(
+            r'### Flow Synergies\s*\n([^#]+?)(?=\n###|$)', 
+            section, 
+            re.MULTILINE | re.DOTALL
+        )
+        
+        if synergies_match:
+            synergies_text = synergies_match.group(1)
+            # Extract bullet points
+            bullet_matches = re.finditer(r'[*-]\s*\*\*([^*]+)\*\*:\s*([^\n]+)', synergies_text)
+            for match in bullet_matches:
+                synergy = f"{match.group(1).strip()}: {match.group(2).strip()}"
+                synergies.append(synergy)
+                
+        return synergies
+        
+    def _extract_team_insights(self, section: str) -> List[str]:
+        """Extract key insights about the team."""
+        insights = []
+        
+        insights_patterns = [
+            r'### Key Insights\s*\n([^#]+?)(?=\n###|$)',
+            r'### Insights\s*\n([^#]+?)(?=\n###|$)'
+        ]
+        
+        for pattern in insights_patterns:
+            match = re.search(pattern, section, re.MULTILINE | re.DOTALL)
+            if match:
+                insights_text = match.group(1).strip()
+                # Split into sentences
+                sentences = re.split(r'[.!?]+', insights_text)
+                insights.extend([s.strip() for s in sentences if len(s.strip()) > 20])
+                
+        return insights
+        
+    def _extract_individual_profiles(self, section: str) -> List[Dict[str, Any]]:
+        """Extract individual team member profiles."""
+        profiles = []
+        
+        # Look for individual profile sections
+        profile_pattern = r'###\s+([A-Z\s]+(?:\([^)]+\))?)(?:\n|\s)([^#]+?)(?=\n###|$)'
+        matches = re.finditer(profile_pattern, section, re.MULTILINE | re.DOTALL)
+        
+        for match in matches:
+            name_and_role = match.group(1).strip()
+            profile_content = match.group(2).strip()
+            
+            profile = {
+                'name_role': name_and_role,
+                'content': profile_content,
+                'strengths': self._extract_individual_strengths(profile_content),
+                'flow_indicators': self._extract_flow_indicators(profile_content)
+            }
+            
+            profiles.append(profile)
+            
+        return profiles
+        
+    def _extract_individual_strengths(self, content: str) -> Dict[str, str]:
+        """Extract individual strengths profile."""
+        strengths = {}
+        
+        # Look for strengths profile section
+        strengths_match = re.search(
+            r'\*\*Strengths Profile:\*\*\s*\n((?:\d+\.\s+[^\n]+\n?)+)', 
+            content
+        )
+        
+        if strengths_match:
+            strengths_text = strengths_match.group(1)
+            strength_lines = re.finditer(r'\d+\.\s+(\w+)\s+\(([^)]+)\)\s*[–-]\s*([^\n]+)', strengths_text)
+            
+            for match in strength_lines:
+                strength_name = match.group(1)
+                percentage = match.group(2)
+                description = match.group(3)
+                strengths[strength_name] = {
+                    'percentage': percentage,
+                    'description': description
+                }
+                
+        return strengths
+        
+    def _extract_flow_indicators(self, content: str) -> List[str]:
+        """Extract flow state indicators."""
+        indicators = []
+        
+        flow_match = re.search(
+            r'\*\*Flow State Indicators:\*\*\s*\n([^*]+?)(?=\n\*\*|$)', 
+            content
+        )
+        
+        if flow_match:
+            flow_text = flow_match.group(1).strip()
+            # Extract bullet points or list items
+            indicator_matches = re.finditer(r'[*-]\s*([^\n]+)', flow_text)
+            for match in indicator_matches:
+                indicators.append(match.group(1).strip())
+                
+        return indicators
+
+
+def legacy_extract(section: str) -> Dict[str, Any]:
+    legacy = LegacySectionExtraction()
+    return {
+        'team_composition': legacy._extract_team_composition(section),
+        'strengths_distribution': legacy._extract_strengths_distribution(section),
+        'flow_synergies': legacy._extract_flow_synergies(section),
+        'team_insights': legacy._extract_team_insights(section),
+        'individual_profiles': legacy._extract_individual_profiles(section)
+    }
+
+
+def engine_extract(section: str) -> Dict[str, Any]:
+    extractor = TeamSectionExtractor(section)
+    return {name: getattr(extractor, name)() for name in EXTRACTORS}
+
+
+def load_sections(pattern: str) -> List[str]:
+    processor = ASTKnowledgeProcessor()
+    sections = []
+    for file_path in sorted(glob.glob(pattern)):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            sections.extend(processor._split_team_sections(f.read()))
+    return sections
+
+
+def time_extraction(extract_fn: Callable[[str], Dict[str, Any]], sections: List[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for section in sections:
+            extract_fn(section)
+    return time.perf_counter() - start
+
+
+def count_items(results: List[Dict[str, Any]], name: str) -> int:
+    return sum(len(result[name]) for result in results)
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    sections = load_sections(args.pattern)
+    if not sections:
+        raise SystemExit(f"No team sections found for {args.pattern}")
+
+    legacy_seconds = time_extraction(legacy_extract, sections, args.repeat)
+    engine_seconds = time_extraction(engine_extract, sections, args.repeat)
+
+    legacy_results = [legacy_extract(section) for section in sections]
+    engine_results = [engine_extract(section) for section in sections]
+
+    agreement = {}
+    for name in EXTRACTORS:
+        agreement[name] = {
+            'identical_sections': sum(1 for old, new in zip(legacy_results, engine_results) if old[name] == new[name]),
+            'legacy_items': count_items(legacy_results, name),
+            'engine_items': count_items(engine_results, name)
+        }
+
+    profile_fields = {}
+    for field in ('strengths', 'flow_indicators'):
+        profile_fields[field] = {
+            label: sum(len(profile[field]) for result in results for profile in result['individual_profiles'])
+            for label, results in (('legacy_items', legacy_results), ('engine_items', engine_results))
+        }
+
+    calls = len(sections) * args.repeat
+    return {
+        'sections': len(sections),
+        'repeat': args.repeat,
+        'legacy_seconds': round(legacy_seconds, 4),
+        'engine_seconds': round(engine_seconds, 4),
+        'legacy_sections_per_second': round(calls / legacy_seconds, 1),
+        'engine_sections_per_second': round(calls / engine_seconds, 1),
+        'speedup': round(legacy_seconds / engine_seconds, 2),
+        'agreement': agreement,
+        'profile_fields': profile_fields
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark team-section metadata extraction")
+    parser.add_argument('--pattern', default=TEAM_FILES_PATTERN, help="Glob of team profile files")
+    parser.add_argument('--repeat', type=int, default=20, help="Passes over the corpus per timing")
+    parser.add_argument('--output', help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
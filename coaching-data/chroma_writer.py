@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Batched ChromaDB Writer
+=======================
+
+Splits upserts into sub-batches bounded by record count and estimated payload
+size, keeps several sub-batches in flight on a thread pool (the Chroma client
+is blocking), and retries only the sub-batches that fail. A sub-batch that
+keeps failing is bisected so a single bad record is isolated instead of
+failing its neighbours. Per-batch latency is recorded for the reports.
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Serialized size of one embedding float in an HTTP upsert payload (JSON text)
+EMBEDDING_FLOAT_BYTES = 20
+
+
+class ChromaWriteError(Exception):
+    """Raised after a write when some records could not be stored even on their own."""
+
+    def __init__(self, collection_name: str, failed_ids: List[str], last_error: Exception):
+        self.failed_ids = failed_ids
+        self.last_error = last_error
+        super().__init__(f"{len(failed_ids)} records could not be stored in {collection_name}: {last_error}")
+
+
+def record_bytes(record_id: str, document: str, metadata: Dict[str, Any],
+                 embedding: Optional[List[float]] = None) -> int:
+    """Estimated serialized size of one record in an upsert request."""
+    size = len(record_id) + len(document.encode('utf-8')) + len(json.dumps(metadata, default=str))
+    if embedding is not None:
+        size += len(embedding) * EMBEDDING_FLOAT_BYTES
+    return size
+
+
+class ChromaBatchWriter:
+    """Size-aware, pipelined ``collection.upsert`` with per-sub-batch retries."""
+
+    def __init__(self, max_records: Optional[int] = None, max_bytes: Optional[int] = None,
+                 max_in_flight: Optional[int] = None, max_retries: int = 3, base_backoff: float = 0.5):
+        self.max_records = max_records or int(os.getenv('CHROMA_BATCH_RECORDS', '256'))
+        self.max_bytes = max_bytes or int(os.getenv('CHROMA_BATCH_BYTES', str(2 * 1024 * 1024)))
+        self.max_in_flight = max_in_flight or int(os.getenv('CHROMA_MAX_IN_FLIGHT', '4'))
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight)
+
+    def split(self, sizes: List[int]) -> List[range]:
+        """Index ranges of consecutive records within both the record and the byte limit."""
+        batches = []
+        start, batch_bytes = 0, 0
+        for i, size in enumerate(sizes):
+            if i > start and (i - start >= self.max_records or batch_bytes + size > self.max_bytes):
+                batches.append(range(start, i))
+                start, batch_bytes = i, 0
+            batch_bytes += size
+        if start < len(sizes):
+            batches.append(range(start, len(sizes)))
+        return batches
+
+    async def upsert(self, collection, collection_name: str, ids: List[str], documents: List[str],
+                     metadatas: List[Dict[str, Any]], embeddings: Optional[List[List[float]]] = None):
+        """
+        Upsert records in sub-batches. Raises ChromaWriteError once every other
+        record is stored if some records failed even in a sub-batch of their own.
+        """
+        sizes = [
+            record_bytes(ids[i], documents[i], metadatas[i], embeddings[i] if embeddings is not None else None)
+            for i in range(len(ids))
+        ]
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        stats = self.stats.setdefault(collection_name, {
+            'records': 0, 'batches': 0, 'retries': 0, 'failed_ids': [], 'latencies': []
+        })
+
+        async def write(indexes: range, attempts: int) -> List[Tuple[str, Exception]]:
+            payload = {
+                'ids': [ids[i] for i in indexes],
+                'documents': [documents[i] for i in indexes],
+                'metadatas': [metadatas[i] for i in indexes]
+            }
+            if embeddings is not None:
+                payload['embeddings'] = [embeddings[i] for i in indexes]
+
+            last_error = None
+            for attempt in range(attempts):
+                async with semaphore:
+                    start = time.perf_counter()
+                    try:
+                        await asyncio.get_running_loop().run_in_executor(
+                            self._executor, lambda: collection.upsert(**payload)
+                        )
+                        stats['latencies'].append(time.perf_counter() - start)
+                        stats['records'] += len(indexes)
+                        stats['batches'] += 1
+                        return []
+                    except Exception as e:
+                        last_error = e
+                if attempt < attempts - 1:
+                    stats['retries'] += 1
+                    await asyncio.sleep(self.base_backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+            if len(indexes) == 1:
+                logger.error(f"❌ Record {ids[indexes[0]]} rejected by {collection_name}: {last_error}")
+                return [(ids[indexes[0]], last_error)]
+
+            # Bisect so only the records that actually fail are left out. Transient
+            # errors were already retried above, so each half gets a single attempt.
+            middle = len(indexes) // 2
+            logger.warning(f"⚠️ Batch of {len(indexes)} failed in {collection_name} - retrying as two halves")
+            halves = await asyncio.gather(write(indexes[:middle], 1), write(indexes[middle:], 1))
+            return halves[0] + halves[1]
+
+        results = await asyncio.gather(*[write(batch, self.max_retries) for batch in self.split(sizes)])
+        failed = [failure for batch_failed in results for failure in batch_failed]
+        if failed:
+            stats['failed_ids'].extend(record_id for record_id, _ in failed)
+            raise ChromaWriteError(collection_name, [record_id for record_id, _ in failed], failed[-1][1])
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-collection totals and sub-batch latency percentiles (seconds)."""
+        report = {}
+        for name, stats in self.stats.items():
+            latencies = sorted(stats['latencies'])
+
+            def percentile(p: float) -> Optional[float]:
+                if not latencies:
+                    return None
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 4)
+
+            report[name] = {
+                'records': stats['records'],
+                'batches': stats['batches'],
+                'retries': stats['retries'],
+                'failed': len(stats['failed_ids']),
+                'failed_ids': stats['failed_ids'][:20],
+                'latency_p50': percentile(0.5),
+                'latency_p95': percentile(0.95),
+                'latency_max': round(latencies[-1], 4) if latencies else None,
+                'seconds': round(sum(latencies), 4)
+            }
+        return report
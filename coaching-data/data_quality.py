@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Data Quality Stage
+==================
+
+Quality statistics and duplicate detection for the ingestion stream:
+
+- content lengths and metadata completeness are kept as NumPy arrays and
+  summarized with vectorized operations
+- exact duplicates are found with a stable SHA-256 of the normalized content
+  (Python's ``hash()`` is salted per process, so its answers vary between runs)
+- near duplicates are found with MinHash signatures over word shingles and
+  banded locality-sensitive hashing, so each chunk is only compared with the
+  few chunks sharing a band bucket rather than with every earlier chunk.
+  Signatures and band keys for a whole batch are computed as single NumPy
+  operations over every shingle in the batch; only the bucket lookups are per chunk
+
+``DataQualityStage.filter`` wraps the chunk iterator ahead of the router,
+checking chunks in batches of ``QUALITY_BATCH_SIZE``. With ``drop_duplicates``
+it withholds exact and near duplicates from every sink, so they are never
+embedded or stored.
+"""
+
+import os
+import re
+import zlib
+import hashlib
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from embedding_cache import normalize_text
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+WORD_RE = re.compile(r'\w+')
+SHORT_CHUNK_CHARS = 100
+QUALITY_BATCH_SIZE = 64
+
+
+def stable_content_hash(text: str) -> str:
+    """Run-independent content hash (SHA-256 of the normalized text)."""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    (bands, rows) with bands * rows == num_perm whose S-curve midpoint
+    ``(1 / bands) ** (1 / rows)`` is closest to the similarity threshold.
+    """
+    candidates = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    return min(candidates, key=lambda band: abs((1 / band[0]) ** (1 / band[1]) - threshold))
+
+
+class MinHasher:
+    """MinHash signatures of word shingles using universal hashing modulo a Mersenne prime."""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Below 2**31 so a * x + b stays under 2**63 for 32-bit shingle hashes
+        self._a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        words = WORD_RE.findall(text.lower())
+        size = min(self.shingle_size, len(words)) or 1
+        shingles = {' '.join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+        return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.signatures([text])[0]
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """
+        (len(texts), num_perm) signature matrix: every permutation is applied to
+        every shingle of the batch in one operation, then minimized per text.
+        """
+        if not texts:
+            return np.empty((0, self.num_perm), dtype=np.uint64)
+        shingles = [self.shingles(text) for text in texts]
+        offsets = np.cumsum([0] + [len(hashes) for hashes in shingles[:-1]])
+        hashes = np.concatenate(shingles)
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % MERSENNE_PRIME
+        return np.minimum.reduceat(permuted, offsets, axis=1).T
+
+
+class NearDuplicateIndex:
+    """Banded LSH over MinHash signatures; candidates are confirmed by estimated Jaccard similarity."""
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, shingle_size: int = 5):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+        # Each band's rows are folded into one 64-bit bucket key; collisions only add candidates
+        self._band_weights = np.random.default_rng(0).integers(1, 1 << 63, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(self.bands)]
+        self._signatures: List[np.ndarray] = []
+        self._ids: List[str] = []
+        self.comparisons = 0
+
+    def query_and_add(self, chunk_id: str, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Return ``(earlier chunk ID, estimated Jaccard)`` for the most similar
+        earlier chunk at or above the threshold, else index the chunk and return None.
+        """
+        return self.query_and_add_batch([chunk_id], [text])[0]
+
+    def query_and_add_batch(self, chunk_ids: List[str], texts: List[str]) -> List[Optional[Tuple[str, float]]]:
+        """``query_and_add`` for a batch, in order, so later chunks are also checked against earlier ones in it."""
+        signatures = self.hasher.signatures(texts)
+        with np.errstate(over='ignore'):
+            keys = (signatures.reshape(len(texts), self.bands, self.rows) * self._band_weights).sum(axis=2)
+        return [self._query_and_add(chunk_id, signature, band_keys)
+                for chunk_id, signature, band_keys in zip(chunk_ids, signatures, keys.tolist())]
+
+    def _query_and_add(self, chunk_id: str, signature: np.ndarray, keys: List[int]) -> Optional[Tuple[str, float]]:
+        candidates = set()
+        for buckets, key in zip(self._buckets, keys):
+            candidates.update(buckets.get(key, ()))
+
+        best = None
+        if candidates:
+            positions = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            similarity = (np.stack([self._signatures[i] for i in positions]) == signature).mean(axis=1)
+            self.comparisons += len(positions)
+            top = int(np.argmax(similarity))
+            if similarity[top] >= self.threshold:
+                best = (self._ids[positions[top]], float(similarity[top]))
+        if best:
+            return best
+
+        position = len(self._ids)
+        self._ids.append(chunk_id)
+        self._signatures.append(signature)
+        for buckets, key in zip(self._buckets, keys):
+            buckets.setdefault(key, []).append(position)
+        return None
+
+
+class DataQualityStage:
+    """Streaming quality statistics with exact and near-duplicate detection."""
+
+    def __init__(self, drop_duplicates: Optional[bool] = None, threshold: Optional[float] = None,
+                 num_perm: int = 128, shingle_size: int = 5):
+        self.drop_duplicates = (os.getenv('QUALITY_DROP_DUPLICATES', '').lower() in ('1', 'true', 'yes')
+                                if drop_duplicates is None else drop_duplicates)
+        self.near_duplicates = NearDuplicateIndex(
+            threshold if threshold is not None else float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.85')),
+            num_perm, shingle_size
+        )
+        self.lengths: List[int] = []
+        self.metadata_keys: Dict[str, int] = {}
+        self.metadata_filled: List[List[int]] = []
+        self.content_hashes: Dict[str, str] = {}
+        self.duplicates: List[Dict[str, Any]] = []
+        self.dropped = 0
+
+    def add(self, chunk: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Record a chunk; returns a description of what it duplicates, if anything."""
+        return self.add_many([chunk])[0]
+
+    def add_many(self, chunks: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Record chunks in order; returns what each one duplicates, if anything."""
+        duplicates: List[Optional[Dict[str, Any]]] = []
+        unique = []
+        for chunk in chunks:
+            self.lengths.append(len(chunk['content']))
+            filled = []
+            for key, value in chunk['metadata'].items():
+                column = self.metadata_keys.setdefault(key, len(self.metadata_keys))
+                if value:
+                    filled.append(column)
+            self.metadata_filled.append(filled)
+
+            content_hash = stable_content_hash(chunk['content'])
+            original = self.content_hashes.get(content_hash)
+            if original is not None:
+                duplicates.append({'id': chunk['id'], 'duplicate_of': original, 'similarity': 1.0, 'exact': True})
+            else:
+                self.content_hashes[content_hash] = chunk['id']
+                duplicates.append(None)
+                unique.append(len(duplicates) - 1)
+
+        # Near-duplicate checks for the batch's first copies, signed together
+        matches = self.near_duplicates.query_and_add_batch([chunks[i]['id'] for i in unique],
+                                                           [chunks[i]['content'] for i in unique])
+        for i, match in zip(unique, matches):
+            if match:
+                duplicates[i] = {'id': chunks[i]['id'], 'duplicate_of': match[0],
+                                 'similarity': round(match[1], 4), 'exact': False}
+
+        for chunk, duplicate in zip(chunks, duplicates):
+            if duplicate:
+                duplicate['title'] = chunk.get('title', '')
+                self.duplicates.append(duplicate)
+        return duplicates
+
+    async def add_batch(self, chunks: List[Dict[str, Any]]):
+        self.add_many(chunks)
+
+    def filter(self, chunks: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Record every chunk, passing on all of them or, with drop_duplicates, only first copies."""
+        batch = []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= QUALITY_BATCH_SIZE:
+                yield from self._filter_batch(batch)
+                batch = []
+        yield from self._filter_batch(batch)
+
+    def _filter_batch(self, chunks: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for chunk, duplicate in zip(chunks, self.add_many(chunks)):
+            if duplicate and self.drop_duplicates:
+                self.dropped += 1
+                continue
+            yield chunk
+
+    def report(self) -> Dict[str, Any]:
+        """Quality summary in the data_quality_report.json layout."""
+        total = len(self.lengths)
+        lengths = np.asarray(self.lengths, dtype=np.int64)
+        completeness = np.zeros((total, len(self.metadata_keys)), dtype=bool)
+        rows = np.repeat(np.arange(total), [len(filled) for filled in self.metadata_filled])
+        columns = np.fromiter((column for filled in self.metadata_filled for column in filled),
+                              dtype=np.int64, count=len(rows))
+        completeness[rows, columns] = True
+
+        exact = sum(1 for duplicate in self.duplicates if duplicate['exact'])
+        near = len(self.duplicates) - exact
+        report = {
+            'total_chunks': total,
+            'validation_results': {
+                'content_length': {
+                    'average': float(lengths.mean()) if total else 0.0,
+                    'minimum': int(lengths.min()) if total else 0,
+                    'maximum': int(lengths.max()) if total else 0,
+                    'p50': float(np.percentile(lengths, 50)) if total else 0.0,
+                    'p95': float(np.percentile(lengths, 95)) if total else 0.0,
+                    'very_short_chunks': int((lengths < SHORT_CHUNK_CHARS).sum())
+                },
+                'metadata_completeness': {
+                    key: float(completeness[:, column].mean() * 100) if total else 0.0
+                    for key, column in self.metadata_keys.items()
+                },
+                'duplicates': len(self.duplicates),
+                'exact_duplicates': exact,
+                'near_duplicates': near,
+                'near_duplicate_threshold': self.near_duplicates.threshold,
+                'lsh_comparisons': self.near_duplicates.comparisons,
+                'duplicates_dropped': self.dropped,
+                'duplicate_examples': self.duplicates[:25]
+            },
+            'issues_found': [],
+            'recommendations': []
+        }
+
+        if report['validation_results']['content_length']['very_short_chunks'] > total * 0.1:
+            report['issues_found'].append("High number of very short content chunks")
+            report['recommendations'].append("Consider combining short chunks or filtering them out")
+
+        if self.duplicates:
+            report['issues_found'].append(f"Found {exact} exact and {near} near-duplicate content chunks")
+            if not self.drop_duplicates:
+                report['recommendations'].append("Set QUALITY_DROP_DUPLICATES=1 to skip duplicates before embedding")
+        return report
@@ -7,13 +7,22 @@ Test the AI coaching system with real AST methodology and team data.
 Demonstrates semantic search, coaching recommendations, and team insights.
 """
 
+import os
+import time
 import asyncio
 import json
+import boto3
 import requests
-import chromadb
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
 
+from embedding_cache import open_embedding_cache
+from embedding_engine import titan_embed_fn
+from retrieval_cache import RetrievalCache, collection_version
+from batch_retrieval import BatchRetriever
+from vector_store import open_vector_store
+from lexical_index import open_lexical_indexes
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -22,10 +31,49 @@ class ASTCoachingDemo:
     
     def __init__(self):
         self.api_base = "http://localhost:8080/api/coaching"
-        self.chroma_client = chromadb.HttpClient(host="localhost", port=8000)
+        self.chroma_client = open_vector_store()
         self.ast_collection = None
         self.teams_collection = None
+        self.embedding_model = "amazon.titan-embed-text-v2:0"
+        self.embedding_dimensions = 1024
+        self.embedding_cache = open_embedding_cache()
+        self.embed_query = None
+        self.retrieval_cache = RetrievalCache()
+        # Seconds between collection-version checks; cached results are never older than this after a re-ingest
+        self.version_check_interval = float(os.getenv('RETRIEVAL_VERSION_CHECK', '5'))
+        self._version_checked: Dict[str, float] = {}
+        
+        # Query with the same Titan embeddings used at ingestion when Bedrock is configured
+        if os.getenv('AWS_ACCESS_KEY_ID'):
+            bedrock_client = boto3.client(
+                service_name='bedrock-runtime',
+                region_name=os.getenv('AWS_BEDROCK_REGION', 'us-east-1')
+            )
+            self.embed_query = titan_embed_fn(bedrock_client, self.embedding_model, self.embedding_dimensions)
+            
+        # Vector results are fused with the BM25 indexes written at ingestion
+        self.lexical_indexes = open_lexical_indexes(["ast_methodology", "team_profiles"])
+        self.retriever = BatchRetriever(self._embed_queries if self.embed_query else None,
+                                        lexical_indexes=self.lexical_indexes)
         
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed queries with Titan, reusing cached vectors and embedding only the misses."""
+        if not self.embedding_cache:
+            return [self.embed_query(query) for query in queries]
+            
+        vectors = self.embedding_cache.get_many(self.embedding_model, self.embedding_dimensions, queries)
+        missing = [query for query, vector in zip(queries, vectors) if vector is None]
+        computed = {query: self.embed_query(query) for query in dict.fromkeys(missing)}
+        self.embedding_cache.put_many(self.embedding_model, self.embedding_dimensions,
+                                      list(computed), list(computed.values()))
+        return [vector if vector is not None else computed[query] for query, vector in zip(queries, vectors)]
+        
+    def close(self):
+        """Release the retriever's thread pool and the embedding cache."""
+        self.retriever.close()
+        if self.embedding_cache:
+            self.embedding_cache.close()
+            
     async def initialize(self):
         """Initialize collections for direct ChromaDB queries."""
         try:
@@ -35,49 +83,76 @@ class ASTCoachingDemo:
         except Exception as e:
             logger.warning(f"⚠️ Could not load collections: {e}")
             
-    def search_ast_knowledge(self, query: str, n_results: int = 3) -> List[Dict]:
-        """Search AST methodology knowledge."""
-        try:
-            results = self.ast_collection.query(
-                query_texts=[query],
-                n_results=n_results
-            )
-            
-            matches = []
-            if results['documents'][0]:
-                for i, doc in enumerate(results['documents'][0]):
-                    match = {
-                        'content': doc[:500] + "..." if len(doc) > 500 else doc,
-                        'metadata': results['metadatas'][0][i] if results['metadatas'][0] else {},
-                        'distance': results['distances'][0][i] if results['distances'][0] else 0
-                    }
-                    matches.append(match)
+    def _collection(self, collection_name: str):
+        return self.ast_collection if collection_name == "ast_methodology" else self.teams_collection
+        
+    def _current_version(self, collection_name: str) -> int:
+        """Collection version, re-read from ChromaDB at most every version_check_interval seconds."""
+        now = time.monotonic()
+        if now - self._version_checked.get(collection_name, float('-inf')) >= self.version_check_interval:
+            collection = self.chroma_client.get_collection(collection_name)
+            if collection_name == "ast_methodology":
+                self.ast_collection = collection
+            else:
+                self.teams_collection = collection
+            self._version_checked[collection_name] = now
+            if self.retrieval_cache.observe_version(collection_name, collection_version(collection)):
+                self.lexical_indexes[collection_name].reload()
+        return collection_version(self._collection(collection_name))
+        
+    def search_many(self, queries: Dict[str, List[str]], n_results: int = 3,
+                    where: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, List[Dict]]]:
+        """
+        Search several collections at once (collection name -> query texts),
+        optionally filtered on metadata such as content_type or department.
+        Cached results are reused; the remaining queries go out as one batched
+        hybrid (vector + BM25) search per collection, in parallel.
+        """
+        results: Dict[str, Dict[str, List[Dict]]] = {}
+        misses: Dict[str, List[str]] = {}
+        keys = {}
+        
+        for collection_name, texts in queries.items():
+            version = self._current_version(collection_name)
+            results[collection_name] = {}
+            for query in texts:
+                key = self.retrieval_cache.key(collection_name, version, n_results, query, where)
+                cached = self.retrieval_cache.get(key)
+                if cached is None:
+                    misses.setdefault(collection_name, []).append(query)
+                    keys[(collection_name, query)] = key
+                else:
+                    results[collection_name][query] = list(cached)
                     
-            return matches
+        if misses:
+            collections = {name: self._collection(name) for name in misses}
+            fetched = self.retriever.search(collections, misses, n_results, where)
+            for collection_name, by_query in fetched.items():
+                for query, matches in by_query.items():
+                    self.retrieval_cache.put(keys[(collection_name, query)], matches)
+                    results[collection_name][query] = list(matches)
+                    
+        return results
+        
+    def _search(self, collection_name: str, query: str, n_results: int,
+                where: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        return self.search_many({collection_name: [query]}, n_results, where)[collection_name][query]
+        
+    def search_ast_knowledge(self, query: str, n_results: int = 3, content_type: Optional[str] = None) -> List[Dict]:
+        """Search AST methodology knowledge, optionally limited to one content type."""
+        try:
+            return self._search("ast_methodology", query, n_results,
+                                {'content_type': content_type} if content_type else None)
             
         except Exception as e:
             logger.error(f"❌ AST knowledge search failed: {e}")
             return []
             
-    def search_team_profiles(self, query: str, n_results: int = 3) -> List[Dict]:
-        """Search team profiles."""
+    def search_team_profiles(self, query: str, n_results: int = 3, department: Optional[str] = None) -> List[Dict]:
+        """Search team profiles, optionally limited to one department."""
         try:
-            results = self.teams_collection.query(
-                query_texts=[query],
-                n_results=n_results
-            )
-            
-            matches = []
-            if results['documents'][0]:
-                for i, doc in enumerate(results['documents'][0]):
-                    match = {
-                        'content': doc[:500] + "..." if len(doc) > 500 else doc,
-                        'metadata': results['metadatas'][0][i] if results['metadatas'][0] else {},
-                        'distance': results['distances'][0][i] if results['distances'][0] else 0
-                    }
-                    matches.append(match)
-                    
-            return matches
+            return self._search("team_profiles", query, n_results,
+                                {'department': department} if department else None)
             
         except Exception as e:
             logger.error(f"❌ Team profile search failed: {e}")
@@ -90,8 +165,19 @@ class ASTCoachingDemo:
         print(f"Situation: {scenario['situation']}")
         print(f"Question: {scenario['question']}")
         
+        # Both collections are searched together, in parallel
+        try:
+            found = self.search_many({
+                "ast_methodology": [scenario['query']],
+                "team_profiles": [scenario['team_query']]
+            })
+            ast_results = found["ast_methodology"][scenario['query']]
+            team_results = found["team_profiles"][scenario['team_query']]
+        except Exception as e:
+            logger.error(f"❌ Coaching search failed: {e}")
+            ast_results, team_results = [], []
+            
         print(f"\n🧠 Searching AST Knowledge...")
-        ast_results = self.search_ast_knowledge(scenario['query'])
         
         if ast_results:
             print(f"✅ Found {len(ast_results)} relevant AST concepts:")
@@ -102,7 +188,6 @@ class ASTCoachingDemo:
                 print(f"      {result['content'][:200]}...")
                 
         print(f"\n👥 Searching Team Examples...")
-        team_results = self.search_team_profiles(scenario['team_query'])
         
         if team_results:
             print(f"✅ Found {len(team_results)} relevant team examples:")
@@ -227,6 +312,10 @@ Based on the AST methodology and similar team experiences, here's my recommendat
         print("   • Generated personalized coaching recommendations")
         print("   • Combined theoretical knowledge with practical examples")
         print("   • Provided actionable next steps for each scenario")
+        
+        cache = self.retrieval_cache.stats()
+        print(f"   • Served {cache['hits']} of {cache['hits'] + cache['misses']} searches from the retrieval cache "
+              f"({cache['hit_rate']:.0%} hit rate)")
         print("")
         print("🚀 Ready for production coaching conversations!")
         
@@ -258,11 +347,14 @@ async def main():
     """Run the interactive demo."""
     demo = ASTCoachingDemo()
     
-    # Test API endpoints first
-    demo.test_api_endpoints()
-    
-    # Run coaching scenarios
-    await demo.run_demo_scenarios()
+    try:
+        # Test API endpoints first
+        demo.test_api_endpoints()
+        
+        # Run coaching scenarios
+        await demo.run_demo_scenarios()
+    finally:
+        demo.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Persistent Embedding Cache
+==========================
+
+SQLite blob store for embedding vectors, keyed by model ID, dimensions and a
+hash of the normalized text. Vectors are stored as packed float32, the total
+size is bounded with least-recently-used eviction, and hit/miss counters show
+how much embedding work a run actually paid for.
+
+Shared by ingestion (``EnhancedASTProcessor.create_embeddings``) and the
+query-time search path in ``demo_ast_coaching.py``.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from typing import List, Dict, Any, Optional, Callable
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "coaching-data/embedding_cache.sqlite"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different copies share a cache entry."""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def cache_key(model_id: str, dimensions: int, text: str) -> str:
+    """Cache key for one (model, dimensions, normalized text) combination."""
+    text_hash = hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+    return f"{model_id}:{dimensions}:{text_hash}"
+
+
+class EmbeddingCache:
+    """Size-bounded, persistent float32 embedding cache."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)")
+        self._conn.commit()
+        self.total_bytes = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model_id: str, dimensions: int, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up texts, returning a vector for each hit and None for each miss."""
+        keys = [cache_key(model_id, dimensions, text) for text in texts]
+        found = {}
+
+        with self._lock:
+            unique_keys = list(dict.fromkeys(keys))
+            for i in range(0, len(unique_keys), 500):
+                batch = unique_keys[i:i + 500]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+
+        results = []
+        for key in keys:
+            blob = found.get(key)
+            if blob is None:
+                self.misses += 1
+                results.append(None)
+            else:
+                self.hits += 1
+                results.append(np.frombuffer(blob, dtype=np.float32).tolist())
+        return results
+
+    def put_many(self, model_id: str, dimensions: int, texts: List[str], vectors: List[List[float]]):
+        """Store vectors for texts, evicting least-recently-used entries past the size bound."""
+        if not texts:
+            return
+
+        now = time.time()
+        rows = {}
+        for text, vector in zip(texts, vectors):
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            rows[cache_key(model_id, dimensions, text)] = (blob, len(blob), now)
+
+        with self._lock:
+            replaced = self._stored_sizes(list(rows))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, size_bytes, last_access) VALUES (?, ?, ?, ?)",
+                [(key, blob, size, accessed) for key, (blob, size, accessed) in rows.items()]
+            )
+            self.total_bytes += sum(size for _, size, _ in rows.values()) - replaced
+            self._evict()
+            self._conn.commit()
+
+    def get_or_compute(self, model_id: str, dimensions: int, text: str,
+                       compute_fn: Callable[[str], List[float]]) -> List[float]:
+        """Return the cached vector for text, computing and storing it on a miss."""
+        vector = self.get_many(model_id, dimensions, [text])[0]
+        if vector is None:
+            vector = compute_fn(text)
+            self.put_many(model_id, dimensions, [text], [vector])
+        return vector
+
+    def _stored_sizes(self, keys: List[str]) -> int:
+        total = 0
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            placeholders = ','.join('?' * len(batch))
+            total += self._conn.execute(
+                f"SELECT COALESCE(SUM(size_bytes), 0) FROM embeddings WHERE key IN ({placeholders})", batch
+            ).fetchone()[0]
+        return total
+
+    def _evict(self):
+        """Drop least-recently-used entries until the cache is back under 90% of its bound."""
+        if self.total_bytes <= self.max_bytes:
+            return
+
+        target = int(self.max_bytes * 0.9)
+        cursor = self._conn.execute("SELECT key, size_bytes FROM embeddings ORDER BY last_access ASC")
+        evicted_keys = []
+        for key, size in cursor:
+            if self.total_bytes <= target:
+                break
+            evicted_keys.append((key,))
+            self.total_bytes -= size
+
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", evicted_keys)
+        self.evictions += len(evicted_keys)
+        logger.info(f"🧹 Evicted {len(evicted_keys)} embeddings from cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'evictions': self.evictions,
+            'entries': entries,
+            'total_bytes': self.total_bytes,
+            'max_bytes': self.max_bytes
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_embedding_cache() -> Optional[EmbeddingCache]:
+    """Open the cache configured by EMBEDDING_CACHE_PATH / EMBEDDING_CACHE_MAX_MB ('off' disables it)."""
+    path = os.getenv('EMBEDDING_CACHE_PATH', DEFAULT_CACHE_PATH)
+    if path.lower() in ('', 'off', 'none'):
+        return None
+
+    max_bytes = int(float(os.getenv('EMBEDDING_CACHE_MAX_MB', DEFAULT_MAX_BYTES / (1024 * 1024))) * 1024 * 1024)
+    try:
+        return EmbeddingCache(path, max_bytes=max_bytes)
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ Embedding cache unavailable at {path}: {e}")
+        return None
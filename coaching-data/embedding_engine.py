@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Concurrent Embedding Engine
+===========================
+
+Bounded-parallelism embedding for the AST knowledge pipeline. Blocking embed
+calls (e.g. Bedrock ``invoke_model``) run on a worker thread pool behind a
+semaphore, an adaptive token bucket paces requests and backs off when the
+provider throttles, and each text retries independently so one slow or failing
+item never stalls the rest of the batch. Only throttling and transient errors
+(timeouts, dropped connections, 5xx) are retried; anything else, such as a
+validation or access-denied error, cannot succeed on retry and is raised at once.
+
+Run directly to measure throughput offline against the local stub embedder:
+
+    python3 coaching-data/embedding_engine.py --texts 500 --concurrency 16 --latency 0.05
+"""
+
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+THROTTLING_ERROR_CODES = {
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceQuotaExceededException',
+    'ProvisionedThroughputExceededException'
+}
+
+TRANSIENT_ERROR_CODES = {
+    'ServiceUnavailableException',
+    'InternalServerException',
+    'ModelTimeoutException',
+    'ModelNotReadyException',
+    'RequestTimeout',
+    'RequestTimeoutException'
+}
+
+# botocore connection failures, matched by name so botocore stays optional here
+TRANSIENT_EXCEPTION_NAMES = {
+    'EndpointConnectionError',
+    'ConnectTimeoutError',
+    'ReadTimeoutError',
+    'ConnectionClosedError'
+}
+
+
+class EmbeddingThrottled(Exception):
+    """Raised by embed functions (and the local stub) when the provider rate-limits a call."""
+
+
+class EmbeddingUnavailable(Exception):
+    """Raised by embed functions (and the local stub) for a transient failure worth retrying."""
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """Whether an exception from an embed call is a provider throttling response."""
+    if isinstance(error, EmbeddingThrottled):
+        return True
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        return response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
+    return False
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Whether an embed call that raised ``error`` may succeed if tried again."""
+    if is_throttling_error(error) or isinstance(error, (EmbeddingUnavailable, ConnectionError, TimeoutError)):
+        return True
+    if type(error).__name__ in TRANSIENT_EXCEPTION_NAMES:
+        return True
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        status = response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+        return response.get('Error', {}).get('Code') in TRANSIENT_ERROR_CODES or status >= 500
+    return False
+
+
+class AdaptiveTokenBucket:
+    """
+    Token-bucket rate limiter with additive-increase / multiplicative-decrease.
+
+    Every success nudges the refill rate up towards ``max_rate``; a throttling
+    response halves it and empties the bucket. Throttles arriving within
+    ``cooldown`` seconds of the last decrease come from requests already in
+    flight and are not counted again.
+    """
+
+    def __init__(self, rate: float, max_rate: Optional[float] = None, min_rate: float = 0.5,
+                 increase_step: float = 0.5, cooldown: float = 1.0):
+        self.rate = rate
+        self.max_rate = max_rate or rate * 2
+        self.min_rate = min_rate
+        self.increase_step = increase_step
+        self.cooldown = cooldown
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.decreased_at = float('-inf')
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """
+        Take a token, waiting until it has been refilled. The token is
+        reserved under the lock (the bucket may go into debt) and the wait
+        happens outside it, so waiting callers are paced, not serialized.
+        """
+        async with self._lock:
+            self._refill()
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            await asyncio.sleep(wait)
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self):
+        now = time.monotonic()
+        if now - self.decreased_at < self.cooldown:
+            return
+        self._refill()
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = min(self.tokens, 0)
+        self.decreased_at = now
+
+
+class ConcurrentEmbeddingEngine:
+    """Embed many texts concurrently with a blocking ``embed_fn(text) -> vector``."""
+
+    def __init__(self, embed_fn: Callable[[str], List[float]], max_concurrency: int = 8,
+                 requests_per_second: float = 10.0, max_retries: int = 3, base_backoff: float = 0.5):
+        self.embed_fn = embed_fn
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.rate_limiter = AdaptiveTokenBucket(requests_per_second)
+        self.stats = self._empty_stats()
+
+    def _empty_stats(self) -> Dict[str, Any]:
+        return {'requested': 0, 'succeeded': 0, 'failed': 0, 'retries': 0, 'throttled': 0, 'seconds': 0.0}
+
+    async def embed_all(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Embed texts concurrently, preserving input order.
+
+        Items that still fail after ``max_retries`` attempts come back as None;
+        an error that is not worth retrying cancels the rest and is raised.
+        """
+        self.stats = self._empty_stats()
+        self.stats['requested'] = len(texts)
+        if not texts:
+            return []
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            tasks = [asyncio.ensure_future(self._embed_one(index, text, semaphore, executor))
+                     for index, text in enumerate(texts)]
+            try:
+                results = await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
+        self.stats['seconds'] = round(time.perf_counter() - start, 4)
+        self.stats['texts_per_second'] = round(len(texts) / self.stats['seconds'], 1) if self.stats['seconds'] else None
+        self.stats['final_rate'] = round(self.rate_limiter.rate, 2)
+        return results
+
+    async def _embed_one(self, index: int, text: str, semaphore: asyncio.Semaphore,
+                         executor: ThreadPoolExecutor) -> Optional[List[float]]:
+        loop = asyncio.get_running_loop()
+        last_error = None
+
+        for attempt in range(self.max_retries):
+            async with semaphore:
+                await self.rate_limiter.acquire()
+                try:
+                    embedding = await loop.run_in_executor(executor, self.embed_fn, text)
+                    self.rate_limiter.on_success()
+                    self.stats['succeeded'] += 1
+                    return embedding
+                except Exception as e:
+                    last_error = e
+                    if is_throttling_error(e):
+                        self.stats['throttled'] += 1
+                        self.rate_limiter.on_throttle()
+                    elif not is_retryable_error(e):
+                        logger.error(f"❌ Embedding failed for item {index} with a non-retryable error: {e}")
+                        self.stats['failed'] += 1
+                        raise
+
+            # Back off outside the semaphore so other items keep the workers busy
+            if attempt < self.max_retries - 1:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self.base_backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+        logger.error(f"❌ Embedding failed for item {index} after {self.max_retries} attempts: {last_error}")
+        self.stats['failed'] += 1
+        return None
+
+
+def titan_embed_fn(bedrock_client, model_id: str, dimensions: int = 1024) -> Callable[[str], List[float]]:
+    """Build a blocking embed function backed by Bedrock Titan ``invoke_model``."""
+    def embed(text: str) -> List[float]:
+        body = json.dumps({
+            "inputText": text[:8000],  # Titan limit
+            "dimensions": dimensions,
+            "normalize": True
+        })
+        response = bedrock_client.invoke_model(
+            body=body,
+            modelId=model_id,
+            accept='application/json',
+            contentType='application/json'
+        )
+        embedding = json.loads(response.get('body').read()).get('embedding')
+        if not embedding:
+            raise ValueError("Bedrock response contained no embedding")
+        return embedding
+
+    return embed
+
+
+def hashing_embedding(text: str, dimensions: int = 1024) -> List[float]:
+    """Deterministic bag-of-words feature-hashing embedding (unit length)."""
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for token in re.findall(r'[a-z0-9]+', text.lower()):
+        digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], 'little') % dimensions
+        vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector.tolist()
+
+
+def stub_embed_fn(dimensions: int = 1024, latency: float = 0.05, throttle_rate: float = 0.0,
+                  failure_rate: float = 0.0) -> Callable[[str], List[float]]:
+    """Local stand-in for Bedrock: sleeps ``latency`` seconds and can inject throttles or failures."""
+    def embed(text: str) -> List[float]:
+        time.sleep(latency)
+        roll = random.random()
+        if roll < throttle_rate:
+            raise EmbeddingThrottled("stub throttled")
+        if roll < throttle_rate + failure_rate:
+            raise EmbeddingUnavailable("stub failure")
+        return hashing_embedding(text, dimensions)
+
+    return embed
+
+
+async def run_benchmark(args):
+    texts = [f"AST benchmark text {i} about strengths, flow and team collaboration" for i in range(args.texts)]
+    embed_fn = stub_embed_fn(latency=args.latency, throttle_rate=args.throttle_rate, failure_rate=args.failure_rate)
+
+    engine = ConcurrentEmbeddingEngine(
+        embed_fn,
+        max_concurrency=args.concurrency,
+        requests_per_second=args.rps,
+        max_retries=args.retries,
+        base_backoff=0.05
+    )
+    await engine.embed_all(texts)
+
+    serial_estimate = args.texts * args.latency
+    print(json.dumps({**engine.stats, 'serial_estimate_seconds': round(serial_estimate, 2)}, indent=2))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Measure embedding throughput against the local stub embedder")
+    parser.add_argument('--texts', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rps', type=float, default=100.0, help="Initial requests per second")
+    parser.add_argument('--latency', type=float, default=0.05, help="Stub seconds per embed call")
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Share of stub calls failing transiently")
+    parser.add_argument('--retries', type=int, default=3)
+    asyncio.run(run_benchmark(parser.parse_args()))
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Retrieval Evaluation Harness
+============================
+
+Scores semantic search against the labelled queries in
+``retrieval_eval_queries.json`` and measures its latency, without Bedrock or a
+ChromaDB server:
+
+- the source files are parsed and stored through ``_store_chunks_in_collection``
+  into an embedded vector store (NumPy index or ChromaDB ``PersistentClient``)
+  in a temporary directory, embedded with the deterministic
+  ``hashing_embedding``, and indexed into BM25 alongside
+- each retrieval mode (vector, lexical, hybrid) reports recall@k, MRR and
+  nDCG@k, sequential p50/p95/p99 latency, and QPS with latency percentiles
+  under concurrent load
+
+Results are written as JSON so runs can be compared between changes:
+
+    python3 coaching-data/evaluate_retrieval.py --k 5 --output coaching-data/retrieval_eval.json
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import asyncio
+import argparse
+import logging
+import tempfile
+from datetime import datetime
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Iterator
+
+from process_ast_knowledge import ASTKnowledgeProcessor
+from embedding_engine import hashing_embedding
+from vector_store import open_vector_store, QUANTIZATIONS
+from lexical_index import BM25Index
+from batch_retrieval import BatchRetriever
+
+RESULTS_VERSION = 1
+QUERIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'retrieval_eval_queries.json')
+MODES = ('vector', 'lexical', 'hybrid')
+COLLECTION_SOURCES = {'ast_methodology': 'AST_Compendium', 'team_profiles': 'team_profiles'}
+
+
+def rule_matches(rule: Dict[str, Any], chunk: Dict[str, Any]) -> bool:
+    metadata = chunk.get('metadata', {})
+    if 'title' in rule and rule['title'].lower() not in chunk.get('title', '').lower():
+        return False
+    if 'key_concept' in rule and rule['key_concept'] not in metadata.get('key_concepts', []):
+        return False
+    return all(metadata.get(field) == rule[field] for field in ('department', 'content_type') if field in rule)
+
+
+def relevance_grades(judgment: Dict[str, Any], chunks: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Chunk ID -> grade (> 0) for one labelled query."""
+    grades = {}
+    for chunk in chunks:
+        grade = max((rule['grade'] for rule in judgment['relevant'] if rule_matches(rule, chunk)), default=0)
+        if grade:
+            grades[chunk['id']] = grade
+    return grades
+
+
+def recall_at_k(ranked: List[str], grades: Dict[str, int], k: int) -> float:
+    """Share of the relevant chunks found in the top k, out of at most k (broad labels can match dozens)."""
+    return len(set(ranked[:k]) & set(grades)) / min(k, len(grades)) if grades else 0.0
+
+
+def reciprocal_rank(ranked: List[str], grades: Dict[str, int]) -> float:
+    for rank, doc_id in enumerate(ranked, start=1):
+        if doc_id in grades:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg_at_k(ranked: List[str], grades: Dict[str, int], k: int) -> float:
+    dcg = sum((2 ** grades.get(doc_id, 0) - 1) / math.log2(rank + 1) for rank, doc_id in enumerate(ranked[:k], start=1))
+    ideal = sorted(grades.values(), reverse=True)[:k]
+    idcg = sum((2 ** grade - 1) / math.log2(rank + 1) for rank, grade in enumerate(ideal, start=1))
+    return dcg / idcg if idcg else 0.0
+
+
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 in milliseconds (nearest rank)."""
+    ordered = sorted(latencies)
+    if not ordered:
+        return {}
+    return {
+        f"p{p}_ms": round(ordered[min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1)] * 1000, 3)
+        for p in (50, 95, 99)
+    }
+
+
+def build_index(args, work_dir: str) -> Dict[str, Any]:
+    """Parse the source files and store them in an embedded vector store and BM25 indexes."""
+    processor = ASTKnowledgeProcessor()
+    chunks = list(processor.iter_source_chunks())
+    if not chunks:
+        raise SystemExit("❌ No chunks parsed - run from the repository root")
+
+    client = open_vector_store(args.backend, os.path.join(work_dir, 'vectors'), args.quantization)
+    collections, lexical = {}, {}
+    for name, source in COLLECTION_SOURCES.items():
+        collection = client.get_or_create_collection(name, embedding_function=None)
+        source_chunks = [chunk for chunk in chunks if chunk['source'] == source]
+        embeddings = [hashing_embedding(chunk['content'], args.dimensions) for chunk in source_chunks]
+        for i in range(0, len(source_chunks), processor.ingest_batch_size):
+            asyncio.run(processor._store_chunks_in_collection(
+                source_chunks[i:i + processor.ingest_batch_size], collection, name,
+                embeddings=embeddings[i:i + processor.ingest_batch_size]
+            ))
+        index = BM25Index(os.path.join(work_dir, f"{name}.npz"))
+        index.clear()
+        index.add(source_chunks)
+        index.save()
+        index.reload()
+        collections[name], lexical[name] = collection, index
+
+    return {'chunks': chunks, 'collections': collections, 'lexical': lexical}
+
+
+@contextmanager
+def retrieval_fn(mode: str, index: Dict[str, Any], dimensions: int) -> Iterator[Callable[[str, str, int], List[str]]]:
+    """``retrieve(collection_name, query, k)`` returning ranked chunk IDs for a mode."""
+    embed = lambda texts: [hashing_embedding(text, dimensions) for text in texts]
+    if mode == 'lexical':
+        yield lambda name, query, k: [doc_id for doc_id, _ in index['lexical'][name].search(query, k)]
+        return
+
+    with BatchRetriever(embed, lexical_indexes=index['lexical'] if mode == 'hybrid' else None) as retriever:
+        def retrieve(name: str, query: str, k: int) -> List[str]:
+            matches = retriever.search({name: index['collections'][name]}, {name: [query]}, k)[name][query]
+            return [match['id'] for match in matches]
+        yield retrieve
+
+
+def evaluate_mode(mode: str, index: Dict[str, Any], judgments: List[Dict[str, Any]], args) -> Dict[str, Any]:
+    with retrieval_fn(mode, index, args.dimensions) as retrieve:
+        return measure_retrieval(retrieve, index, judgments, args)
+
+
+def measure_retrieval(retrieve: Callable[[str, str, int], List[str]], index: Dict[str, Any],
+                      judgments: List[Dict[str, Any]], args) -> Dict[str, Any]:
+    chunks_by_collection = {
+        name: [chunk for chunk in index['chunks'] if chunk['source'] == source]
+        for name, source in COLLECTION_SOURCES.items()
+    }
+
+    # Warm up (lazy index loads, first-call allocations) outside the measurements
+    retrieve(judgments[0]['collection'], judgments[0]['query'], args.k)
+
+    per_query, latencies = [], []
+    for judgment in judgments:
+        grades = relevance_grades(judgment, chunks_by_collection[judgment['collection']])
+        start = time.perf_counter()
+        ranked = retrieve(judgment['collection'], judgment['query'], args.k)
+        latencies.append(time.perf_counter() - start)
+        per_query.append({
+            'query': judgment['query'],
+            'collection': judgment['collection'],
+            'relevant': len(grades),
+            'recall': round(recall_at_k(ranked, grades, args.k), 4),
+            'reciprocal_rank': round(reciprocal_rank(ranked, grades), 4),
+            'ndcg': round(ndcg_at_k(ranked, grades, args.k), 4)
+        })
+
+    def mean(metric: str) -> float:
+        return round(sum(result[metric] for result in per_query) / len(per_query), 4)
+
+    # Concurrent load: every query, args.rounds times, across args.concurrency threads
+    requests = [(judgment['collection'], judgment['query']) for judgment in judgments] * args.rounds
+    load_latencies: List[float] = []
+
+    def timed_request(request) -> float:
+        start = time.perf_counter()
+        retrieve(request[0], request[1], args.k)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        load_latencies.extend(pool.map(timed_request, requests))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'quality': {
+            f'recall@{args.k}': mean('recall'),
+            'mrr': mean('reciprocal_rank'),
+            f'ndcg@{args.k}': mean('ndcg')
+        },
+        'latency': percentiles(latencies),
+        'load': {
+            'requests': len(requests),
+            'concurrency': args.concurrency,
+            'qps': round(len(requests) / elapsed, 1) if elapsed > 0 else None,
+            **percentiles(load_latencies)
+        },
+        'per_query': per_query
+    }
+
+
+def run_evaluation(args) -> Dict[str, Any]:
+    with open(args.queries, 'r', encoding='utf-8') as f:
+        judgments = json.load(f)['queries']
+
+    work_dir = tempfile.mkdtemp(prefix='ast-retrieval-eval-')
+    try:
+        index = build_index(args, work_dir)
+        modes = {}
+        for mode in args.modes:
+            modes[mode] = evaluate_mode(mode, index, judgments, args)
+            summary = ', '.join(f"{name} {value}" for name, value in modes[mode]['quality'].items())
+            print(f"📏 {mode}: {summary}, {modes[mode]['load']['qps']} QPS", file=sys.stderr)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'version': RESULTS_VERSION,
+        'timestamp': datetime.now().isoformat(),
+        'config': {
+            'queries': len(judgments),
+            'k': args.k,
+            'backend': args.backend,
+            'quantization': args.quantization if args.backend == 'numpy' else None,
+            'dimensions': args.dimensions,
+            'concurrency': args.concurrency,
+            'rounds': args.rounds
+        },
+        'corpus': {
+            name: sum(1 for chunk in index['chunks'] if chunk['source'] == source)
+            for name, source in COLLECTION_SOURCES.items()
+        },
+        'modes': modes
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate retrieval quality and latency on the labelled query set")
+    parser.add_argument('--queries', default=QUERIES_PATH, help="Labelled query file")
+    parser.add_argument('--k', type=int, default=5, help="Cutoff for recall@k and nDCG@k")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--backend', choices=['numpy', 'persistent'], default='numpy',
+                        help="Embedded vector store to evaluate against")
+    parser.add_argument('--quantization', choices=QUANTIZATIONS, default='float32',
+                        help="Vector format of the NumPy index (rescored with float32 when quantized)")
+    parser.add_argument('--dimensions', type=int, default=1024, help="hashing_embedding dimensions")
+    parser.add_argument('--concurrency', type=int, default=8, help="Threads issuing queries in the load phase")
+    parser.add_argument('--rounds', type=int, default=20, help="Passes over the query set in the load phase")
+    parser.add_argument('--min-ndcg', type=float, default=None,
+                        help="Exit with status 1 if any evaluated mode scores a lower mean nDCG@k")
+    parser.add_argument('--output', help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = run_evaluation(args)
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.min_ndcg is not None:
+        failing = [mode for mode, result in results['modes'].items()
+                   if result['quality'][f'ndcg@{args.k}'] < args.min_ndcg]
+        if failing:
+            print(f"❌ nDCG@{args.k} below {args.min_ndcg} for: {', '.join(failing)}", file=sys.stderr)
+            sys.exit(1)
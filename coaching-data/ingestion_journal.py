@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Ingestion Checkpoint Journal
+============================
+
+SQLite record of which chunks each sink has finished writing during the
+current ingestion run. Sinks record a batch only after its write succeeded,
+so after a crash or a failed store a ``--resume`` run skips every batch that
+already landed, re-sends only the rest, and both stores converge without
+re-embedding finished work. Chunk IDs are content hashes, so a chunk recorded
+for a sink means exactly that content is stored there.
+
+A run that completes marks itself finished and drops its chunk records; a new
+run without ``--resume`` discards any unfinished one.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import List, Dict, Any, Optional, Set, Callable, Awaitable
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_PATH = "coaching-data/ingestion_journal.sqlite"
+
+
+class IngestionJournal:
+    """Per-sink checkpoints of completed chunk batches for one ingestion run."""
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self.run_id: Optional[int] = None
+        self.resumed = False
+        self._done: Dict[str, Set[str]] = {}
+        self._skipped: Dict[str, int] = {}
+        self._recorded: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                mode TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS completed_chunks (
+                run_id INTEGER NOT NULL,
+                sink TEXT NOT NULL,
+                chunk_id TEXT NOT NULL,
+                batch_at REAL NOT NULL,
+                PRIMARY KEY (run_id, sink, chunk_id)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def start(self, mode: str, resume: bool = False) -> int:
+        """
+        Begin a run. With ``resume``, continue the latest unfinished run of the
+        same mode (if any) and load what it completed; otherwise start afresh.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id, mode FROM runs WHERE finished_at IS NULL ORDER BY run_id DESC LIMIT 1"
+            ).fetchone()
+
+            if resume and row and row[1] == mode:
+                self.run_id, self.resumed = row[0], True
+                for sink, chunk_id in self._conn.execute(
+                    "SELECT sink, chunk_id FROM completed_chunks WHERE run_id = ?", (self.run_id,)
+                ):
+                    self._done.setdefault(sink, set()).add(chunk_id)
+                done = sum(len(ids) for ids in self._done.values())
+                logger.info(f"⏯️ Resuming ingestion run {self.run_id} ({done} chunk writes already checkpointed)")
+                return self.run_id
+
+            if resume:
+                logger.info(f"⏯️ No unfinished {mode} run to resume - starting a new one")
+            elif row:
+                logger.warning(f"⚠️ Discarding checkpoints of unfinished run {row[0]} (use --resume to continue it)")
+
+            # Only the current run's checkpoints matter
+            self._conn.execute("DELETE FROM completed_chunks")
+            self._conn.execute("DELETE FROM runs")
+            self.run_id = self._conn.execute(
+                "INSERT INTO runs (mode, started_at) VALUES (?, ?)", (mode, time.time())
+            ).lastrowid
+            self._conn.commit()
+            return self.run_id
+
+    def pending(self, sink: str, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Chunks the sink has not yet written in this run."""
+        done = self._done.get(sink)
+        if not done:
+            return chunks
+        return [chunk for chunk in chunks if chunk['id'] not in done]
+
+    def record(self, sink: str, chunks: List[Dict[str, Any]]):
+        """Checkpoint a batch the sink wrote successfully."""
+        if not chunks:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO completed_chunks (run_id, sink, chunk_id, batch_at) VALUES (?, ?, ?, ?)",
+                [(self.run_id, sink, chunk['id'], now) for chunk in chunks]
+            )
+            self._conn.commit()
+            self._done.setdefault(sink, set()).update(chunk['id'] for chunk in chunks)
+            self._recorded[sink] = self._recorded.get(sink, 0) + len(chunks)
+
+    def wrap(self, sink: str, writer: Callable[[List[Dict[str, Any]]], Awaitable[Any]]
+             ) -> Callable[[List[Dict[str, Any]]], Awaitable[None]]:
+        """
+        Batch writer that skips chunks the sink already wrote and checkpoints
+        the rest once ``writer`` succeeds. A writer may return the subset it
+        actually stored, so withheld chunks are retried by the next run.
+        """
+        async def write(batch: List[Dict[str, Any]]):
+            chunks = self.pending(sink, batch)
+            if len(chunks) < len(batch):
+                self._skipped[sink] = self._skipped.get(sink, 0) + len(batch) - len(chunks)
+            if not chunks:
+                return
+            stored = await writer(chunks)
+            self.record(sink, chunks if stored is None else stored)
+        return write
+
+    def finish(self):
+        """Mark the run complete; its checkpoints are no longer needed."""
+        with self._lock:
+            self._conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), self.run_id))
+            self._conn.execute("DELETE FROM completed_chunks WHERE run_id = ?", (self.run_id,))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'run_id': self.run_id,
+            'resumed': self.resumed,
+            'skipped': dict(self._skipped),
+            'recorded': dict(self._recorded)
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_ingestion_journal() -> Optional[IngestionJournal]:
+    """Open the journal configured by INGEST_JOURNAL_PATH ('off' disables checkpointing)."""
+    path = os.getenv('INGEST_JOURNAL_PATH', DEFAULT_JOURNAL_PATH)
+    if path.lower() in ('', 'off', 'none'):
+        return None
+
+    try:
+        return IngestionJournal(path)
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ Ingestion journal unavailable at {path}: {e}")
+        return None
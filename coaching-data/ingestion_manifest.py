@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+AST Ingestion Manifest
+======================
+
+Persisted record of what the last ingestion run stored. Tracks a digest per
+source file and per chunk so incremental refreshes can skip unchanged files,
+upsert only new or changed chunks, and delete chunks whose source disappeared.
+"""
+
+import os
+import json
+import uuid
+import hashlib
+from typing import List, Dict, Any, Tuple, Iterable
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def file_digest(file_path: str) -> str:
+    """Return the SHA-256 digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def content_chunk_id(*parts: str) -> str:
+    """Build a deterministic, UUID-formatted chunk ID from its identifying content."""
+    digest = hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+    return str(uuid.UUID(digest[:32]))
+
+
+def chunk_digest(chunk: Dict[str, Any]) -> str:
+    """Return a stable digest of everything stored for a chunk (content and metadata)."""
+    payload = json.dumps(chunk, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def chunk_entries(chunks: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+    """Manifest entries (ID -> digest and source) for a file's chunks."""
+    return {
+        chunk['id']: {'digest': chunk_digest(chunk), 'source': chunk['source']}
+        for chunk in chunks
+    }
+
+
+class IngestionManifest:
+    """Per-file and per-chunk digests from the last successful ingestion run."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = {}
+
+    def load(self) -> 'IngestionManifest':
+        """Load the manifest from disk, starting empty if it is missing or unreadable."""
+        if not os.path.exists(self.path):
+            logger.info(f"📄 No ingestion manifest at {self.path} - treating every file as new")
+            return self
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️ Could not read ingestion manifest {self.path}: {e}")
+            return self
+
+        if data.get('version') != MANIFEST_VERSION:
+            logger.warning(f"⚠️ Ingestion manifest version {data.get('version')} unsupported - rebuilding")
+            return self
+
+        self.files = data.get('files', {})
+        return self
+
+    def save(self):
+        """Atomically write the manifest to disk."""
+        data = {
+            'version': MANIFEST_VERSION,
+            'updated_at': datetime.now().isoformat(),
+            'files': self.files
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def is_unchanged(self, file_path: str, digest: str) -> bool:
+        """Whether a source file has the same digest as in the last run."""
+        entry = self.files.get(file_path)
+        return entry is not None and entry.get('digest') == digest
+
+    def diff_chunks(self, file_path: str, chunks: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        """
+        Compare freshly parsed chunks for a file against the manifest.
+
+        Returns the chunks that are new or changed, and the IDs (mapped to their
+        source) that the file previously produced but no longer does.
+        """
+        previous = self.files.get(file_path, {}).get('chunks', {})
+        changed = []
+        seen = set()
+
+        for chunk in chunks:
+            if chunk['id'] in seen:
+                continue
+            seen.add(chunk['id'])
+            if previous.get(chunk['id'], {}).get('digest') != chunk_digest(chunk):
+                changed.append(chunk)
+
+        removed = {
+            chunk_id: entry['source']
+            for chunk_id, entry in previous.items()
+            if chunk_id not in seen
+        }
+        return changed, removed
+
+    def missing_files(self, current_files: Iterable[str]) -> Dict[str, Dict[str, str]]:
+        """Return manifest entries (file -> chunk ID -> source) for files no longer present."""
+        current = set(current_files)
+        return {
+            file_path: {chunk_id: entry['source'] for chunk_id, entry in entry_data.get('chunks', {}).items()}
+            for file_path, entry_data in self.files.items()
+            if file_path not in current
+        }
+
+    def record_file(self, file_path: str, digest: str, entries: Dict[str, Dict[str, str]]):
+        """Record the digest and chunk entries (see ``chunk_entries``) produced by a file."""
+        self.files[file_path] = {'digest': digest, 'chunks': entries}
+
+    def forget_file(self, file_path: str):
+        """Drop a file from the manifest."""
+        self.files.pop(file_path, None)
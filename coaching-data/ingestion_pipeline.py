@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Streaming Ingestion Pipeline
+============================
+
+Parsers yield chunks one at a time, a router fans each chunk out to the sinks
+registered for its source, and every sink flushes fixed-size batches to its
+store. Peak memory is bounded by the batch size rather than the corpus size,
+and writes start as soon as the first batch fills.
+
+A sink with ``max_in_flight`` > 1 writes in the background: parsing and the
+other sinks carry on while up to that many of its batches are being written.
+
+``StagedPipeline`` goes further for multi-step ingestion (parse -> embed ->
+vector store -> PostgreSQL): every stage runs as its own task, connected by
+bounded queues, so each stage works on the next batch while the stage after it
+handles the previous one. A full queue blocks its producer (backpressure),
+and end-to-end time approaches that of the slowest stage rather than the sum.
+"""
+
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator, Callable, Awaitable, Optional, Set
+import logging
+
+from semantic_chunker import token_bucket, HISTOGRAM_EDGES
+
+logger = logging.getLogger(__name__)
+
+
+class BatchingSink:
+    """Buffers chunks and hands them to an async writer in fixed-size batches."""
+
+    def __init__(self, name: str, writer: Callable[[List[Dict[str, Any]]], Awaitable[None]], batch_size: int = 100,
+                 max_in_flight: int = 1):
+        self.name = name
+        self.writer = writer
+        self.batch_size = batch_size
+        self.max_in_flight = max(1, max_in_flight)
+        self.buffer: List[Dict[str, Any]] = []
+        self.chunks_written = 0
+        self.batches_written = 0
+        self._pending: Set[asyncio.Task] = set()
+
+    async def write(self, chunk: Dict[str, Any]):
+        self.buffer.append(chunk)
+        if len(self.buffer) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        if self.max_in_flight == 1:
+            await self._write(batch)
+            return
+        while len(self._pending) >= self.max_in_flight:
+            done, self._pending = await asyncio.wait(self._pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        self._pending.add(asyncio.ensure_future(self._write(batch)))
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        await self.writer(batch)
+        self.chunks_written += len(batch)
+        self.batches_written += 1
+
+    async def drain(self):
+        """Wait for background writes, raising the first failure."""
+        pending, self._pending = self._pending, set()
+        results = await asyncio.gather(*pending, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def cancel(self):
+        """Abandon background writes (after another sink failed)."""
+        pending, self._pending = self._pending, set()
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+class ChunkRouter:
+    """Routes each chunk to the sinks registered for its ``source`` (and to catch-all sinks)."""
+
+    def __init__(self):
+        self.routes: Dict[Optional[str], List[BatchingSink]] = {}
+
+    def add_sink(self, sink: BatchingSink, source: Optional[str] = None):
+        """Register a sink for one source, or for every chunk when source is None."""
+        self.routes.setdefault(source, []).append(sink)
+        return sink
+
+    @property
+    def sinks(self) -> List[BatchingSink]:
+        return [sink for sinks in self.routes.values() for sink in sinks]
+
+    async def route(self, chunk: Dict[str, Any]):
+        for sink in self.routes.get(chunk['source'], []):
+            await sink.write(chunk)
+        for sink in self.routes.get(None, []):
+            await sink.write(chunk)
+
+    async def close(self):
+        """Flush every partially filled batch and wait for background writes."""
+        for sink in self.sinks:
+            await sink.flush()
+        for sink in self.sinks:
+            await sink.drain()
+
+    async def cancel(self):
+        for sink in self.sinks:
+            await sink.cancel()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            sink.name: {'chunks': sink.chunks_written, 'batches': sink.batches_written}
+            for sink in self.sinks
+        }
+
+
+class ProcessingStats:
+    """Running totals for the processing report, so chunks need not be kept in memory."""
+
+    def __init__(self):
+        self.ast_chunks = 0
+        self.team_chunks = 0
+        self.ast_content_types: Dict[str, int] = {}
+        self.team_departments: Dict[str, int] = {}
+        self.total_word_count = 0
+        self.token_histogram: Dict[str, int] = {}
+        self.token_min: Optional[int] = None
+        self.token_max = 0
+        self.token_total = 0
+        self.token_chunks = 0
+
+    def add(self, chunk: Dict[str, Any]):
+        if chunk['source'] == 'AST_Compendium':
+            self.ast_chunks += 1
+            content_type = chunk['metadata'].get('content_type', 'unknown')
+            self.ast_content_types[content_type] = self.ast_content_types.get(content_type, 0) + 1
+            self.total_word_count += chunk.get('word_count', 0)
+            if 'token_count' in chunk:
+                self._add_token_count(chunk['token_count'])
+        elif chunk['source'] == 'team_profiles':
+            self.team_chunks += 1
+            dept = chunk['metadata'].get('department', 'unknown')
+            self.team_departments[dept] = self.team_departments.get(dept, 0) + 1
+
+    def _add_token_count(self, tokens: int):
+        bucket = token_bucket(tokens)
+        self.token_histogram[bucket] = self.token_histogram.get(bucket, 0) + 1
+        self.token_min = tokens if self.token_min is None else min(self.token_min, tokens)
+        self.token_max = max(self.token_max, tokens)
+        self.token_total += tokens
+        self.token_chunks += 1
+
+    def token_summary(self) -> Dict[str, Any]:
+        """Size histogram (smallest bucket first) and spread of AST chunk token counts."""
+        buckets = [token_bucket(edge - 1) for edge in HISTOGRAM_EDGES] + [token_bucket(HISTOGRAM_EDGES[-1])]
+        return {
+            'histogram': {bucket: self.token_histogram[bucket] for bucket in buckets if bucket in self.token_histogram},
+            'min': self.token_min or 0,
+            'max': self.token_max,
+            'mean': round(self.token_total / self.token_chunks, 1) if self.token_chunks else 0
+        }
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Dict[str, Any]]) -> 'ProcessingStats':
+        stats = cls()
+        for chunk in chunks:
+            stats.add(chunk)
+        return stats
+
+
+def unique_chunks(chunks: Iterable[Dict[str, Any]],
+                  stats: Optional[ProcessingStats] = None) -> Iterator[Dict[str, Any]]:
+    """Skip repeated chunk IDs, counting each chunk passed on into ``stats``."""
+    seen_ids = set()
+    for chunk in chunks:
+        if chunk['id'] in seen_ids:
+            continue
+        seen_ids.add(chunk['id'])
+        if stats is not None:
+            stats.add(chunk)
+        yield chunk
+
+
+async def stream_chunks(chunks: Iterable[Dict[str, Any]], router: ChunkRouter,
+                        stats: Optional[ProcessingStats] = None) -> int:
+    """
+    Drive a chunk iterator through the router, skipping repeated chunk IDs.
+
+    Returns the number of chunks routed. All sinks are flushed at the end.
+    """
+    routed = 0
+
+    try:
+        for chunk in unique_chunks(chunks, stats):
+            await router.route(chunk)
+            routed += 1
+
+        await router.close()
+    except BaseException:
+        await router.cancel()
+        raise
+    return routed
+
+
+class PipelineStage:
+    """One step of a ``StagedPipeline``: ``fn`` maps each batch to the batch handed to the next stage."""
+
+    def __init__(self, name: str, fn: Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]],
+                 workers: int = 1):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.batches = 0
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.starved_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.max_queue_depth = 0
+
+    def stats(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'busy_seconds': round(self.busy_seconds, 4),
+            'items_per_second': round(self.items / self.busy_seconds, 1) if self.busy_seconds > 0 else None,
+            # Share of the run this stage spent working, waiting for input or blocked on a full output queue
+            'utilization': round(self.busy_seconds / (elapsed * self.workers), 3) if elapsed > 0 else None,
+            'starved_seconds': round(self.starved_seconds, 4),
+            'blocked_seconds': round(self.blocked_seconds, 4),
+            'max_queue_depth': self.max_queue_depth
+        }
+
+
+_END = object()
+
+
+class StagedPipeline:
+    """
+    Runs a synchronous chunk iterator (parsing, on a worker thread) into a
+    chain of async stages joined by queues of at most ``queue_size`` batches.
+
+    The first failure in any stage cancels the others and is re-raised from
+    ``run``; batches still queued are dropped.
+    """
+
+    def __init__(self, stages: List[PipelineStage], batch_size: int = 100, queue_size: int = 2):
+        self.source = PipelineStage('parse', None)
+        self.source.max_queue_depth = None  # fed by the iterator, not a queue
+        self.stages = stages
+        self.batch_size = batch_size
+        self.queue_size = max(1, queue_size)
+        self.elapsed = 0.0
+
+    @staticmethod
+    def _take(iterator: Iterator[Dict[str, Any]], size: int) -> List[Dict[str, Any]]:
+        batch = []
+        for chunk in iterator:
+            batch.append(chunk)
+            if len(batch) >= size:
+                break
+        return batch
+
+    async def _put(self, stage: PipelineStage, queue: asyncio.Queue, item):
+        start = time.perf_counter()
+        await queue.put(item)
+        stage.blocked_seconds += time.perf_counter() - start
+
+    async def _produce(self, chunks: Iterable[Dict[str, Any]], output: asyncio.Queue,
+                       executor: ThreadPoolExecutor):
+        loop = asyncio.get_running_loop()
+        iterator = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            batch = await loop.run_in_executor(executor, self._take, iterator, self.batch_size)
+            self.source.busy_seconds += time.perf_counter() - start
+            if not batch:
+                break
+            self.source.batches += 1
+            self.source.items += len(batch)
+            await self._put(self.source, output, batch)
+        await output.put(_END)
+
+    async def _work(self, stage: PipelineStage, input: asyncio.Queue, output: Optional[asyncio.Queue],
+                    remaining: List[int]):
+        while True:
+            start = time.perf_counter()
+            stage.max_queue_depth = max(stage.max_queue_depth, input.qsize())
+            batch = await input.get()
+            stage.starved_seconds += time.perf_counter() - start
+            if batch is _END:
+                # Let sibling workers see the end too; the last one out passes it downstream
+                await input.put(_END)
+                remaining[0] -= 1
+                if remaining[0] == 0 and output is not None:
+                    await output.put(_END)
+                return
+
+            start = time.perf_counter()
+            result = await stage.fn(batch)
+            stage.busy_seconds += time.perf_counter() - start
+            stage.batches += 1
+            stage.items += len(batch)
+            if output is not None:
+                await self._put(stage, output, result)
+
+    async def run(self, chunks: Iterable[Dict[str, Any]]) -> int:
+        """Push every chunk through all stages; returns the number of chunks parsed."""
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pipeline-parse')
+        tasks = [asyncio.ensure_future(self._produce(chunks, queues[0], executor))]
+        for i, stage in enumerate(self.stages):
+            output = queues[i + 1] if i + 1 < len(queues) else None
+            remaining = [stage.workers]
+            tasks.extend(asyncio.ensure_future(self._work(stage, queues[i], output, remaining))
+                         for _ in range(stage.workers))
+
+        start = time.perf_counter()
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            failed = [task for task in done if not task.cancelled() and task.exception()]
+            if failed:
+                raise failed[0].exception()
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            self.elapsed = time.perf_counter() - start
+            executor.shutdown(wait=False)
+        return self.source.items
+
+    def stats(self) -> Dict[str, Any]:
+        stages = [self.source] + self.stages
+        bottleneck = max(stages, key=lambda stage: stage.busy_seconds / stage.workers)
+        return {
+            'elapsed_seconds': round(self.elapsed, 4),
+            'sum_of_stage_seconds': round(sum(stage.busy_seconds for stage in stages), 4),
+            'bottleneck': bottleneck.name,
+            'batch_size': self.batch_size,
+            'queue_size': self.queue_size,
+            'stages': {stage.name: stage.stats(self.elapsed) for stage in stages}
+        }
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Keyword Classification
+======================
+
+Aho–Corasick multi-pattern matcher shared by concept extraction, content-type
+classification and department classification. The automaton is built once from
+every term in the vocabulary file, and each text is lowercased and scanned a
+single time however many terms the vocabularies hold.
+
+Matching keeps the substring semantics of the ``keyword in text.lower()``
+checks it replaces, and classification keeps their first-label-wins order.
+"""
+
+import os
+import json
+from collections import deque
+from typing import List, Dict, Any, Iterable, Set, Tuple
+
+VOCABULARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'classification_vocabulary.json')
+VOCABULARY_VERSION = 1
+
+
+class KeywordMatcher:
+    """Case-insensitive Aho–Corasick automaton reporting every keyword occurring in a text."""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        for keyword in dict.fromkeys(k.lower() for k in keywords if k):
+            self._insert(keyword)
+        self._link()
+
+    def _insert(self, keyword: str):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] += (len(self.keywords),)
+        self.keywords.append(keyword)
+
+    def _link(self):
+        """Breadth-first failure links; each state's output includes its failure chain's."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> Set[str]:
+        """All keywords occurring anywhere in text (as substrings, ignoring case)."""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+
+        return {self.keywords[index] for index in found}
+
+
+class KeywordClassifier:
+    """Concept and label vocabularies answered from one shared ``KeywordMatcher``."""
+
+    def __init__(self, vocabulary: Dict[str, Any]):
+        self.key_concepts: List[str] = [c.lower() for c in vocabulary.get('key_concepts', [])]
+        self.label_sets: Dict[str, Dict[str, Any]] = {}
+
+        terms = list(self.key_concepts)
+        for name, spec in vocabulary.items():
+            if not isinstance(spec, dict) or 'labels' not in spec:
+                continue
+            labels = [(entry['label'], [k.lower() for k in entry['keywords']]) for entry in spec['labels']]
+            self.label_sets[name] = {'fallback': spec.get('fallback', 'other'), 'labels': labels}
+            terms.extend(keyword for _, keywords in labels for keyword in keywords)
+
+        self.matcher = KeywordMatcher(terms)
+
+    @classmethod
+    def from_file(cls, path: str = VOCABULARY_PATH) -> 'KeywordClassifier':
+        with open(path, 'r', encoding='utf-8') as f:
+            vocabulary = json.load(f)
+        if vocabulary.get('version') != VOCABULARY_VERSION:
+            raise ValueError(f"Unsupported classification vocabulary version {vocabulary.get('version')} in {path}")
+        return cls(vocabulary)
+
+    def find(self, *texts: str) -> Set[str]:
+        """Every vocabulary term occurring in any of the texts."""
+        hits = set()
+        for text in texts:
+            hits |= self.matcher.find(text)
+        return hits
+
+    def concepts(self, hits: Set[str]) -> List[str]:
+        """Key concepts among the hits, in vocabulary order."""
+        return [concept for concept in self.key_concepts if concept in hits]
+
+    def classify(self, label_set: str, hits: Set[str]) -> str:
+        """First label in the set with a keyword among the hits, else the set's fallback."""
+        spec = self.label_sets[label_set]
+        for label, keywords in spec['labels']:
+            if any(keyword in hits for keyword in keywords):
+                return label
+        return spec['fallback']
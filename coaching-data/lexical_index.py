@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+BM25 Lexical Index
+==================
+
+Inverted index over chunk titles, content and key concepts, built during
+ingestion next to the ChromaDB writes and fused with vector results at query
+time by reciprocal-rank fusion. Terms are lowercase words plus adjacent-word
+bigrams, so exact multi-word AST terms ("heliotropic effect") outrank chunks
+that only mention the words separately.
+
+Each collection's index is one compressed ``.npz`` file in CSR layout
+(vocabulary, posting offsets, document numbers, uint16 term frequencies,
+document lengths and the ``content_type``/``department`` filter columns). It
+is read on the first search, not at construction.
+"""
+
+import os
+import re
+import math
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEXICAL_INDEX_PATH = "coaching-data/lexical_index"
+FILTER_FIELDS = ('content_type', 'department')
+WORD_RE = re.compile(r'[a-z0-9]+')
+RRF_K = 60
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words followed by adjacent-word bigrams."""
+    words = WORD_RE.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def index_text(chunk: Dict[str, Any]) -> str:
+    """Text indexed for a chunk: title (counted twice), content and key concepts."""
+    metadata = chunk.get('metadata', {})
+    title = chunk.get('title', '')
+    return '\n'.join([title, title, chunk.get('content', ''), ' . '.join(metadata.get('key_concepts', []))])
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[str]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """Fuse ranked ID lists: each ID scores the sum of 1 / (k + rank) over the lists it appears in."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """Okapi BM25 over one collection, persisted to ``path`` and loaded lazily."""
+
+    def __init__(self, path: str, k1: float = 1.2, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        # Mutable form used while ingesting: id -> (term counts, filter values)
+        self._docs: Optional[Dict[str, Tuple[Counter, Dict[str, str]]]] = None
+        # Searchable CSR form
+        self._arrays: Optional[Dict[str, np.ndarray]] = None
+        self._vocab: Dict[str, int] = {}
+
+    def _read(self) -> Optional[Dict[str, np.ndarray]]:
+        if not os.path.exists(self.path):
+            return None
+        with np.load(self.path, allow_pickle=False) as data:
+            return {name: data[name] for name in data.files}
+
+    def _ensure_searchable(self):
+        if self._arrays is not None:
+            return
+        if self._docs is not None:
+            self._compile()
+            return
+        arrays = self._read()
+        if arrays is None:
+            self._docs = {}
+            self._compile()
+            return
+        self._arrays = arrays
+        self._vocab = {term: i for i, term in enumerate(arrays['vocab'].tolist())}
+        logger.info(f"📖 Loaded lexical index {self.path} ({len(arrays['ids'])} chunks, {len(self._vocab):,} terms)")
+
+    def _ensure_mutable(self):
+        if self._docs is not None:
+            return
+        self._ensure_searchable()
+        arrays = self._arrays
+        vocab = arrays['vocab'].tolist()
+        docs = {doc_id: (Counter(), {field: str(arrays[field][i]) for field in FILTER_FIELDS})
+                for i, doc_id in enumerate(arrays['ids'].tolist())}
+        ids = arrays['ids'].tolist()
+        offsets = arrays['offsets']
+        for term_index, term in enumerate(vocab):
+            start, end = offsets[term_index], offsets[term_index + 1]
+            for doc, tf in zip(arrays['postings'][start:end].tolist(), arrays['tfs'][start:end].tolist()):
+                docs[ids[doc]][0][term] = tf
+        self._docs = docs
+
+    def clear(self):
+        """Start from an empty index (full re-ingest)."""
+        self._docs = {}
+        self._arrays = None
+
+    def add(self, chunks: List[Dict[str, Any]]):
+        """Index chunks, replacing any already indexed under the same ID."""
+        self._ensure_mutable()
+        for chunk in chunks:
+            metadata = chunk.get('metadata', {})
+            filters = {field: str(metadata.get(field) or '') for field in FILTER_FIELDS}
+            self._docs[chunk['id']] = (Counter(tokenize(index_text(chunk))), filters)
+        self._arrays = None
+
+    def remove(self, ids: Iterable[str]):
+        self._ensure_mutable()
+        for doc_id in ids:
+            self._docs.pop(doc_id, None)
+        self._arrays = None
+
+    def _compile(self):
+        ids = list(self._docs)
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = np.zeros(len(ids), dtype=np.int32)
+        for doc, doc_id in enumerate(ids):
+            terms = self._docs[doc_id][0]
+            lengths[doc] = sum(terms.values())
+            for term, tf in terms.items():
+                postings.setdefault(term, []).append((doc, tf))
+
+        vocab = sorted(postings)
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(postings[term]) for term in vocab])
+        flat = [entry for term in vocab for entry in postings[term]]
+        self._arrays = {
+            'vocab': np.array(vocab, dtype=str),
+            'offsets': offsets,
+            'postings': np.array([doc for doc, _ in flat], dtype=np.int32),
+            'tfs': np.minimum(np.array([tf for _, tf in flat], dtype=np.int64), 65535).astype(np.uint16),
+            'lengths': lengths,
+            'ids': np.array(ids, dtype=str),
+            **{field: np.array([self._docs[doc_id][1][field] for doc_id in ids], dtype=str)
+               for field in FILTER_FIELDS}
+        }
+        self._vocab = {term: i for i, term in enumerate(vocab)}
+
+    def save(self):
+        """Write the index to ``path`` (only if it was changed or cleared since loading)."""
+        if self._docs is None:
+            return
+        if self._arrays is None:
+            self._compile()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp.npz'
+        np.savez_compressed(tmp_path, **self._arrays)
+        os.replace(tmp_path, self.path)
+        logger.info(f"📖 Saved lexical index {self.path} ({len(self._docs)} chunks, "
+                    f"{os.path.getsize(self.path):,} bytes)")
+
+    def reload(self):
+        """Drop the in-memory index so the next search reads ``path`` again."""
+        self._docs = None
+        self._arrays = None
+        self._vocab = {}
+
+    def __len__(self) -> int:
+        self._ensure_searchable()
+        return len(self._arrays['ids'])
+
+    def search(self, query: str, n_results: int = 10,
+               where: Optional[Dict[str, str]] = None) -> List[Tuple[str, float]]:
+        """Top chunk IDs and BM25 scores, optionally restricted to equal ``content_type``/``department``."""
+        self._ensure_searchable()
+        arrays = self._arrays
+        doc_count = len(arrays['ids'])
+        if not doc_count:
+            return []
+
+        lengths = arrays['lengths']
+        norm = self.k1 * (1 - self.b + self.b * lengths / max(lengths.mean(), 1))
+        scores = np.zeros(doc_count, dtype=np.float32)
+        for term, query_tf in Counter(tokenize(query)).items():
+            term_index = self._vocab.get(term)
+            if term_index is None:
+                continue
+            start, end = arrays['offsets'][term_index], arrays['offsets'][term_index + 1]
+            docs = arrays['postings'][start:end]
+            tfs = arrays['tfs'][start:end].astype(np.float32)
+            idf = math.log(1 + (doc_count - (end - start) + 0.5) / ((end - start) + 0.5))
+            scores[docs] += query_tf * idf * tfs * (self.k1 + 1) / (tfs + norm[docs])
+
+        for field, value in (where or {}).items():
+            if field not in FILTER_FIELDS:
+                raise ValueError(f"Lexical index can only filter on {', '.join(FILTER_FIELDS)}, not {field}")
+            scores[arrays[field] != str(value)] = 0
+
+        matched = np.flatnonzero(scores > 0)
+        top = matched[np.argsort(-scores[matched], kind='stable')[:n_results]]
+        return [(str(arrays['ids'][i]), float(scores[i])) for i in top]
+
+
+def lexical_index_path(collection_name: str) -> str:
+    return os.path.join(os.getenv('LEXICAL_INDEX_PATH', DEFAULT_LEXICAL_INDEX_PATH), f"{collection_name}.npz")
+
+
+def open_lexical_indexes(collection_names: Iterable[str]) -> Dict[str, BM25Index]:
+    """Lazily loaded BM25 indexes for the named collections."""
+    return {name: BM25Index(lexical_index_path(name)) for name in collection_names}
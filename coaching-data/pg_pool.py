@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+PostgreSQL Connection Pool
+==========================
+
+Async access to the coaching database through a psycopg 3
+``AsyncConnectionPool``, so PostgreSQL writes yield to the event loop instead
+of blocking it and several tables can be written at once while embedding and
+ChromaDB writes carry on.
+
+The pool size comes from ``PG_POOL_MIN_SIZE``/``PG_POOL_SIZE``. Every checkout
+is timed, and ``stats()`` reports how long writers waited for a free
+connection: a high wait means the pool, not the database, is the bottleneck.
+"""
+
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, AsyncIterator
+import logging
+
+from psycopg import AsyncConnection
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+def conninfo_from_env() -> str:
+    """Connection string from the ``DB_*`` environment variables."""
+    return make_conninfo(
+        host=os.getenv('DB_HOST', 'localhost'),
+        dbname=os.getenv('DB_NAME', 'ast_coaching'),
+        user=os.getenv('DB_USER', 'postgres'),
+        password=os.getenv('DB_PASSWORD', ''),
+        port=os.getenv('DB_PORT', '5432')
+    )
+
+
+class PostgresPool:
+    """Async connection pool with checkout wait-time metrics."""
+
+    def __init__(self, conninfo: Optional[str] = None, min_size: Optional[int] = None,
+                 max_size: Optional[int] = None, timeout: Optional[float] = None):
+        self.max_size = max_size or int(os.getenv('PG_POOL_SIZE', '4'))
+        self.min_size = min(self.max_size, min_size or int(os.getenv('PG_POOL_MIN_SIZE', '1')))
+        self.pool = AsyncConnectionPool(
+            conninfo or conninfo_from_env(),
+            min_size=self.min_size,
+            max_size=self.max_size,
+            timeout=timeout or float(os.getenv('PG_POOL_TIMEOUT', '30')),
+            open=False
+        )
+        self.wait_times: List[float] = []
+        self.in_use = 0
+        self.peak_in_use = 0
+
+    async def open(self):
+        """Open the pool and wait for its first connections, so bad credentials fail fast."""
+        await self.pool.open(wait=True)
+        logger.info(f"✅ PostgreSQL pool open ({self.min_size}-{self.max_size} connections)")
+
+    async def close(self):
+        await self.pool.close()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[AsyncConnection]:
+        """
+        Borrow a connection for one transaction: committed when the block
+        exits normally, rolled back if it raises.
+        """
+        requested = time.perf_counter()
+        async with self.pool.connection() as connection:
+            self.wait_times.append(time.perf_counter() - requested)
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            try:
+                yield connection
+            finally:
+                self.in_use -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self.wait_times)
+
+        def percentile(p: float) -> float:
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 3) if waits else 0.0
+
+        return {
+            'min_size': self.min_size,
+            'max_size': self.max_size,
+            'checkouts': len(waits),
+            'peak_in_use': self.peak_in_use,
+            'wait_ms_total': round(sum(waits) * 1000, 3),
+            'wait_ms_p50': percentile(0.50),
+            'wait_ms_p95': percentile(0.95),
+            'wait_ms_max': round(waits[-1] * 1000, 3) if waits else 0.0
+        }
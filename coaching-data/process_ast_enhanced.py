@@ -11,13 +11,18 @@ import os
 import json
 import boto3
 import asyncio
+import argparse
 import aiohttp
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set
 import logging
 from datetime import datetime
-import numpy as np
 
-from process_ast_knowledge import ASTKnowledgeProcessor
+from process_ast_knowledge import ASTKnowledgeProcessor, MANIFEST_PATH
+from ingestion_pipeline import ProcessingStats, StagedPipeline, PipelineStage, unique_chunks
+from embedding_engine import ConcurrentEmbeddingEngine, titan_embed_fn
+from embedding_cache import open_embedding_cache
+from batch_retrieval import BatchRetriever
+from data_quality import DataQualityStage
 
 logger = logging.getLogger(__name__)
 
@@ -26,10 +31,19 @@ class EnhancedASTProcessor(ASTKnowledgeProcessor):
     
     def __init__(self):
         super().__init__()
-// //         self.bedrock_client = None
+        self.bedrock_client = None
         self.embedding_model = "amazon.titan-embed-text-v2:0"
-        self.batch_size = 25
+        self.embedding_dimensions = 1024
+        self.max_concurrency = int(os.getenv('BEDROCK_MAX_CONCURRENCY', '8'))
+        self.requests_per_second = float(os.getenv('BEDROCK_REQUESTS_PER_SECOND', '10'))
         self.max_retries = 3
+        self.embedding_stats = {}
+        self.embedding_engine = None
+        # Chunks whose embedding failed after retries; withheld from the vector store
+        self.missing_embeddings: List[Dict[str, Any]] = []
+        self.pipeline_queue_size = int(os.getenv('PIPELINE_QUEUE_SIZE', '2'))
+        self.pipeline_stats: Dict[str, Any] = {}
+        self.embedding_cache = open_embedding_cache()
         
     async def initialize(self):
         """Initialize with AWS Bedrock client."""
@@ -37,8 +51,8 @@ class EnhancedASTProcessor(ASTKnowledgeProcessor):
         
         try:
             # Initialize AWS Bedrock client
-// //             self.bedrock_client = boto3.client(
-// //                 service_name='bedrock-runtime',
+            self.bedrock_client = boto3.client(
+                service_name='bedrock-runtime',
                 region_name=os.getenv('AWS_BEDROCK_REGION', 'us-east-1'),
                 aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
                 aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
@@ -50,67 +64,61 @@ class EnhancedASTProcessor(ASTKnowledgeProcessor):
             logger.warning(f"⚠️ AWS Bedrock initialization failed: {e}")
             logger.info("📝 Falling back to default embeddings")
             
-    async def create_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Create embeddings using AWS Bedrock Titan or fallback."""
-// //         if self.bedrock_client:
-// //             return await self._create_bedrock_embeddings(texts)
+    async def create_embeddings(self, texts: List[str]) -> Optional[List[Optional[List[float]]]]:
+        """Create embeddings using AWS Bedrock Titan (None for texts that failed) or fallback."""
+        if self.bedrock_client:
+            return await self._create_bedrock_embeddings(texts)
         else:
             return await self._create_default_embeddings(texts)
             
-// //     async def _create_bedrock_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Create embeddings using AWS Bedrock Titan."""
-        embeddings = []
-        
-        # Process in batches
-        for i in range(0, len(texts), self.batch_size):
-            batch = texts[i:i + self.batch_size]
-// //             batch_embeddings = await self._process_bedrock_batch(batch)
-            embeddings.extend(batch_embeddings)
+    async def _create_bedrock_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Create embeddings using AWS Bedrock Titan, embedding only texts missing from the cache."""
+        if self.embedding_cache:
+            results = self.embedding_cache.get_many(self.embedding_model, self.embedding_dimensions, texts)
+        else:
+            results = [None] * len(texts)
             
-            # Rate limiting
-            await asyncio.sleep(0.1)
+        missing = [i for i, embedding in enumerate(results) if embedding is None]
+        if len(missing) < len(texts):
+            logger.info(f"♻️ Reusing {len(texts) - len(missing)} cached embeddings")
             
-        return embeddings
+        if missing:
+            fresh = await self._embed_with_bedrock([texts[i] for i in missing])
+            for i, embedding in zip(missing, fresh):
+                results[i] = embedding
+                
+            if self.embedding_cache:
+                embedded = [i for i in missing if results[i] is not None]
+                self.embedding_cache.put_many(
+                    self.embedding_model,
+                    self.embedding_dimensions,
+                    [texts[i] for i in embedded],
+                    [results[i] for i in embedded]
+                )
+                
+        # Items that exhausted their retries stay None rather than becoming zero vectors
+        return results
         
-// //     async def _process_bedrock_batch(self, texts: List[str]) -> List[List[float]]:
-        """Process a batch of texts with Bedrock."""
-        embeddings = []
+    async def _embed_with_bedrock(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Embed texts with AWS Bedrock Titan with bounded concurrency (None for failures)."""
+        # One engine per run, so the adaptive rate carries over between streamed batches
+        if self.embedding_engine is None:
+            self.embedding_engine = ConcurrentEmbeddingEngine(
+                titan_embed_fn(self.bedrock_client, self.embedding_model, self.embedding_dimensions),
+                max_concurrency=self.max_concurrency,
+                requests_per_second=self.requests_per_second,
+                max_retries=self.max_retries
+            )
+        engine = self.embedding_engine
+        results = await engine.embed_all(texts)
         
-        for text in texts:
-            for attempt in range(self.max_retries):
-                try:
-                    # Prepare request for Titan
-                    body = json.dumps({
-                        "inputText": text[:8000],  # Titan limit
-                        "dimensions": 1024,
-                        "normalize": True
-                    })
-                    
-                    # Call Bedrock
-// //                     response = self.bedrock_client.invoke_model(
-                        body=body,
-                        modelId=self.embedding_model,
-                        accept='application/json',
-                        contentType='application/json'
-                    )
-                    
-                    # Parse response
-                    response_body = json.loads(response.get('body').read())
-                    embedding = response_body.get('embedding')
-                    
-                    if embedding:
-                        embeddings.append(embedding)
-                        break
-                        
-                except Exception as e:
-                    if attempt == self.max_retries - 1:
-                        logger.error(f"❌ Bedrock embedding failed after {self.max_retries} attempts: {e}")
-                        # Create a zero vector as fallback
-                        embeddings.append([0.0] * 1024)
-                    else:
-                        await asyncio.sleep(2 ** attempt)  # Exponential backoff
-                        
-        return embeddings
+        for key in ('requested', 'succeeded', 'failed', 'retries', 'throttled', 'seconds'):
+            self.embedding_stats[key] = round(self.embedding_stats.get(key, 0) + engine.stats[key], 4)
+        self.embedding_stats['final_rate'] = engine.stats['final_rate']
+        
+        logger.info(f"🧠 Embedded {engine.stats['succeeded']}/{len(texts)} texts in {engine.stats['seconds']}s "
+                    f"({engine.stats['throttled']} throttled, {engine.stats['failed']} failed)")
+        return results
         
     async def _create_default_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Create embeddings using default ChromaDB embeddings."""
@@ -136,59 +144,137 @@ class EnhancedASTProcessor(ASTKnowledgeProcessor):
             
         logger.info("✅ Enhanced ChromaDB storage complete")
         
-    async def _store_with_embeddings(self, chunks: List[Dict[str, Any]], collection, collection_name: str):
-        """Store chunks with embeddings in ChromaDB collection."""
-        try:
-            # Prepare texts for embedding
-            texts = [chunk['content'] for chunk in chunks]
-            
-            # Create embeddings
-            logger.info(f"🧠 Creating embeddings for {len(texts)} {collection_name} chunks...")
-            embeddings = await self.create_embeddings(texts)
-            
-            # Prepare data for ChromaDB
-            ids = [chunk['id'] for chunk in chunks]
-            documents = texts
-            metadatas = []
+    def _chroma_writer(self, collection, collection_name: str, withheld: Optional[Set[str]] = None):
+        """
+        Batch writer that embeds each batch before storing it in ChromaDB; the
+        IDs of chunks left out for lack of an embedding are added to ``withheld``.
+        """
+        async def write(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            stored = await self._store_with_embeddings(batch, collection, collection_name)
+            if withheld is not None:
+                withheld.update({chunk['id'] for chunk in batch} - {chunk['id'] for chunk in stored})
+            return stored
+        return write
+        
+    async def _store_with_embeddings(self, chunks: List[Dict[str, Any]], collection,
+                                     collection_name: str) -> List[Dict[str, Any]]:
+        """
+        Store chunks with embeddings in ChromaDB collection (reusing any attached
+        by the embed stage). Returns the chunks stored, without failed embeddings.
+        """
+        if not chunks:
+            return []
             
-            for chunk in chunks:
-                metadata = {
-                    'title': chunk['title'],
-                    'source': chunk['source'],
-                    'type': chunk['type'],
-                    **chunk['metadata']
-                }
-                
-                # Convert complex types to strings
-                for key, value in metadata.items():
-                    if isinstance(value, (list, dict)):
-                        metadata[key] = json.dumps(value)
-                        
-                metadatas.append(metadata)
-                
-            # Add to collection
-            if embeddings:
-                # Use custom embeddings
-                collection.add(
-                    ids=ids,
-                    documents=documents,
-                    metadatas=metadatas,
-                    embeddings=embeddings
-                )
+        try:
+            if all('embedding' in chunk for chunk in chunks):
+                embeddings = [chunk['embedding'] for chunk in chunks]
             else:
-                # Let ChromaDB handle embeddings
-                collection.add(
-                    ids=ids,
-                    documents=documents,
-                    metadatas=metadatas
-                )
+                # Prepare texts for embedding
+                texts = [chunk['content'] for chunk in chunks]
                 
-            logger.info(f"📚 Stored {len(chunks)} enhanced chunks in {collection_name}")
+                # Create embeddings
+                logger.info(f"🧠 Creating embeddings for {len(texts)} {collection_name} chunks...")
+                embeddings = await self.create_embeddings(texts)
+            
+            if embeddings:
+                missing = [chunk for chunk, embedding in zip(chunks, embeddings) if embedding is None]
+                if missing:
+                    # A zero vector would match every query equally; keep these out of the index instead
+                    logger.warning(f"⚠️ No embedding for {len(missing)} {collection_name} chunks - not indexed")
+                    self.missing_embeddings.extend(
+                        {'id': chunk['id'], 'collection': collection_name, 'title': chunk.get('title', '')}
+                        for chunk in missing
+                    )
+                    embedded = [i for i, embedding in enumerate(embeddings) if embedding is not None]
+                    chunks = [chunks[i] for i in embedded]
+                    embeddings = [embeddings[i] for i in embedded]
+                if not chunks:
+                    return []
+                    
+            # Batched upsert; with no custom embeddings ChromaDB embeds the documents itself
+            await self._store_chunks_in_collection(chunks, collection, collection_name,
+                                                   embeddings=embeddings or None)
+            return chunks
             
         except Exception as e:
             logger.error(f"❌ Enhanced storage failed for {collection_name}: {e}")
             raise
             
+    def _build_pipeline(self) -> StagedPipeline:
+        """Embed -> vector store + BM25 -> PostgreSQL stages, each working on its own batch."""
+        return StagedPipeline([
+            PipelineStage('embed', self._embed_stage),
+            PipelineStage('vector_store', self._vector_store_stage),
+            PipelineStage('postgres', self._postgres_stage, workers=self.pg_writes_in_flight)
+        ], batch_size=self.ingest_batch_size, queue_size=self.pipeline_queue_size)
+        
+    async def _embed_stage(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Attach an ``embedding`` to each chunk (None if it failed) that the vector
+        store still needs; chunks pass through unchanged without Bedrock.
+        """
+        needed = {chunk['id'] for chunk in batch}
+        if self.journal:
+            # A resumed run does not re-embed chunks already in the vector store
+            needed = {chunk['id'] for sink, chunks in (
+                ('chroma.ast_methodology', [c for c in batch if c['source'] == 'AST_Compendium']),
+                ('chroma.team_profiles', [c for c in batch if c['source'] == 'team_profiles'])
+            ) for chunk in self.journal.pending(sink, chunks)}
+        to_embed = [chunk for chunk in batch if chunk['id'] in needed]
+        if not to_embed:
+            return batch
+            
+        logger.info(f"🧠 Creating embeddings for {len(to_embed)} chunks...")
+        embeddings = await self.create_embeddings([chunk['content'] for chunk in to_embed])
+        if embeddings is None:
+            # The vector store embeds the documents itself
+            return batch
+        by_id = {chunk['id']: embedding for chunk, embedding in zip(to_embed, embeddings)}
+        return [{**chunk, 'embedding': by_id[chunk['id']]} if chunk['id'] in by_id else chunk for chunk in batch]
+        
+    async def _vector_store_stage(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Write both collections' chunks to the vector store and add them to the
+        BM25 indexes. Chunks the vector store did not take are marked ``indexed: False``.
+        """
+        ast_chunks = [c for c in batch if c['source'] == 'AST_Compendium']
+        team_chunks = [c for c in batch if c['source'] == 'team_profiles']
+        
+        withheld: Set[str] = set()
+        await asyncio.gather(
+            self._journaled('chroma.ast_methodology',
+                            self._chroma_writer(self.ast_collection, "AST methodology", withheld))(ast_chunks),
+            self._journaled('chroma.team_profiles',
+                            self._chroma_writer(self.teams_collection, "team profiles", withheld))(team_chunks)
+        )
+        if ast_chunks:
+            self.lexical_indexes["ast_methodology"].add(ast_chunks)
+        if team_chunks:
+            self.lexical_indexes["team_profiles"].add(team_chunks)
+        return [{**chunk, 'indexed': False} if chunk['id'] in withheld else chunk for chunk in batch]
+        
+    async def _postgres_stage(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Write the batch to the three PostgreSQL tables, each in its own pooled
+        transaction; vector_embeddings only lists chunks the vector store holds.
+        """
+        ast_chunks = [c for c in batch if c['source'] == 'AST_Compendium']
+        team_chunks = [c for c in batch if c['source'] == 'team_profiles']
+        indexed = [c for c in batch if c.get('indexed', True)]
+        
+        writes = []
+        if indexed:
+            writes.append(self._journaled('postgres.vector_embeddings',
+                                          self._postgres_writer(self._store_vector_metadata))(indexed))
+        if ast_chunks:
+            writes.append(self._journaled('postgres.coach_knowledge_base',
+                                          self._postgres_writer(self._store_knowledge_base))(ast_chunks))
+        if team_chunks:
+            writes.append(self._journaled('postgres.user_profiles_extended',
+                                          self._postgres_writer(self._store_team_profiles))(team_chunks))
+        await asyncio.gather(*writes)
+        return batch
+        
     async def test_semantic_search(self):
         """Test semantic search capabilities."""
         logger.info("🔍 Testing semantic search capabilities...")
@@ -206,31 +292,28 @@ class EnhancedASTProcessor(ASTKnowledgeProcessor):
         
         results = {}
         
-        for query in test_queries:
-            try:
-                # Search AST methodology
-                ast_results = self.ast_collection.query(
-                    query_texts=[query],
-                    n_results=3
-                )
-                
-                # Search team profiles
-                team_results = self.teams_collection.query(
-                    query_texts=[query],
+        try:
+            # One batched query per collection, both collections in parallel
+            with BatchRetriever() as retriever:
+                found = retriever.search(
+                    {'ast_methodology': self.ast_collection, 'team_profiles': self.teams_collection},
+                    {'ast_methodology': test_queries, 'team_profiles': test_queries},
                     n_results=3
                 )
-                
+            for query in test_queries:
+                ast_results = found['ast_methodology'][query]
+                team_results = found['team_profiles'][query]
                 results[query] = {
-                    'ast_results': len(ast_results['documents'][0]),
-                    'team_results': len(team_results['documents'][0]),
-                    'top_ast_match': ast_results['documents'][0][0][:100] + "..." if ast_results['documents'][0] else None,
-                    'top_team_match': team_results['documents'][0][0][:100] + "..." if team_results['documents'][0] else None
+                    'ast_results': len(ast_results),
+                    'team_results': len(team_results),
+                    'top_ast_match': ast_results[0]['content'][:100] + "..." if ast_results else None,
+                    'top_team_match': team_results[0]['content'][:100] + "..." if team_results else None
                 }
                 
-            except Exception as e:
-                logger.warning(f"⚠️ Search failed for '{query}': {e}")
-                results[query] = {'error': str(e)}
-                
+        except Exception as e:
+            logger.warning(f"⚠️ Semantic search test failed: {e}")
+            results = {query: {'error': str(e)} for query in test_queries}
+            
         # Save test results
         with open('coaching-data/semantic_search_test.json', 'w') as f:
             json.dump(results, f, indent=2)
@@ -239,131 +322,109 @@ class EnhancedASTProcessor(ASTKnowledgeProcessor):
         
     async def validate_data_quality(self, chunks: List[Dict[str, Any]]):
         """Validate the quality of processed data."""
-        logger.info("🔍 Validating data quality...")
-        
-        quality_report = {
-            'total_chunks': len(chunks),
-            'validation_results': {},
-            'issues_found': [],
-            'recommendations': []
-        }
-        
-        # Check content length distribution
-        content_lengths = [len(chunk['content']) for chunk in chunks]
-        avg_length = np.mean(content_lengths)
-        min_length = min(content_lengths)
-        max_length = max(content_lengths)
+        stage = DataQualityStage(drop_duplicates=False)
+        stage.add_many(chunks)
+        self._write_quality_report(stage)
         
-        quality_report['validation_results']['content_length'] = {
-            'average': avg_length,
-            'minimum': min_length,
-            'maximum': max_length,
-            'very_short_chunks': len([l for l in content_lengths if l < 100])
-        }
-        
-        # Check metadata completeness
-        metadata_completeness = {}
-        for chunk in chunks:
-            for key in chunk['metadata']:
-                if key not in metadata_completeness:
-                    metadata_completeness[key] = 0
-                if chunk['metadata'][key]:
-                    metadata_completeness[key] += 1
-                    
-        quality_report['validation_results']['metadata_completeness'] = {
-            key: (count / len(chunks)) * 100 
-            for key, count in metadata_completeness.items()
-        }
-        
-        # Check for duplicates
-        content_hashes = set()
-        duplicates = 0
-        for chunk in chunks:
-            content_hash = hash(chunk['content'])
-            if content_hash in content_hashes:
-                duplicates += 1
-            content_hashes.add(content_hash)
-            
-        quality_report['validation_results']['duplicates'] = duplicates
+    def _write_quality_report(self, stage: DataQualityStage):
+        """Write the quality stage's summary to data_quality_report.json."""
+        logger.info("🔍 Validating data quality...")
+        quality_report = stage.report()
+        results = quality_report['validation_results']
         
-        # Generate recommendations
-        if quality_report['validation_results']['content_length']['very_short_chunks'] > len(chunks) * 0.1:
-            quality_report['issues_found'].append("High number of very short content chunks")
-            quality_report['recommendations'].append("Consider combining short chunks or filtering them out")
-            
-        if duplicates > 0:
-            quality_report['issues_found'].append(f"Found {duplicates} duplicate content chunks")
-            quality_report['recommendations'].append("Implement deduplication logic")
-            
         # Save quality report
         with open('coaching-data/data_quality_report.json', 'w') as f:
             json.dump(quality_report, f, indent=2)
             
         logger.info(f"📊 Data quality validation complete:")
         logger.info(f"   • Total chunks: {quality_report['total_chunks']}")
-        logger.info(f"   • Average content length: {avg_length:.0f} characters")
+        logger.info(f"   • Average content length: {results['content_length']['average']:.0f} characters")
+        logger.info(f"   • Duplicates: {results['exact_duplicates']} exact, {results['near_duplicates']} near "
+                    f"({results['duplicates_dropped']} dropped before embedding)")
         logger.info(f"   • Issues found: {len(quality_report['issues_found'])}")
         
-    async def process_with_enhancements(self):
-        """Enhanced processing pipeline with all features."""
+    async def process_with_enhancements(self, resume: bool = False, manifest_path: str = MANIFEST_PATH):
+        """Enhanced processing pipeline with all features (``resume`` skips checkpointed batches)."""
         logger.info("🚀 Starting Enhanced AST Knowledge Processing...")
         
         try:
             # Initialize with Bedrock
             await self.initialize()
+            self._start_journal('enhanced', resume)
             
-            # Process data (same as base class)
-            compendium_path = "coaching-data/source-files/AST_Compendium.md"
-            if os.path.exists(compendium_path):
-                ast_chunks = self.parse_ast_compendium(compendium_path)
-            else:
-                logger.warning(f"⚠️ AST Compendium not found at {compendium_path}")
-                ast_chunks = []
+            # Parse on a worker thread through the quality stage (which can drop duplicates
+            # before they are embedded), then pipeline batches through embedding, the vector
+            # store + BM25 and PostgreSQL, every stage working on a different batch at once
+            stats = ProcessingStats()
+            quality = DataQualityStage()
+            for index in self.lexical_indexes.values():
+                index.clear()
+            pipeline = self._build_pipeline()
+            records = []
+            
+            try:
+                routed = await pipeline.run(unique_chunks(quality.filter(self.iter_source_chunks(records)), stats))
+            finally:
+                self.pipeline_stats = pipeline.stats()
                 
-            team_pattern = "coaching-data/source-files/*team*.md"
-            team_chunks = self.parse_team_profiles(team_pattern)
-            all_chunks = ast_chunks + team_chunks
+            logger.info(f"🚇 Pipeline finished in {self.pipeline_stats['elapsed_seconds']}s "
+                        f"(stages busy {self.pipeline_stats['sum_of_stage_seconds']}s in total, "
+                        f"bottleneck: {self.pipeline_stats['bottleneck']})")
             
-            if not all_chunks:
+            if not routed:
                 logger.error("❌ No content processed")
+                # Nothing was written, so there is nothing for --resume to pick up
+                self._finish_journal()
                 return
                 
-            # Validate data quality
-            await self.validate_data_quality(all_chunks)
-            
-            # Enhanced storage with embeddings
-            await self.store_in_chromadb_with_embeddings(all_chunks)
+            await self._commit_full_run(records, manifest_path)
+            self._finish_journal()
             
-            # Store in PostgreSQL
-            await self.store_in_postgresql(all_chunks)
+            # Validate data quality
+            self._write_quality_report(quality)
             
             # Test semantic search
             await self.test_semantic_search()
             
             # Generate enhanced report
-            self._generate_enhanced_report(ast_chunks, team_chunks)
+            self._generate_enhanced_report(stats)
             
             logger.info("🎉 Enhanced AST knowledge processing completed!")
             
         except Exception as e:
             logger.error(f"❌ Enhanced processing failed: {e}")
+            if self.journal:
+                logger.info("⏯️ Completed batches are checkpointed - rerun with --resume to continue")
             raise
         finally:
-            if self.pg_connection:
-                self.pg_connection.close()
+            if self.pg_pool:
+                await self.pg_pool.close()
+            if self.embedding_cache:
+                self.embedding_cache.close()
+            if self.journal:
+                self.journal.close()
                 
-    def _generate_enhanced_report(self, ast_chunks: List[Dict], team_chunks: List[Dict]):
+    def _generate_enhanced_report(self, stats: ProcessingStats):
         """Generate enhanced processing report."""
         # Call parent method
-        self._generate_processing_report(ast_chunks, team_chunks)
+        self._generate_processing_report(stats)
         
         # Add enhancement details
         enhancement_report = {
             "timestamp": datetime.now().isoformat(),
             "enhancements": {
-// //                 "bedrock_integration": self.bedrock_client is not None,
+                "bedrock_integration": self.bedrock_client is not None,
                 "embedding_model": self.embedding_model,
-                "batch_size": self.batch_size,
+                "max_concurrency": self.max_concurrency,
+                "requests_per_second": self.requests_per_second,
+                "embedding_stats": self.embedding_stats,
+                "embedding_cache": self.embedding_cache.stats() if self.embedding_cache else None,
+                "pipeline": self.pipeline_stats,
+                # Re-running embeds only these (the rest are served from the embedding cache)
+                "missing_embeddings": {
+                    "count": len(self.missing_embeddings),
+                    "chunks": self.missing_embeddings
+                },
                 "semantic_search_tested": True,
                 "data_quality_validated": True
             },
@@ -381,8 +442,15 @@ class EnhancedASTProcessor(ASTKnowledgeProcessor):
 
 async def main():
     """Run enhanced processing."""
+    parser = argparse.ArgumentParser(description="Process AST knowledge with Bedrock embeddings")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue the last unfinished run, skipping batches it already stored")
+    parser.add_argument('--manifest', default=MANIFEST_PATH,
+                        help="Ingestion manifest to refresh for later --incremental runs")
+    args = parser.parse_args()
+    
     processor = EnhancedASTProcessor()
-    await processor.process_with_enhancements()
+    await processor.process_with_enhancements(resume=args.resume, manifest_path=args.manifest)
 
 if __name__ == "__main__":
     asyncio.run(main())
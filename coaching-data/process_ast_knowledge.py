@@ -13,42 +13,66 @@ Requirements:
 """
 
 import os
-import re
 import json
+import glob
 import uuid
 import hashlib
+import time
 import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 import aiohttp
-import psycopg2
-from psycopg2.extras import Json
-from typing import List, Dict, Any, Optional
+from psycopg.types.json import Jsonb
+from typing import List, Dict, Any, Optional, Iterator, Callable, Awaitable, Tuple
 import logging
 from datetime import datetime
-import chromadb
-from chromadb.config import Settings
+
+from retrieval_cache import bump_collection_version
+from ingestion_manifest import IngestionManifest, file_digest, chunk_entries
+from ingestion_pipeline import BatchingSink, ChunkRouter, ProcessingStats, stream_chunks
+from source_parser import SourceParser, COMPENDIUM_PATH, TEAM_FILES_PATTERN, init_parse_worker, parse_file_in_worker
+from chroma_writer import ChromaBatchWriter
+from vector_store import open_vector_store, VECTOR_STORE_BACKENDS
+from lexical_index import open_lexical_indexes
+from pg_pool import PostgresPool
+from ingestion_journal import open_ingestion_journal
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class ASTKnowledgeProcessor:
+MANIFEST_PATH = "coaching-data/ingestion_manifest.json"
+# PostgreSQL's limit on bind parameters in one statement
+MAX_BIND_PARAMETERS = 65535
+
+class ASTKnowledgeProcessor(SourceParser):
     """Main processor for AST knowledge base content."""
     
-    def __init__(self):
+    def __init__(self, pg_batch_size: Optional[int] = None, parse_workers: Optional[int] = None,
+                 vocabulary_path: Optional[str] = None, chunk_max_tokens: Optional[int] = None,
+                 chunk_overlap_tokens: Optional[int] = None, vector_store: Optional[str] = None):
+        super().__init__(vocabulary_path, chunk_max_tokens, chunk_overlap_tokens)
         self.chroma_client = None
-        self.pg_connection = None
+        self.vector_store = vector_store or os.getenv('VECTOR_STORE_BACKEND', 'http')
+        self.pg_pool = None
         self.ast_collection = None
         self.teams_collection = None
+        self.pg_batch_size = pg_batch_size or int(os.getenv('PG_BATCH_SIZE', '500'))
+        self.pg_write_stats: Dict[str, Dict[str, float]] = {}
+        # Batches per PostgreSQL table written in the background while ingestion continues
+        self.pg_writes_in_flight = int(os.getenv('PG_WRITES_IN_FLIGHT', '2'))
+        self.chroma_writer = ChromaBatchWriter()
+        self.lexical_indexes = open_lexical_indexes(["ast_methodology", "team_profiles"])
+        self.ingest_batch_size = int(os.getenv('INGEST_BATCH_SIZE', '100'))
+        self.sink_stats: Dict[str, Dict[str, int]] = {}
+        self.journal = None
+        self.parse_workers = parse_workers or int(os.getenv('PARSE_WORKERS', '1'))
         
     async def initialize(self):
         """Initialize database connections and collections."""
         try:
-            # Initialize ChromaDB
-            self.chroma_client = chromadb.HttpClient(
-                host="localhost",
-                port=8000,
-                settings=Settings(allow_reset=True)
-            )
+            # Initialize the vector store (ChromaDB server, embedded ChromaDB or NumPy index)
+            self.chroma_client = open_vector_store(self.vector_store)
             
             # Create or get collections
             self.ast_collection = self.chroma_client.get_or_create_collection(
@@ -61,14 +85,9 @@ class ASTKnowledgeProcessor:
                 metadata={"description": "Team profiles and collaboration patterns"}
             )
             
-            # Initialize PostgreSQL connection
-            self.pg_connection = psycopg2.connect(
-                host=os.getenv('DB_HOST', 'localhost'),
-                database=os.getenv('DB_NAME', 'ast_coaching'),
-                user=os.getenv('DB_USER', 'postgres'),
-                password=os.getenv('DB_PASSWORD', ''),
-                port=os.getenv('DB_PORT', '5432')
-            )
+            # Initialize the PostgreSQL connection pool
+            self.pg_pool = PostgresPool()
+            await self.pg_pool.open()
             
             logger.info("✅ Database connections initialized successfully")
             
@@ -76,449 +95,69 @@ class ASTKnowledgeProcessor:
             logger.error(f"❌ Initialization failed: {e}")
             raise
             
-    def parse_ast_compendium(self, file_path: str) -> List[Dict[str, Any]]:
-        """Parse AST Compendium into semantic chunks."""
-        logger.info("📚 Processing AST Compendium...")
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        chunks = []
-        
-        # Split by main sections (## headers)
-        sections = re.split(r'\n## ', content)
-        
-        for i, section in enumerate(sections):
-            if not section.strip():
-                continue
-                
-            # Extract section title
-            lines = section.split('\n')
-            title = lines[0].strip().replace('#', '').strip()
-            
-            # Get section content
-            section_content = '\n'.join(lines[1:]).strip()
-            
-            # Skip if too short
-            if len(section_content) < 100:
-                continue
-                
-            # Create chunk metadata
-            chunk_id = str(uuid.uuid4())
-            
-            chunk = {
-                'id': chunk_id,
-                'title': title,
-                'content': section_content,
-                'source': 'AST_Compendium',
-                'type': 'methodology',
-                'section_number': i,
-                'word_count': len(section_content.split()),
-                'metadata': {
-                    'source_file': 'AST_Compendium.md',
-                    'section_title': title,
-                    'content_type': self._classify_content_type(title, section_content),
-                    'key_concepts': self._extract_key_concepts(section_content),
-                    'practical_applications': self._extract_applications(section_content)
-                }
-            }
-            
-            chunks.append(chunk)
-            
-        # Process subsections for detailed content
-        subsection_chunks = self._process_subsections(content)
-        chunks.extend(subsection_chunks)
-        
-        logger.info(f"📊 Extracted {len(chunks)} chunks from AST Compendium")
-        return chunks
-        
-    def _classify_content_type(self, title: str, content: str) -> str:
-        """Classify the type of content for better retrieval."""
-        title_lower = title.lower()
-        content_lower = content.lower()
-        
-        if any(word in title_lower for word in ['foundation', 'theory', 'concept', 'root']):
-            return 'theoretical_foundation'
-        elif any(word in title_lower for word in ['methodology', 'approach', 'framework']):
-            return 'methodology'
-        elif any(word in title_lower for word in ['strength', 'five strengths']):
-            return 'strengths_framework'
-        elif any(word in title_lower for word in ['flow', 'engagement']):
-            return 'flow_theory'
-        elif any(word in title_lower for word in ['team', 'collaboration', 'constellation']):
-            return 'team_dynamics'
-        elif any(word in title_lower for word in ['assessment', 'mbti', 'disc', 'taro']):
-            return 'assessment_integration'
-        elif any(word in title_lower for word in ['application', 'contemporary', 'hybrid']):
-            return 'practical_application'
-        else:
-            return 'general_knowledge'
-            
-    def _extract_key_concepts(self, content: str) -> List[str]:
-        """Extract key concepts from content."""
-        # Common AST concepts to look for
-        ast_concepts = [
-            'imagination', 'thinking', 'planning', 'acting', 'feeling',
-            'flow state', 'heliotropic effect', 'strengths profusion',
-            'future self-continuity', 'self-awareness', 'telos', 'entelechy',
-            'arete', 'eudaimonia', 'quintessence', 'phronesis',
-            'visual thinking', 'star card', 'constellation mapping',
-            'appreciative inquiry', 'positive psychology'
-        ]
-        
-        found_concepts = []
-        content_lower = content.lower()
-        
-        for concept in ast_concepts:
-            if concept in content_lower:
-                found_concepts.append(concept)
-                
-        return found_concepts
-        
-    def _extract_applications(self, content: str) -> List[str]:
-        """Extract practical applications mentioned in content."""
-        applications = []
-        
-        # Look for application indicators
-        app_patterns = [
-            r'application[s]?\s*include[s]?:\s*([^.]+)',
-            r'use[d]?\s+for:\s*([^.]+)',
-            r'helps?\s+teams?\s+([^.]+)',
-            r'enables?\s+([^.]+)',
-            r'specific applications[^:]*:\s*([^.]+)'
-        ]
-        
-        for pattern in app_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                applications.append(match.group(1).strip())
-                
-        return applications[:5]  # Limit to top 5
-        
-    def _process_subsections(self, content: str) -> List[Dict[str, Any]]:
-        """Process detailed subsections for more granular content."""
-        chunks = []
-        
-        # Look for numbered subsections (1., 2., etc.)
-        subsection_pattern = r'\n(\d+\.\s+[^\n]+)\n([^#]+?)(?=\n\d+\.|$)'
-        matches = re.finditer(subsection_pattern, content, re.MULTILINE | re.DOTALL)
-        
-        for match in matches:
-            title = match.group(1).strip()
-            subsection_content = match.group(2).strip()
-            
-            if len(subsection_content) < 200:  # Skip short subsections
-                continue
-                
-            chunk_id = str(uuid.uuid4())
-            
-            chunk = {
-                'id': chunk_id,
-                'title': title,
-                'content': subsection_content,
-                'source': 'AST_Compendium',
-                'type': 'subsection',
-                'metadata': {
-                    'source_file': 'AST_Compendium.md',
-                    'section_title': title,
-                    'content_type': 'detailed_explanation',
-                    'key_concepts': self._extract_key_concepts(subsection_content)
-                }
-            }
-            
-            chunks.append(chunk)
-            
-        return chunks
-        
     def parse_team_profiles(self, team_files_pattern: str) -> List[Dict[str, Any]]:
         """Parse team profile files into structured data."""
-        logger.info("👥 Processing team profiles...")
-        
-        import glob
-        team_files = glob.glob(team_files_pattern)
-        all_teams = []
-        
-        for file_path in team_files:
-            try:
-                teams = self._parse_single_team_file(file_path)
-                all_teams.extend(teams)
-            except Exception as e:
-                logger.warning(f"⚠️ Failed to parse {file_path}: {e}")
-                continue
-                
+        all_teams = list(self.iter_team_profiles(team_files_pattern))
         logger.info(f"👥 Processed {len(all_teams)} team profiles")
         return all_teams
         
-    def _parse_single_team_file(self, file_path: str) -> List[Dict[str, Any]]:
-        """Parse a single team profile file."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        teams = []
-        
-        # Extract team name from filename or content
-        filename = os.path.basename(file_path)
-        team_name = self._extract_team_name(filename, content)
-        
-        # Split by team sections if multiple teams in one file
-        team_sections = self._split_team_sections(content)
-        
-        for i, section in enumerate(team_sections):
-            team_data = self._parse_team_section(section, team_name, i)
-            if team_data:
-                teams.append(team_data)
-                
-        return teams
-        
-    def _extract_team_name(self, filename: str, content: str) -> str:
-        """Extract team name from filename or content."""
-        # Try to get from filename
-        name_match = re.search(r'(\d+_)?(.+?)\.md$', filename)
-        if name_match:
-            name = name_match.group(2).replace('-', ' ').replace('_', ' ')
-            return name.title()
-            
-        # Try to get from content header
-        header_match = re.search(r'^#\s+(.+)', content, re.MULTILINE)
-        if header_match:
-            return header_match.group(1).strip()
-            
-        return "Unknown Team"
-        
-    def _split_team_sections(self, content: str) -> List[str]:
-        """Split content into individual team sections."""
-        # Look for team headers
-        team_headers = re.finditer(r'\n##\s+([^#\n]+)', content)
-        sections = []
-        
-        headers = list(team_headers)
-        for i, header in enumerate(headers):
-            start = header.start()
-            end = headers[i + 1].start() if i + 1 < len(headers) else len(content)
-            section = content[start:end].strip()
-            sections.append(section)
-            
-        if not sections:
-            # No team headers found, treat entire content as one team
-            sections = [content]
-            
-        return sections
-        
-    def _parse_team_section(self, section: str, base_name: str, index: int) -> Optional[Dict[str, Any]]:
-        """Parse individual team section into structured data."""
-        try:
-            team_id = str(uuid.uuid4())
-            
-            # Extract team name
-            team_name_match = re.search(r'##\s+([^\n]+)', section)
-            team_name = team_name_match.group(1).strip() if team_name_match else f"{base_name} {index + 1}"
-            
-            # Extract team composition
-            composition = self._extract_team_composition(section)
-            
-            # Extract strengths distribution
-            strengths_dist = self._extract_strengths_distribution(section)
-            
-            # Extract flow synergies
-            flow_synergies = self._extract_flow_synergies(section)
-            
-            # Extract key insights
-            insights = self._extract_team_insights(section)
-            
-            # Extract individual profiles if present
-            individual_profiles = self._extract_individual_profiles(section)
-            
-            team_data = {
-                'id': team_id,
-                'name': team_name,
-                'content': section,
-                'source': 'team_profiles',
-                'type': 'team_profile',
-                'metadata': {
-                    'team_composition': composition,
-                    'strengths_distribution': strengths_dist,
-                    'flow_synergies': flow_synergies,
-                    'key_insights': insights,
-                    'individual_profiles': individual_profiles,
-                    'team_size': len(composition) if composition else 0,
-                    'department': self._classify_department(team_name, section)
-                }
-            }
-            
-            return team_data
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Failed to parse team section: {e}")
-            return None
-            
-    def _extract_team_composition(self, section: str) -> List[Dict[str, str]]:
-        """Extract team member composition."""
-        composition = []
-        
-        # Look for member patterns
-        member_patterns = [
-            r'[*-]\s*\*\*([^*]+)\*\*\s*\(([^)]+)\)\s*[–-]\s*([^\n]+)',
-            r'###\s+([A-Z\s]+)\s*\([^)]+\)\n[^#]+?Background:\s*([^\n]+)'
-        ]
-        
-        for pattern in member_patterns:
-            matches = re.finditer(pattern, section, re.MULTILINE)
-            for match in matches:
-                if len(match.groups()) >= 3:
-                    member = {
-                        'name': match.group(1).strip(),
-                        'role': match.group(2).strip(),
-                        'background': match.group(3).strip()
-                    }
-                    composition.append(member)
-                    
-        return composition
-        
-    def _extract_strengths_distribution(self, section: str) -> Dict[str, List[str]]:
-        """Extract strengths distribution information."""
-        distribution = {}
-        
-        strength_patterns = [
-            r'\*\*(\w+)\s+Dominant\*\*:\s*([^\n]+)',
-            r'(\w+)\s+Dominant:\s*([^\n]+)'
-        ]
-        
-        for pattern in strength_patterns:
-            matches = re.finditer(pattern, section, re.IGNORECASE)
-            for match in matches:
-                strength = match.group(1).strip().title()
-                members = [m.strip() for m in match.group(2).split(',')]
-                distribution[strength] = members
-                
-        return distribution
-        
-    def _extract_flow_synergies(self, section: str) -> List[str]:
-        """Extract flow synergies information."""
-        synergies = []
-        
-        # Look for flow synergies section
-        synergies_match = re.search(
-            r'### Flow Synergies\s*\n([^#]+?)(?=\n###|$)', 
-            section, 
-            re.MULTILINE | re.DOTALL
-        )
-        
-        if synergies_match:
-            synergies_text = synergies_match.group(1)
-            # Extract bullet points
-            bullet_matches = re.finditer(r'[*-]\s*\*\*([^*]+)\*\*:\s*([^\n]+)', synergies_text)
-            for match in bullet_matches:
-                synergy = f"{match.group(1).strip()}: {match.group(2).strip()}"
-                synergies.append(synergy)
-                
-        return synergies
-        
-    def _extract_team_insights(self, section: str) -> List[str]:
-        """Extract key insights about the team."""
-        insights = []
-        
-        insights_patterns = [
-            r'### Key Insights\s*\n([^#]+?)(?=\n###|$)',
-            r'### Insights\s*\n([^#]+?)(?=\n###|$)'
-        ]
-        
-        for pattern in insights_patterns:
-            match = re.search(pattern, section, re.MULTILINE | re.DOTALL)
-            if match:
-                insights_text = match.group(1).strip()
-                # Split into sentences
-                sentences = re.split(r'[.!?]+', insights_text)
-                insights.extend([s.strip() for s in sentences if len(s.strip()) > 20])
-                
-        return insights
-        
-    def _extract_individual_profiles(self, section: str) -> List[Dict[str, Any]]:
-        """Extract individual team member profiles."""
-        profiles = []
-        
-        # Look for individual profile sections
-        profile_pattern = r'###\s+([A-Z\s]+(?:\([^)]+\))?)(?:\n|\s)([^#]+?)(?=\n###|$)'
-        matches = re.finditer(profile_pattern, section, re.MULTILINE | re.DOTALL)
+    def iter_team_profiles(self, team_files_pattern: str, records: Optional[list] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield team profile chunks file by file, appending each parsed file's
+        (path, digest, manifest entries) to ``records`` if given.
+        """
+        logger.info("👥 Processing team profiles...")
         
-        for match in matches:
-            name_and_role = match.group(1).strip()
-            profile_content = match.group(2).strip()
-            
-            profile = {
-                'name_role': name_and_role,
-                'content': profile_content,
-                'strengths': self._extract_individual_strengths(profile_content),
-                'flow_indicators': self._extract_flow_indicators(profile_content)
-            }
-            
-            profiles.append(profile)
+        file_paths = sorted(glob.glob(team_files_pattern))
+        digests = {file_path: file_digest(file_path) for file_path in file_paths} if records is not None else {}
+        for file_path, teams, error in self._parse_files(file_paths):
+            if error:
+                logger.warning(f"⚠️ Failed to parse {file_path}: {error}")
+                continue
+            if records is not None:
+                records.append((file_path, digests[file_path], chunk_entries(teams)))
+            yield from teams
+            
+    def _parse_files(self, file_paths: List[str]) -> Iterator[Tuple[str, List[Dict[str, Any]], Optional[str]]]:
+        """
+        Parse source files, yielding (file path, chunks, error) in input order.
+        
+        With ``parse_workers`` > 1 files are fanned out to a process pool in
+        chunked dispatches; results are still merged in input order so chunk
+        order (and therefore every downstream batch) is deterministic.
+        """
+        if self.parse_workers <= 1 or len(file_paths) < 2:
+            for file_path in file_paths:
+                yield self._parse_file_safely(file_path)
+            return
+            
+        workers = min(self.parse_workers, len(file_paths))
+        chunksize = max(1, len(file_paths) // (workers * 4))
+        logger.info(f"⚡ Parsing {len(file_paths)} files with {workers} worker processes")
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_parse_worker,
+                                 initargs=(self._parser_options(),)) as executor:
+            yield from executor.map(parse_file_in_worker, file_paths, chunksize=chunksize)
+            
+    def iter_source_chunks(self, records: Optional[list] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every chunk from the compendium and team profile sources. With
+        ``records``, each parsed file's (path, digest, manifest entries) is
+        appended once its last chunk has been yielded.
+        """
+        if os.path.exists(COMPENDIUM_PATH):
+            digest = file_digest(COMPENDIUM_PATH) if records is not None else None
+            entries = {}
+            for chunk in self.iter_ast_compendium(COMPENDIUM_PATH):
+                if records is not None:
+                    entries.update(chunk_entries([chunk]))
+                yield chunk
+            if records is not None:
+                records.append((COMPENDIUM_PATH, digest, entries))
+        else:
+            logger.warning(f"⚠️ AST Compendium not found at {COMPENDIUM_PATH}")
             
-        return profiles
-        
-    def _extract_individual_strengths(self, content: str) -> Dict[str, str]:
-        """Extract individual strengths profile."""
-        strengths = {}
-        
-        # Look for strengths profile section
-        strengths_match = re.search(
-            r'\*\*Strengths Profile:\*\*\s*\n((?:\d+\.\s+[^\n]+\n?)+)', 
-            content
-        )
-        
-        if strengths_match:
-            strengths_text = strengths_match.group(1)
-            strength_lines = re.finditer(r'\d+\.\s+(\w+)\s+\(([^)]+)\)\s*[–-]\s*([^\n]+)', strengths_text)
-            
-            for match in strength_lines:
-                strength_name = match.group(1)
-                percentage = match.group(2)
-                description = match.group(3)
-                strengths[strength_name] = {
-                    'percentage': percentage,
-                    'description': description
-                }
-                
-        return strengths
-        
-    def _extract_flow_indicators(self, content: str) -> List[str]:
-        """Extract flow state indicators."""
-        indicators = []
-        
-        flow_match = re.search(
-            r'\*\*Flow State Indicators:\*\*\s*\n([^*]+?)(?=\n\*\*|$)', 
-            content
-        )
-        
-        if flow_match:
-            flow_text = flow_match.group(1).strip()
-            # Extract bullet points or list items
-            indicator_matches = re.finditer(r'[*-]\s*([^\n]+)', flow_text)
-            for match in indicator_matches:
-                indicators.append(match.group(1).strip())
-                
-        return indicators
-        
-    def _classify_department(self, team_name: str, content: str) -> str:
-        """Classify team department based on name and content."""
-        name_lower = team_name.lower()
-        content_lower = content.lower()
-        
-        dept_keywords = {
-            'engineering': ['development', 'engineering', 'technical', 'software', 'backend', 'frontend', 'devops'],
-            'sales': ['sales', 'revenue', 'client', 'customer', 'business development'],
-            'marketing': ['marketing', 'brand', 'content', 'social media', 'campaign'],
-            'hr': ['human resources', 'hr', 'people', 'talent', 'recruitment'],
-            'product': ['product', 'design', 'ux', 'ui', 'user experience'],
-            'operations': ['operations', 'ops', 'logistics', 'supply chain'],
-            'finance': ['finance', 'financial', 'accounting', 'budget'],
-            'leadership': ['executive', 'leadership', 'management', 'director', 'ceo', 'cto', 'cfo']
-        }
-        
-        for dept, keywords in dept_keywords.items():
-            if any(keyword in name_lower or keyword in content_lower for keyword in keywords):
-                return dept
-                
-        return 'other'
+        yield from self.iter_team_profiles(TEAM_FILES_PATTERN, records)
         
     async def store_in_chromadb(self, chunks: List[Dict[str, Any]]):
         """Store processed chunks in ChromaDB."""
@@ -538,37 +177,34 @@ class ASTKnowledgeProcessor:
             
         logger.info("✅ ChromaDB storage complete")
         
-    async def _store_chunks_in_collection(self, chunks: List[Dict[str, Any]], collection, collection_name: str):
-        """Store chunks in a specific ChromaDB collection."""
-        try:
-            # Prepare data for ChromaDB
-            ids = [chunk['id'] for chunk in chunks]
-            documents = [chunk['content'] for chunk in chunks]
-            metadatas = []
-            
-            for chunk in chunks:
-                # Flatten metadata for ChromaDB
-                metadata = {
-                    'title': chunk['title'],
-                    'source': chunk['source'],
-                    'type': chunk['type'],
-                    **chunk['metadata']
-                }
-                
-                # Convert lists to strings for ChromaDB compatibility
-                for key, value in metadata.items():
-                    if isinstance(value, list):
-                        metadata[key] = json.dumps(value)
-                    elif isinstance(value, dict):
-                        metadata[key] = json.dumps(value)
-                        
-                metadatas.append(metadata)
+    def _chroma_metadata(self, chunk: Dict[str, Any]) -> Dict[str, Any]:
+        """Flatten a chunk's metadata for ChromaDB, which only accepts scalar values."""
+        metadata = {
+            'title': chunk['title'],
+            'source': chunk['source'],
+            'type': chunk['type'],
+            **chunk['metadata']
+        }
+        
+        # Convert lists and dicts to strings for ChromaDB compatibility
+        for key, value in metadata.items():
+            if isinstance(value, (list, dict)):
+                metadata[key] = json.dumps(value)
                 
-            # Add to collection
-            collection.add(
-                ids=ids,
-                documents=documents,
-                metadatas=metadatas
+        return metadata
+        
+    async def _store_chunks_in_collection(self, chunks: List[Dict[str, Any]], collection, collection_name: str,
+                                          embeddings: Optional[List[List[float]]] = None):
+        """Store chunks in a specific ChromaDB collection (with precomputed embeddings, if given)."""
+        try:
+            # Upsert in size-bounded sub-batches so deterministic IDs can be re-stored across runs
+            await self.chroma_writer.upsert(
+                collection,
+                collection_name,
+                ids=[chunk['id'] for chunk in chunks],
+                documents=[chunk['content'] for chunk in chunks],
+                metadatas=[self._chroma_metadata(chunk) for chunk in chunks],
+                embeddings=embeddings
             )
             
             logger.info(f"📚 Stored {len(chunks)} chunks in {collection_name} collection")
@@ -578,81 +214,189 @@ class ASTKnowledgeProcessor:
             raise
             
     async def store_in_postgresql(self, chunks: List[Dict[str, Any]]):
-        """Store processed chunks in PostgreSQL coaching tables."""
+        """Store processed chunks in PostgreSQL coaching tables, one concurrent transaction per table."""
         logger.info("💾 Storing content in PostgreSQL...")
         
-        try:
-            cursor = self.pg_connection.cursor()
-            
-            # Store AST methodology content
-            ast_chunks = [c for c in chunks if c['source'] == 'AST_Compendium']
-            await self._store_knowledge_base(ast_chunks, cursor)
-            
-            # Store team profiles
-            team_chunks = [c for c in chunks if c['source'] == 'team_profiles']
-            await self._store_team_profiles(team_chunks, cursor)
-            
-            # Store vector metadata
-            await self._store_vector_metadata(chunks, cursor)
-            
-            self.pg_connection.commit()
-            cursor.close()
-            
-            logger.info("✅ PostgreSQL storage complete")
-            
-        except Exception as e:
-            logger.error(f"❌ PostgreSQL storage failed: {e}")
-            self.pg_connection.rollback()
-            raise
+        ast_chunks = [c for c in chunks if c['source'] == 'AST_Compendium']
+        team_chunks = [c for c in chunks if c['source'] == 'team_profiles']
+        
+        await asyncio.gather(
+            self._postgres_writer(self._store_knowledge_base)(ast_chunks),
+            self._postgres_writer(self._store_team_profiles)(team_chunks),
+            self._postgres_writer(self._store_vector_metadata)(chunks)
+        )
+        
+        logger.info("✅ PostgreSQL storage complete")
             
+    def _chroma_writer(self, collection, collection_name: str) -> Callable[[List[Dict[str, Any]]], Awaitable[None]]:
+        """Batch writer for one ChromaDB collection."""
+        async def write(batch: List[Dict[str, Any]]):
+            await self._store_chunks_in_collection(batch, collection, collection_name)
+        return write
+        
+    def _lexical_writer(self, collection_name: str) -> Callable[[List[Dict[str, Any]]], Awaitable[None]]:
+        """Batch writer adding chunks to a collection's BM25 index (saved by publish_search_indexes)."""
+        async def write(batch: List[Dict[str, Any]]):
+            self.lexical_indexes[collection_name].add(batch)
+        return write
+        
+    def _postgres_writer(self, store_fn) -> Callable[[List[Dict[str, Any]]], Awaitable[None]]:
+        """Batch writer that runs one PostgreSQL store method per batch in its own pooled transaction."""
+        async def write(batch: List[Dict[str, Any]]):
+            try:
+                async with self.pg_pool.connection() as connection:
+                    async with connection.cursor() as cursor:
+                        await store_fn(batch, cursor)
+            except Exception as e:
+                logger.error(f"❌ PostgreSQL storage failed: {e}")
+                raise
+        return write
+        
+    def _journaled(self, sink_name: str, writer: Callable[[List[Dict[str, Any]]], Awaitable[Any]]
+                   ) -> Callable[[List[Dict[str, Any]]], Awaitable[Any]]:
+        """Checkpoint a sink's batches in the ingestion journal, skipping ones a resumed run already wrote."""
+        return self.journal.wrap(sink_name, writer) if self.journal else writer
+        
+    def _start_journal(self, mode: str, resume: bool):
+        self.journal = open_ingestion_journal()
+        if self.journal:
+            self.journal.start(mode, resume)
+        elif resume:
+            logger.warning("⚠️ --resume needs the ingestion journal (INGEST_JOURNAL_PATH is off)")
+            
+    def _finish_journal(self):
+        if self.journal:
+            self.journal.finish()
+            
+    def _build_router(self, incremental: bool = False) -> ChunkRouter:
+        """
+        Route chunks by source to per-collection ChromaDB and BM25 sinks and
+        per-table PostgreSQL sinks. Full runs rebuild the BM25 indexes from scratch.
+        
+        PostgreSQL sinks write in the background, so the three tables are
+        written concurrently with each other and with embedding and ChromaDB.
+        ChromaDB and PostgreSQL batches are checkpointed in the journal; BM25
+        is rebuilt in memory every run and saved at the end, so it is not.
+        """
+        router = ChunkRouter()
+        size = self.ingest_batch_size
+        in_flight = self.pg_writes_in_flight
+        
+        if not incremental:
+            for index in self.lexical_indexes.values():
+                index.clear()
+                
+        router.add_sink(BatchingSink('chroma.ast_methodology', self._journaled(
+                            'chroma.ast_methodology', self._chroma_writer(self.ast_collection, "AST methodology")
+                        ), size), 'AST_Compendium')
+        router.add_sink(BatchingSink('chroma.team_profiles', self._journaled(
+                            'chroma.team_profiles', self._chroma_writer(self.teams_collection, "team profiles")
+                        ), size), 'team_profiles')
+        router.add_sink(BatchingSink('lexical.ast_methodology', self._lexical_writer("ast_methodology"), size),
+                        'AST_Compendium')
+        router.add_sink(BatchingSink('lexical.team_profiles', self._lexical_writer("team_profiles"), size),
+                        'team_profiles')
+        for name, store_fn, source in (
+            ('postgres.coach_knowledge_base', self._store_knowledge_base, 'AST_Compendium'),
+            ('postgres.user_profiles_extended', self._store_team_profiles, 'team_profiles'),
+            ('postgres.vector_embeddings', self._store_vector_metadata, None)
+        ):
+            router.add_sink(BatchingSink(name, self._journaled(name, self._postgres_writer(store_fn)),
+                                         size, in_flight), source)
+        return router
+        
+    async def _bulk_upsert(self, cursor, table: str, query: str, rows: List[tuple], key_columns: List[int]):
+        """
+        Write rows with batched multi-row INSERT statements and report throughput.
+        
+        ``query`` has a single ``VALUES %s``, expanded to one placeholder group
+        per row for every page of ``pg_batch_size`` rows (fewer if a page would
+        exceed PostgreSQL's bind parameter limit). Rows sharing a
+        conflict key are collapsed (last wins), since a single
+        INSERT ... ON CONFLICT DO UPDATE cannot touch the same row twice.
+        """
+        unique_rows = {}
+        for row in rows:
+            unique_rows[tuple(row[i] for i in key_columns)] = row
+        rows = list(unique_rows.values())
+        
+        if not rows:
+            return
+            
+        row_placeholders = '(' + ', '.join(['%s'] * len(rows[0])) + ')'
+        page_size = min(self.pg_batch_size, MAX_BIND_PARAMETERS // len(rows[0]))
+        start = time.perf_counter()
+        for i in range(0, len(rows), page_size):
+            page = rows[i:i + page_size]
+            statement = query.replace('VALUES %s', 'VALUES ' + ', '.join([row_placeholders] * len(page)), 1)
+            await cursor.execute(statement, [value for row in page for value in row])
+        elapsed = time.perf_counter() - start
+        
+        batches = -(-len(rows) // page_size)
+        rows_per_second = len(rows) / elapsed if elapsed > 0 else float('inf')
+        logger.info(f"💾 Wrote {len(rows)} rows to {table} in {batches} batches ({rows_per_second:,.0f} rows/s)")
+        
+        # Accumulate across calls, since streaming ingestion writes each table in several flushes
+        totals = self.pg_write_stats.setdefault(table, {'rows': 0, 'batches': 0, 'seconds': 0.0})
+        totals['rows'] += len(rows)
+        totals['batches'] += batches
+        totals['seconds'] = round(totals['seconds'] + elapsed, 4)
+        totals['rows_per_second'] = round(totals['rows'] / totals['seconds'], 1) if totals['seconds'] else None
+        
     async def _store_knowledge_base(self, chunks: List[Dict[str, Any]], cursor):
         """Store AST methodology in coach_knowledge_base table."""
+        insert_query = """
+        INSERT INTO coach_knowledge_base 
+        (id, title, content, category, tags, metadata, created_at, updated_at)
+        VALUES %s
+        ON CONFLICT (id) DO UPDATE SET
+        content = EXCLUDED.content,
+        metadata = EXCLUDED.metadata,
+        updated_at = EXCLUDED.updated_at
+        """
+        
+        now = datetime.now()
+        rows = []
         for chunk in chunks:
             try:
-                insert_query = """
-                INSERT INTO coach_knowledge_base 
-                (id, title, content, category, tags, metadata, created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (id) DO UPDATE SET
-                content = EXCLUDED.content,
-                metadata = EXCLUDED.metadata,
-                updated_at = EXCLUDED.updated_at
-                """
-                
-                cursor.execute(insert_query, (
+                rows.append((
                     chunk['id'],
                     chunk['title'],
                     chunk['content'],
                     chunk['metadata'].get('content_type', 'general'),
-                    Json(chunk['metadata'].get('key_concepts', [])),
-                    Json(chunk['metadata']),
-                    datetime.now(),
-                    datetime.now()
+                    Jsonb(chunk['metadata'].get('key_concepts', [])),
+                    Jsonb(chunk['metadata']),
+                    now,
+                    now
                 ))
                 
             except Exception as e:
                 logger.warning(f"⚠️ Failed to store knowledge chunk {chunk['id']}: {e}")
                 continue
                 
+        await self._bulk_upsert(cursor, 'coach_knowledge_base', insert_query, rows, key_columns=[0])
+                
     async def _store_team_profiles(self, chunks: List[Dict[str, Any]], cursor):
         """Store team profiles in user_profiles_extended table."""
+        insert_query = """
+        INSERT INTO user_profiles_extended 
+        (id, user_id, strengths_profile, work_style_preferences, 
+         collaboration_patterns, values_alignment, team_context, 
+         created_at, updated_at)
+        VALUES %s
+        ON CONFLICT (user_id) DO UPDATE SET
+        strengths_profile = EXCLUDED.strengths_profile,
+        team_context = EXCLUDED.team_context,
+        updated_at = EXCLUDED.updated_at
+        """
+        
+        now = datetime.now()
+        rows = []
         for chunk in chunks:
             try:
                 # Create a profile entry for the team
                 profile_id = str(uuid.uuid4())
                 
-                insert_query = """
-                INSERT INTO user_profiles_extended 
-                (id, user_id, strengths_profile, work_style_preferences, 
-                 collaboration_patterns, values_alignment, team_context, 
-                 created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (user_id) DO UPDATE SET
-                strengths_profile = EXCLUDED.strengths_profile,
-                team_context = EXCLUDED.team_context,
-                updated_at = EXCLUDED.updated_at
-                """
-                
                 # Extract team data
                 metadata = chunk['metadata']
                 
@@ -673,121 +417,325 @@ class ASTKnowledgeProcessor:
                     'composition': metadata.get('team_composition', [])
                 }
                 
-                cursor.execute(insert_query, (
+                rows.append((
                     profile_id,
                     f"team_{chunk['id']}",  # Use team_ prefix for team profiles
-                    Json(strengths_profile),
-                    Json(work_style),
-                    Json(metadata.get('flow_synergies', [])),
-                    Json(metadata.get('key_insights', [])),
-                    Json(team_context),
-                    datetime.now(),
-                    datetime.now()
+                    Jsonb(strengths_profile),
+                    Jsonb(work_style),
+                    Jsonb(metadata.get('flow_synergies', [])),
+                    Jsonb(metadata.get('key_insights', [])),
+                    Jsonb(team_context),
+                    now,
+                    now
                 ))
                 
             except Exception as e:
                 logger.warning(f"⚠️ Failed to store team profile {chunk['id']}: {e}")
                 continue
                 
+        await self._bulk_upsert(cursor, 'user_profiles_extended', insert_query, rows, key_columns=[1])
+                
     async def _store_vector_metadata(self, chunks: List[Dict[str, Any]], cursor):
         """Store vector embedding metadata."""
+        insert_query = """
+        INSERT INTO vector_embeddings 
+        (id, content_id, content_type, collection_name, 
+         embedding_metadata, created_at)
+        VALUES %s
+        ON CONFLICT (content_id, content_type) DO UPDATE SET
+        embedding_metadata = EXCLUDED.embedding_metadata
+        """
+        
+        now = datetime.now()
+        rows = []
         for chunk in chunks:
             try:
-                insert_query = """
-                INSERT INTO vector_embeddings 
-                (id, content_id, content_type, collection_name, 
-                 embedding_metadata, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (content_id, content_type) DO UPDATE SET
-                embedding_metadata = EXCLUDED.embedding_metadata
-                """
-                
                 collection_name = "ast_methodology" if chunk['source'] == 'AST_Compendium' else "team_profiles"
                 
-                cursor.execute(insert_query, (
+                rows.append((
                     str(uuid.uuid4()),
                     chunk['id'],
                     chunk['type'],
                     collection_name,
-                    Json({
+                    Jsonb({
                         'source': chunk['source'],
                         'title': chunk['title'],
                         'metadata': chunk['metadata']
                     }),
-                    datetime.now()
+                    now
                 ))
                 
             except Exception as e:
                 logger.warning(f"⚠️ Failed to store vector metadata for {chunk['id']}: {e}")
                 continue
                 
-    async def process_all_data(self):
-        """Main processing pipeline for all AST data."""
+        await self._bulk_upsert(cursor, 'vector_embeddings', insert_query, rows, key_columns=[1, 2])
+                
+    def publish_search_indexes(self):
+        """Save the BM25 indexes, then bump collection versions so query-time caches reload both."""
+        for index in self.lexical_indexes.values():
+            index.save()
+        self.bump_collection_versions()
+        
+    def bump_collection_versions(self):
+        """Mark both collections as re-ingested so query-time result caches drop stale entries."""
+        for collection in (self.ast_collection, self.teams_collection):
+            try:
+                bump_collection_version(collection)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not bump version of {collection.name}: {e}")
+                
+    async def delete_chunks(self, removed: Dict[str, str]):
+        """Delete chunks (ID -> source) from ChromaDB and PostgreSQL."""
+        if not removed:
+            return
+            
+        ast_ids = [chunk_id for chunk_id, source in removed.items() if source == 'AST_Compendium']
+        team_ids = [chunk_id for chunk_id, source in removed.items() if source == 'team_profiles']
+        
+        logger.info(f"🧹 Deleting {len(removed)} stale chunks...")
+        
+        if ast_ids:
+            self.ast_collection.delete(ids=ast_ids)
+            self.lexical_indexes["ast_methodology"].remove(ast_ids)
+        if team_ids:
+            self.teams_collection.delete(ids=team_ids)
+            self.lexical_indexes["team_profiles"].remove(team_ids)
+            
+        try:
+            async with self.pg_pool.connection() as connection:
+                async with connection.cursor() as cursor:
+                    if ast_ids:
+                        await cursor.execute(
+                            "DELETE FROM coach_knowledge_base WHERE id = ANY(%s::uuid[])",
+                            (ast_ids,)
+                        )
+                    if team_ids:
+                        await cursor.execute(
+                            "DELETE FROM user_profiles_extended WHERE user_id = ANY(%s)",
+                            ([f"team_{chunk_id}" for chunk_id in team_ids],)
+                        )
+                    await cursor.execute(
+                        "DELETE FROM vector_embeddings WHERE content_id = ANY(%s)",
+                        (list(removed),)
+                    )
+                    
+        except Exception as e:
+            logger.error(f"❌ PostgreSQL delete failed: {e}")
+            raise
+            
+        logger.info(f"✅ Deleted {len(ast_ids)} methodology and {len(team_ids)} team chunks")
+        
+    async def stored_chunk_ids(self) -> Dict[str, str]:
+        """Every chunk ID (-> source) currently in ChromaDB or PostgreSQL's vector_embeddings."""
+        stored = {}
+        for collection, source in ((self.ast_collection, 'AST_Compendium'), (self.teams_collection, 'team_profiles')):
+            stored.update({chunk_id: source for chunk_id in collection.get(include=[])['ids']})
+            
+        async with self.pg_pool.connection() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute("SELECT content_id, collection_name FROM vector_embeddings")
+                for content_id, collection_name in await cursor.fetchall():
+                    stored.setdefault(content_id, 'AST_Compendium' if collection_name == 'ast_methodology'
+                                      else 'team_profiles')
+        return stored
+        
+    def _iter_incremental_changes(self, manifest: IngestionManifest, source_files: List[str],
+                                  changes: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield new or changed chunks from source files whose digest changed since the last run.
+        
+        Fills ``changes`` with stale chunk IDs (``removed``), the per-file manifest
+        records to commit once storage succeeds (``records``) and file counts (``stats``).
+        """
+        stats = changes['stats']
+        digests = {}
+        
+        for file_path in source_files:
+            digest = file_digest(file_path)
+            if manifest.is_unchanged(file_path, digest):
+                stats['files_unchanged'] += 1
+            else:
+                digests[file_path] = digest
+                
+        for file_path, chunks, error in self._parse_files(list(digests)):
+            if error:
+                # Keep the previous manifest entry so its chunks stay in place
+                logger.warning(f"⚠️ Failed to parse {file_path}: {error}")
+                stats['files_failed'] += 1
+                continue
+                
+            digest = digests[file_path]
+            file_changed, file_removed = manifest.diff_chunks(file_path, chunks)
+            changes['removed'].update(file_removed)
+            changes['records'].append((file_path, digest, chunk_entries(chunks)))
+            stats['files_changed'] += 1
+            
+            yield from file_changed
+            
+        for file_path, file_chunks in manifest.missing_files(source_files).items():
+            changes['removed'].update(file_chunks)
+            changes['records'].append((file_path, None, None))
+            stats['files_removed'] += 1
+            
+    async def process_incremental(self, manifest_path: str = MANIFEST_PATH):
+        """Incremental pipeline: embed and store only new or changed chunks, delete stale ones."""
+        manifest = IngestionManifest(manifest_path).load()
+        
+        source_files = sorted(glob.glob(TEAM_FILES_PATTERN))
+        if os.path.exists(COMPENDIUM_PATH):
+            source_files.insert(0, COMPENDIUM_PATH)
+        else:
+            logger.warning(f"⚠️ AST Compendium not found at {COMPENDIUM_PATH}")
+            
+        changes = {
+            'removed': {},
+            'records': [],
+            'stats': {'files_unchanged': 0, 'files_changed': 0, 'files_removed': 0, 'files_failed': 0}
+        }
+        stats = ProcessingStats()
+        router = self._build_router(incremental=True)
+        upserted = await stream_chunks(self._iter_incremental_changes(manifest, source_files, changes), router, stats)
+        self.sink_stats = router.stats()
+        
+        # A chunk that moved between files is still live
+        live_ids = set()
+        for _, digest, entries in changes['records']:
+            if digest is not None:
+                live_ids.update(entries)
+        removed = {chunk_id: source for chunk_id, source in changes['removed'].items() if chunk_id not in live_ids}
+        await self.delete_chunks(removed)
+        if upserted or removed:
+            self.publish_search_indexes()
+        
+        file_stats = changes['stats']
+        logger.info(f"🔁 Incremental refresh: {file_stats['files_changed']} changed, "
+                    f"{file_stats['files_unchanged']} unchanged, {file_stats['files_removed']} removed files")
+        
+        # Only commit digests once both stores reflect them
+        for file_path, digest, entries in changes['records']:
+            if digest is None:
+                manifest.forget_file(file_path)
+            else:
+                manifest.record_file(file_path, digest, entries)
+        manifest.save()
+        
+        incremental_stats = {**file_stats, 'chunks_upserted': upserted, 'chunks_deleted': len(removed)}
+        self._generate_processing_report(stats, incremental_stats=incremental_stats)
+        
+    async def _commit_full_run(self, records: List[Tuple[str, str, Dict[str, Dict[str, str]]]], manifest_path: str):
+        """
+        After a full run, delete stored chunks it did not produce (older content
+        or pre-content-hash IDs), publish the search indexes and record every
+        parsed file in the manifest so the next incremental run starts from it.
+        """
+        manifest = IngestionManifest(manifest_path).load()
+        source_files = [file_path for file_path, _, _ in records]
+        
+        # A file that failed to parse keeps its previous entry and chunks
+        live_ids = set()
+        for file_path, entry in manifest.files.items():
+            if file_path not in source_files and os.path.exists(file_path):
+                live_ids.update(entry.get('chunks', {}))
+        for _, _, entries in records:
+            live_ids.update(entries)
+            
+        stored = await self.stored_chunk_ids()
+        await self.delete_chunks({chunk_id: source for chunk_id, source in stored.items() if chunk_id not in live_ids})
+        self.publish_search_indexes()
+        
+        for file_path in manifest.missing_files(source_files):
+            if not os.path.exists(file_path):
+                manifest.forget_file(file_path)
+        for file_path, digest, entries in records:
+            manifest.record_file(file_path, digest, entries)
+        manifest.save()
+        
+    async def process_all_data(self, incremental: bool = False, manifest_path: str = MANIFEST_PATH,
+                               resume: bool = False):
+        """
+        Main processing pipeline for all AST data. With ``resume``, batches the
+        last unfinished run already wrote (per the ingestion journal) are skipped.
+        """
         logger.info("🚀 Starting AST knowledge processing pipeline...")
         
         try:
             # Initialize connections
             await self.initialize()
+            self._start_journal('incremental' if incremental else 'full', resume)
             
-            # Process AST Compendium
-            compendium_path = "coaching-data/source-files/AST_Compendium.md"
-            if os.path.exists(compendium_path):
-                ast_chunks = self.parse_ast_compendium(compendium_path)
-            else:
-                logger.warning(f"⚠️ AST Compendium not found at {compendium_path}")
-                ast_chunks = []
+            if incremental:
+                await self.process_incremental(manifest_path)
+                self._finish_journal()
+                logger.info("🎉 AST knowledge processing completed successfully!")
+                return
                 
-            # Process team profiles
-            team_pattern = "coaching-data/source-files/*team*.md"
-            team_chunks = self.parse_team_profiles(team_pattern)
+            # Stream parsed chunks straight into batched ChromaDB and PostgreSQL writes
+            stats = ProcessingStats()
+            router = self._build_router()
+            records = []
+            routed = await stream_chunks(self.iter_source_chunks(records), router, stats)
+            self.sink_stats = router.stats()
             
-            # Combine all chunks
-            all_chunks = ast_chunks + team_chunks
-            
-            if not all_chunks:
+            if not routed:
                 logger.error("❌ No content processed - check file paths")
+                # Nothing was written, so there is nothing for --resume to pick up
+                self._finish_journal()
                 return
                 
-            # Store in databases
-            await self.store_in_chromadb(all_chunks)
-            await self.store_in_postgresql(all_chunks)
+            await self._commit_full_run(records, manifest_path)
+            self._finish_journal()
             
             # Generate summary report
-            self._generate_processing_report(ast_chunks, team_chunks)
+            self._generate_processing_report(stats)
             
             logger.info("🎉 AST knowledge processing completed successfully!")
             
         except Exception as e:
             logger.error(f"❌ Processing pipeline failed: {e}")
+            if self.journal:
+                logger.info("⏯️ Completed batches are checkpointed - rerun with --resume to continue")
             raise
         finally:
-            if self.pg_connection:
-                self.pg_connection.close()
+            if self.pg_pool:
+                await self.pg_pool.close()
+            if self.journal:
+                self.journal.close()
                 
-    def _generate_processing_report(self, ast_chunks: List[Dict], team_chunks: List[Dict]):
+    def _generate_processing_report(self, stats: ProcessingStats,
+                                    incremental_stats: Optional[Dict[str, int]] = None):
         """Generate a summary report of the processing."""
         report = {
             "timestamp": datetime.now().isoformat(),
             "summary": {
-                "total_chunks": len(ast_chunks) + len(team_chunks),
-                "ast_methodology_chunks": len(ast_chunks),
-                "team_profile_chunks": len(team_chunks)
+                "total_chunks": stats.ast_chunks + stats.team_chunks,
+                "ast_methodology_chunks": stats.ast_chunks,
+                "team_profile_chunks": stats.team_chunks
             },
-            "ast_content_types": {},
-            "team_departments": {},
-            "total_word_count": 0
+            "ast_content_types": stats.ast_content_types,
+            "team_departments": stats.team_departments,
+            "total_word_count": stats.total_word_count,
+            "ast_chunk_tokens": stats.token_summary()
         }
         
-        # Analyze AST content types
-        for chunk in ast_chunks:
-            content_type = chunk['metadata'].get('content_type', 'unknown')
-            report["ast_content_types"][content_type] = report["ast_content_types"].get(content_type, 0) + 1
-            report["total_word_count"] += chunk.get('word_count', 0)
+        if incremental_stats is not None:
+            report["incremental"] = incremental_stats
+            
+        if self.sink_stats:
+            report["sinks"] = self.sink_stats
             
-        # Analyze team departments
-        for chunk in team_chunks:
-            dept = chunk['metadata'].get('department', 'unknown')
-            report["team_departments"][dept] = report["team_departments"].get(dept, 0) + 1
+        if self.pg_write_stats:
+            report["postgres_writes"] = self.pg_write_stats
+            
+        if self.pg_pool:
+            report["postgres_pool"] = self.pg_pool.stats()
+            
+        if self.journal:
+            report["journal"] = self.journal.stats()
+            
+        chroma_writes = self.chroma_writer.report()
+        if chroma_writes:
+            report["chroma_writes"] = chroma_writes
             
         # Save report
         with open('coaching-data/processing_report.json', 'w') as f:
@@ -798,11 +746,40 @@ class ASTKnowledgeProcessor:
         logger.info(f"   • AST methodology: {report['summary']['ast_methodology_chunks']}")
         logger.info(f"   • Team profiles: {report['summary']['team_profile_chunks']}")
         logger.info(f"   • Total words: {report['total_word_count']:,}")
+        logger.info(f"   • AST chunk tokens: {report['ast_chunk_tokens']['histogram']}")
+        if incremental_stats is not None:
+            logger.info(f"   • Upserted: {incremental_stats['chunks_upserted']}, deleted: {incremental_stats['chunks_deleted']}")
 
 async def main():
     """Main execution function."""
-    processor = ASTKnowledgeProcessor()
-    await processor.process_all_data()
+    parser = argparse.ArgumentParser(description="Process AST knowledge into ChromaDB and PostgreSQL")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only embed and store chunks whose source changed since the last run")
+    parser.add_argument('--manifest', default=MANIFEST_PATH,
+                        help="Path of the ingestion manifest used by --incremental")
+    parser.add_argument('--pg-batch-size', type=int, default=None,
+                        help="Rows per batched PostgreSQL INSERT (default: PG_BATCH_SIZE or 500)")
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help="Chunks per sink flush while streaming (default: INGEST_BATCH_SIZE or 100)")
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help="Worker processes for parsing source files (default: PARSE_WORKERS or 1)")
+    parser.add_argument('--chunk-tokens', type=int, default=None,
+                        help="Maximum tokens per AST Compendium chunk (default: CHUNK_MAX_TOKENS or 400)")
+    parser.add_argument('--chunk-overlap', type=int, default=None,
+                        help="Tokens repeated between consecutive chunks of a section (default: CHUNK_OVERLAP_TOKENS or 50)")
+    parser.add_argument('--vector-store', choices=VECTOR_STORE_BACKENDS, default=None,
+                        help="Vector store backend (default: VECTOR_STORE_BACKEND or http)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue the last unfinished run, skipping batches it already stored")
+    args = parser.parse_args()
+    
+    processor = ASTKnowledgeProcessor(pg_batch_size=args.pg_batch_size, parse_workers=args.parse_workers,
+                                      chunk_max_tokens=args.chunk_tokens, chunk_overlap_tokens=args.chunk_overlap,
+                                      vector_store=args.vector_store)
+    if args.batch_size:
+        processor.ingest_batch_size = args.batch_size
+    await processor.process_all_data(incremental=args.incremental, manifest_path=args.manifest,
+                                     resume=args.resume)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Retrieval Result Cache
+======================
+
+In-memory cache for ChromaDB query results, keyed by collection, collection
+version, ``n_results``, the normalized query text and any metadata filters.
+Entries expire after a TTL and the cache is bounded with least-recently-used
+eviction.
+
+Ingestion bumps an ``ingest_version`` counter in each collection's metadata
+after it writes (``bump_collection_version``); a search that sees a new
+version drops the collection's cached results, so repeated queries never serve
+results from before a re-ingest.
+"""
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+from embedding_cache import normalize_text
+
+VERSION_KEY = 'ingest_version'
+
+CacheKey = Tuple[str, int, int, str, str]
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so casing and whitespace differences share a cache entry."""
+    return normalize_text(query).casefold()
+
+
+def collection_version(collection) -> int:
+    """Ingestion version recorded in a collection's metadata (0 if never bumped)."""
+    return int((collection.metadata or {}).get(VERSION_KEY, 0))
+
+
+def bump_collection_version(collection) -> int:
+    """Increment a collection's ingestion version, keeping the rest of its metadata."""
+    metadata = {
+        key: value for key, value in (collection.metadata or {}).items()
+        if not key.startswith('hnsw:')  # index settings cannot be modified
+    }
+    metadata[VERSION_KEY] = collection_version(collection) + 1
+    collection.modify(metadata=metadata)
+    return metadata[VERSION_KEY]
+
+
+class RetrievalCache:
+    """LRU + TTL cache of query results with per-collection version invalidation."""
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries or int(os.getenv('RETRIEVAL_CACHE_SIZE', '1024'))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv('RETRIEVAL_CACHE_TTL', '300'))
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: 'OrderedDict[CacheKey, Tuple[float, List[Dict[str, Any]]]]' = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def key(self, collection_name: str, version: int, n_results: int, query: str,
+            where: Optional[Dict[str, Any]] = None) -> CacheKey:
+        filters = json.dumps(where, sort_keys=True) if where else ''
+        return (collection_name, version, n_results, normalize_query(query), filters)
+
+    def observe_version(self, collection_name: str, version: int) -> bool:
+        """
+        Record a collection's current version, dropping its entries if the
+        version changed. Returns whether it changed.
+        """
+        with self._lock:
+            previous = self._versions.get(collection_name)
+            self._versions[collection_name] = version
+            if previous is None or previous == version:
+                return False
+            stale = [key for key in self._entries if key[0] == collection_name]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return True
+
+    def get(self, key: CacheKey) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, matches = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return matches
+
+    def put(self, key: CacheKey, matches: List[Dict[str, Any]]):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, matches)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'expirations': self.expirations,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
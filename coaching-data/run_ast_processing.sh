@@ -25,7 +25,7 @@ echo ""
 # Check if Python dependencies are installed
 echo ""
 echo "3. 📦 Installing Python Dependencies..."
-pip install -q psycopg2-binary boto3 chromadb numpy aiohttp
+pip install -q "psycopg[binary]" psycopg-pool boto3 chromadb numpy aiohttp
 
 echo ""
 echo "4. 🔍 Checking Source Files..."
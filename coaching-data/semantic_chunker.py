@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Semantic Chunker
+================
+
+Splits a document along its heading hierarchy, then paragraphs, lines and
+sentences, and packs the pieces into chunks of at most ``max_tokens``. Long
+sections are split with ``overlap_tokens`` of trailing sentences repeated at
+the start of the next chunk; sections smaller than ``min_tokens`` are merged
+with the section that follows. Every chunk records the heading path it starts
+under.
+
+Token counts use a dependency-free estimate (words plus punctuation marks),
+which tracks subword tokenizers closely enough for sizing chunks.
+"""
+
+import re
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Callable
+
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+(?=["“(\[]?[A-Z0-9])')
+PARAGRAPH_SPLIT_RE = re.compile(r'\n\s*\n')
+
+# (pattern, level) pairs tried in order; the last group of each pattern is the heading title
+DEFAULT_HEADING_RULES: List[Tuple[str, int]] = [
+    (r'(#{1,6})\s+(.+?)\s*#*', 0),  # markdown, level from the number of #'s
+    (r'(Executive Summary|Table of Contents|Introduction|Conclusion|Keywords|Index)', 1),
+    (r'(Part [IVXLC]+:\s+.+)', 1),
+    (r'(\d{1,2}\.\s+[^\n]{3,80}[^.:;,\s])', 2),
+    (r'(Module \d+:\s+[^\n]{3,80})', 3),
+]
+
+HISTOGRAM_EDGES = [64, 128, 256, 512, 1024, 2048]
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count: words and punctuation marks."""
+    return len(TOKEN_RE.findall(text))
+
+
+def token_bucket(tokens: int, edges: List[int] = HISTOGRAM_EDGES) -> str:
+    """Histogram bucket label (e.g. ``'128-255'``) for a token count."""
+    lower = 0
+    for edge in edges:
+        if tokens < edge:
+            return f"{lower}-{edge - 1}"
+        lower = edge
+    return f"{lower}+"
+
+
+class SemanticChunker:
+    """Heading-aware, token-bounded document chunker."""
+
+    def __init__(self, max_tokens: int = 400, overlap_tokens: int = 50, min_tokens: Optional[int] = None,
+                 heading_rules: Optional[List[Tuple[str, int]]] = None,
+                 count_tokens: Callable[[str], int] = estimate_tokens):
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.min_tokens = max_tokens // 4 if min_tokens is None else min_tokens
+        self.count_tokens = count_tokens
+        self.heading_rules = [
+            (re.compile(pattern), level)
+            for pattern, level in (heading_rules or DEFAULT_HEADING_RULES)
+        ]
+
+    def _heading(self, line: str) -> Optional[Tuple[int, str]]:
+        for pattern, level in self.heading_rules:
+            match = pattern.fullmatch(line)
+            if match:
+                return (level or len(match.group(1))), match.group(match.lastindex).strip()
+        return None
+
+    def sections(self, text: str) -> List[Tuple[List[str], str, str]]:
+        """Split text into ``(heading_path, heading_line, body)`` triples in document order."""
+        sections = []
+        path: List[Tuple[int, str]] = []
+        heading_line = ''
+        body: List[str] = []
+
+        for line in text.split('\n'):
+            heading = self._heading(line.strip())
+            if heading is None:
+                body.append(line)
+                continue
+
+            sections.append(([title for _, title in path], heading_line, '\n'.join(body).strip()))
+            level, title = heading
+            while path and path[-1][0] >= level:
+                path.pop()
+            path.append((level, title))
+            heading_line = line.strip()
+            body = []
+
+        sections.append(([title for _, title in path], heading_line, '\n'.join(body).strip()))
+        return [section for section in sections if section[1] or section[2]]
+
+    def _units(self, body: str) -> List[Tuple[str, str]]:
+        """Pieces of a section body no larger than max_tokens, each with the separator that precedes it."""
+        units = []
+        for paragraph in PARAGRAPH_SPLIT_RE.split(body):
+            paragraph = paragraph.strip()
+            if paragraph:
+                units.extend(self._split(paragraph, '\n\n', level=0))
+        return units
+
+    def _split(self, text: str, separator: str, level: int) -> List[Tuple[str, str]]:
+        if self.count_tokens(text) <= self.max_tokens:
+            return [(text, separator)]
+
+        if level == 0:
+            parts, joiner = [line.strip() for line in text.split('\n') if line.strip()], '\n'
+        elif level == 1:
+            parts, joiner = SENTENCE_SPLIT_RE.split(text), ' '
+        else:
+            return self._split_words(text, separator)
+
+        if len(parts) == 1:
+            return self._split(text, separator, level + 1)
+
+        units = []
+        for i, part in enumerate(parts):
+            units.extend(self._split(part, separator if i == 0 else joiner, level + 1))
+        return units
+
+    def _split_words(self, text: str, separator: str) -> List[Tuple[str, str]]:
+        """Last resort for a single over-long sentence: fixed windows of whitespace-separated words."""
+        units, window = [], []
+        for word in text.split():
+            if window and self.count_tokens(' '.join(window + [word])) > self.max_tokens:
+                units.append((' '.join(window), separator if not units else ' '))
+                window = []
+            window.append(word)
+        if window:
+            units.append((' '.join(window), separator if not units else ' '))
+        return units
+
+    def _overlap(self, units: List[Tuple[str, str, int]]) -> List[Tuple[str, str, int]]:
+        """Trailing sentences of the emitted chunk, up to overlap_tokens."""
+        tail: List[Tuple[str, str, int]] = []
+        budget = self.overlap_tokens
+        for text, _, _ in reversed(units):
+            for sentence in reversed(SENTENCE_SPLIT_RE.split(text)):
+                tokens = self.count_tokens(sentence)
+                if tokens > budget:
+                    return tail
+                tail.insert(0, (sentence, ' ', tokens))
+                budget -= tokens
+        return tail
+
+    def chunk(self, text: str) -> Iterator[Dict[str, Any]]:
+        """
+        Yield chunks as dicts with ``heading_path`` (the headings the chunk starts
+        under, outermost first), ``content`` and ``token_count``.
+        """
+        buffer: List[Tuple[str, str, int]] = []
+        buffer_path: List[str] = []
+        fresh = False
+
+        def emit() -> Dict[str, Any]:
+            content = buffer[0][0] + ''.join(separator + text for text, separator, _ in buffer[1:])
+            return {
+                'heading_path': buffer_path,
+                'content': content,
+                'token_count': sum(tokens for _, _, tokens in buffer)
+            }
+
+        for path, heading_line, body in self.sections(text):
+            units = ([(heading_line, '\n\n')] if heading_line else []) + self._units(body)
+            units = [(unit, separator, self.count_tokens(unit)) for unit, separator in units]
+
+            if fresh and sum(tokens for _, _, tokens in buffer) >= self.min_tokens:
+                yield emit()
+                buffer, fresh = [], False
+            if not buffer or path[:len(buffer_path)] == buffer_path:
+                buffer_path = path
+
+            for unit in units:
+                buffer_tokens = sum(tokens for _, _, tokens in buffer)
+                if buffer and buffer_tokens + unit[2] > self.max_tokens:
+                    if fresh:
+                        yield emit()
+                    buffer = self._overlap(buffer)
+                    if sum(tokens for _, _, tokens in buffer) + unit[2] > self.max_tokens:
+                        buffer = []
+                    buffer_path = path
+                    fresh = False
+                buffer.append(unit)
+                fresh = True
+
+        if fresh:
+            yield emit()
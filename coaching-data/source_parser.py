@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+AST Source Parser
+=================
+
+Turns the AST Compendium and team profile files into chunks: heading-aware,
+token-bounded compendium chunks and one chunk per team section, each with a
+content-hash ID and classified metadata.
+
+``ASTKnowledgeProcessor`` builds on ``SourceParser``. Process-pool parse
+workers hold only a ``SourceParser`` (its classifier and chunker), not a
+processor with vector store, PostgreSQL and batch writer state.
+"""
+
+import os
+import re
+import logging
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+from ingestion_manifest import content_chunk_id
+from team_section_extractor import TeamSectionExtractor
+from keyword_classifier import KeywordClassifier, VOCABULARY_PATH
+from semantic_chunker import SemanticChunker
+
+logger = logging.getLogger(__name__)
+
+COMPENDIUM_PATH = "coaching-data/source-files/AST_Compendium.md"
+TEAM_FILES_PATTERN = "coaching-data/source-files/*team*.md"
+
+
+class SourceParser:
+    """Chunking and classification of the AST Compendium and team profile files."""
+    
+    def __init__(self, vocabulary_path: Optional[str] = None, chunk_max_tokens: Optional[int] = None,
+                 chunk_overlap_tokens: Optional[int] = None):
+        self.vocabulary_path = vocabulary_path or os.getenv('CLASSIFICATION_VOCABULARY', VOCABULARY_PATH)
+        self.classifier = KeywordClassifier.from_file(self.vocabulary_path)
+        self.chunker = SemanticChunker(
+            max_tokens=chunk_max_tokens or int(os.getenv('CHUNK_MAX_TOKENS', '400')),
+            overlap_tokens=chunk_overlap_tokens if chunk_overlap_tokens is not None
+            else int(os.getenv('CHUNK_OVERLAP_TOKENS', '50'))
+        )
+        
+    def parse_ast_compendium(self, file_path: str) -> List[Dict[str, Any]]:
+        """Parse AST Compendium into semantic chunks."""
+        chunks = list(self.iter_ast_compendium(file_path))
+        logger.info(f"📊 Extracted {len(chunks)} chunks from AST Compendium")
+        return chunks
+        
+    def iter_ast_compendium(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """Yield AST Compendium chunks one at a time."""
+        logger.info("📚 Processing AST Compendium...")
+        
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+            
+        source_file = os.path.basename(file_path)
+        document_title = content.strip().split('\n', 1)[0].replace('#', '').strip()
+        
+        # Heading-aware, token-bounded chunks (see semantic_chunker.py)
+        for i, piece in enumerate(self.chunker.chunk(content)):
+            heading_path = piece['heading_path']
+            title = heading_path[-1] if heading_path else document_title
+            chunk_content = piece['content']
+            
+            chunk_id = content_chunk_id(source_file, 'chunk', ' > '.join(heading_path), chunk_content)
+            
+            chunk = {
+                'id': chunk_id,
+                'title': title,
+                'content': chunk_content,
+                'source': 'AST_Compendium',
+                'type': 'methodology',
+                'section_number': i,
+                'word_count': len(chunk_content.split()),
+                'token_count': piece['token_count'],
+                'metadata': {
+                    'source_file': 'AST_Compendium.md',
+                    'section_title': title,
+                    'heading_path': heading_path,
+                    'token_count': piece['token_count'],
+                    'content_type': self._classify_content_type(title, chunk_content),
+                    'key_concepts': self._extract_key_concepts(chunk_content),
+                    'practical_applications': self._extract_applications(chunk_content)
+                }
+            }
+            
+            yield chunk
+        
+    def _classify_content_type(self, title: str, content: str) -> str:
+        """Classify the type of content for better retrieval (by title keywords)."""
+        return self.classifier.classify('content_types', self.classifier.find(title))
+        
+    def _extract_key_concepts(self, content: str) -> List[str]:
+        """Extract key concepts (see classification_vocabulary.json) from content."""
+        return self.classifier.concepts(self.classifier.find(content))
+        
+    def _extract_applications(self, content: str) -> List[str]:
+        """Extract practical applications mentioned in content."""
+        applications = []
+        
+        # Look for application indicators
+        app_patterns = [
+            r'application[s]?\s*include[s]?:\s*([^.]+)',
+            r'use[d]?\s+for:\s*([^.]+)',
+            r'helps?\s+teams?\s+([^.]+)',
+            r'enables?\s+([^.]+)',
+            r'specific applications[^:]*:\s*([^.]+)'
+        ]
+        
+        for pattern in app_patterns:
+            matches = re.finditer(pattern, content, re.IGNORECASE)
+            for match in matches:
+                applications.append(match.group(1).strip())
+                
+        return applications[:5]  # Limit to top 5
+        
+    def _parser_options(self) -> Dict[str, Any]:
+        """Constructor arguments that reproduce this parser's behaviour in a pool worker."""
+        return {
+            'vocabulary_path': self.vocabulary_path,
+            'chunk_max_tokens': self.chunker.max_tokens,
+            'chunk_overlap_tokens': self.chunker.overlap_tokens
+        }
+        
+    def _parse_file_safely(self, file_path: str) -> Tuple[str, List[Dict[str, Any]], Optional[str]]:
+        """Parse one source file, capturing a failure instead of raising it."""
+        try:
+            return file_path, self._parse_source_file(file_path), None
+        except Exception as e:
+            return file_path, [], str(e)
+        
+    def _parse_single_team_file(self, file_path: str) -> List[Dict[str, Any]]:
+        """Parse a single team profile file."""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+            
+        teams = []
+        
+        # Extract team name from filename or content
+        filename = os.path.basename(file_path)
+        team_name = self._extract_team_name(filename, content)
+        
+        # Split by team sections if multiple teams in one file
+        team_sections = self._split_team_sections(content)
+        
+        for i, section in enumerate(team_sections):
+            team_data = self._parse_team_section(section, team_name, i)
+            if team_data:
+                teams.append(team_data)
+                
+        return teams
+        
+    def _extract_team_name(self, filename: str, content: str) -> str:
+        """Extract team name from filename or content."""
+        # Try to get from filename
+        name_match = re.search(r'(\d+_)?(.+?)\.md$', filename)
+        if name_match:
+            name = name_match.group(2).replace('-', ' ').replace('_', ' ')
+            return name.title()
+            
+        # Try to get from content header
+        header_match = re.search(r'^#\s+(.+)', content, re.MULTILINE)
+        if header_match:
+            return header_match.group(1).strip()
+            
+        return "Unknown Team"
+        
+    def _split_team_sections(self, content: str) -> List[str]:
+        """Split content into individual team sections."""
+        # Look for team headers
+        team_headers = re.finditer(r'\n##\s+([^#\n]+)', content)
+        sections = []
+        
+        headers = list(team_headers)
+        for i, header in enumerate(headers):
+            start = header.start()
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(content)
+            section = content[start:end].strip()
+            sections.append(section)
+            
+        if not sections:
+            # No team headers found, treat entire content as one team
+            sections = [content]
+            
+        return sections
+        
+    def _parse_team_section(self, section: str, base_name: str, index: int) -> Optional[Dict[str, Any]]:
+        """Parse individual team section into structured data."""
+        try:
+            # Tokenize the section once; every extractor reads from the same tree
+            extractor = TeamSectionExtractor(section)
+            
+            team_name = extractor.team_name() or f"{base_name} {index + 1}"
+            team_id = content_chunk_id(base_name, 'team', team_name, section)
+            
+            composition = extractor.team_composition()
+            strengths_dist = extractor.strengths_distribution()
+            flow_synergies = extractor.flow_synergies()
+            insights = extractor.team_insights()
+            individual_profiles = extractor.individual_profiles()
+            
+            team_data = {
+                'id': team_id,
+                'name': team_name,
+                'title': team_name,
+                'content': section,
+                'source': 'team_profiles',
+                'type': 'team_profile',
+                'metadata': {
+                    'team_composition': composition,
+                    'strengths_distribution': strengths_dist,
+                    'flow_synergies': flow_synergies,
+                    'key_insights': insights,
+                    'individual_profiles': individual_profiles,
+                    'team_size': len(composition) if composition else 0,
+                    'department': self._classify_department(team_name, section)
+                }
+            }
+            
+            return team_data
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to parse team section: {e}")
+            return None
+        
+    def _classify_department(self, team_name: str, content: str) -> str:
+        """Classify team department based on name and content."""
+        return self.classifier.classify('departments', self.classifier.find(team_name, content))
+        
+    def _parse_source_file(self, file_path: str) -> List[Dict[str, Any]]:
+        """Parse one source file with the parser that matches its role."""
+        if file_path == COMPENDIUM_PATH:
+            return self.parse_ast_compendium(file_path)
+        return self._parse_single_team_file(file_path)
+
+
+# Parser owned by each process-pool worker (see ASTKnowledgeProcessor._parse_files)
+_worker_parser = None
+
+def init_parse_worker(parser_options: Dict[str, Any]):
+    """Build the parser a pool worker reuses for every file."""
+    global _worker_parser
+    _worker_parser = SourceParser(**parser_options)
+
+def parse_file_in_worker(file_path: str) -> Tuple[str, List[Dict[str, Any]], Optional[str]]:
+    return _worker_parser._parse_file_safely(file_path)
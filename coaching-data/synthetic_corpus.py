@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Synthetic AST Corpus Generator
+==============================
+
+Writes a deterministic compendium and set of team profile files in the formats
+the parsers expect (plain-text Part / numbered / Module headings for the
+compendium; ``## `` team sections with ``### NAME (Role)`` profiles, strengths
+profiles, flow indicators, member bullets, ``Dominant`` lines, Flow Synergies
+and Key Insights for teams). Sizes are multiples of the real ``source-files``
+corpus, so benchmarks at 1x/10x/100x are comparable.
+
+    python3 coaching-data/synthetic_corpus.py --scale 10 --out /tmp/ast-corpus-10x
+"""
+
+import os
+import glob
+import random
+import argparse
+from typing import List, Dict, Any
+
+from process_ast_knowledge import COMPENDIUM_PATH, TEAM_FILES_PATTERN
+
+# Used when source-files is not available (sizes of the corpus in this repository)
+DEFAULT_BASELINE = {'compendium_bytes': 37514, 'team_files': 23, 'team_bytes': 161106}
+
+STRENGTHS = ['Thinking', 'Planning', 'Acting', 'Feeling', 'Imagination']
+FIRST_NAMES = ['ELENA', 'MARCUS', 'SARAH', 'DAVID', 'PRIYA', 'JAMES', 'LISA', 'KEVIN', 'MARIA', 'ALEX', 'RACHEL', 'OMAR']
+LAST_NAMES = ['PATEL', 'CHEN', 'KIM', 'RIVERA', 'WONG', 'GARCIA', 'WILSON', 'SHARMA', 'NGUYEN', 'OKAFOR']
+ROLES = ['Team Lead', 'Senior Engineer', 'Product Manager', 'Data Analyst', 'Designer', 'Operations Manager',
+         'Sales Director', 'HR Partner', 'Finance Lead', 'Marketing Strategist']
+DEPARTMENTS = ['engineering', 'sales', 'marketing', 'human resources', 'product', 'operations', 'finance',
+               'executive leadership', 'customer success', 'research']
+INDICATORS = ['Empathic', 'Strategic', 'Collaborative', 'Insightful', 'Dynamic', 'Methodical', 'Creative',
+              'Reliable', 'Persuasive', 'Supportive', 'Focused', 'Curious']
+CONCEPTS = ['imagination', 'flow state', 'heliotropic effect', 'strengths profusion', 'future self-continuity',
+            'self-awareness', 'telos', 'eudaimonia', 'phronesis', 'visual thinking', 'star card',
+            'constellation mapping', 'appreciative inquiry', 'positive psychology']
+PART_TOPICS = ['Foundations', 'The AST Methodology Explained', 'Application in Contemporary Contexts',
+               'Enhancing Traditional Assessments', 'Team Dynamics and Collaboration', 'Flow and Engagement']
+WORDS = ('team members discover practice reflect strengths patterns energy growth purpose trust '
+         'workshop facilitators hybrid collaboration insight development potential organizations '
+         'visual mapping dialogue resilience identity culture alignment learning momentum').split()
+ROMAN = ['I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X', 'XI', 'XII']
+
+
+def corpus_baseline() -> Dict[str, int]:
+    """Byte and file counts of the real source-files corpus (1x)."""
+    team_files = glob.glob(TEAM_FILES_PATTERN)
+    if not os.path.exists(COMPENDIUM_PATH) or not team_files:
+        return dict(DEFAULT_BASELINE)
+    return {
+        'compendium_bytes': os.path.getsize(COMPENDIUM_PATH),
+        'team_files': len(team_files),
+        'team_bytes': sum(os.path.getsize(path) for path in team_files)
+    }
+
+
+class SyntheticCorpusGenerator:
+    """Deterministic compendium and team-profile markdown at a multiple of the real corpus size."""
+
+    def __init__(self, seed: int = 7):
+        self.random = random.Random(seed)
+
+    def _sentence(self) -> str:
+        words = self.random.choices(WORDS, k=self.random.randint(10, 22))
+        if self.random.random() < 0.4:
+            words.insert(self.random.randrange(len(words)), self.random.choice(CONCEPTS))
+        return ' '.join(words).capitalize() + '.'
+
+    def _paragraph(self, sentences: int) -> str:
+        return ' '.join(self._sentence() for _ in range(sentences))
+
+    def _person(self) -> str:
+        return f"{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}"
+
+    def compendium(self, target_bytes: int) -> str:
+        lines = ['AllStarTeams Workshop Compendium (Synthetic)', 'Executive Summary', self._paragraph(6), '',
+                 'Introduction', self._paragraph(5), self._paragraph(4), '']
+        size = sum(len(line) + 1 for line in lines)
+        part = 0
+
+        while size < target_bytes:
+            part_lines = [f"Part {ROMAN[part % len(ROMAN)]}: {PART_TOPICS[part % len(PART_TOPICS)]}"]
+            for number in range(1, self.random.randint(4, 7)):
+                part_lines.append(f"{number}. {self._sentence()[:-1][:60].strip().title()}")
+                part_lines.append(self._paragraph(self.random.randint(3, 6)))
+                if number == 2:
+                    for module in range(1, 5):
+                        part_lines.append(f"Module {module}: {self._sentence()[:-1][:40].strip().title()}")
+                        part_lines.append(self._paragraph(self.random.randint(2, 5)))
+                        part_lines.append('Specific applications in this module include:')
+                        part_lines.append(self._paragraph(2))
+                part_lines.append('')
+            lines.extend(part_lines)
+            size += sum(len(line) + 1 for line in part_lines)
+            part += 1
+
+        lines.extend(['Conclusion', self._paragraph(5)])
+        return '\n'.join(lines) + '\n'
+
+    def _profile(self) -> List[str]:
+        strengths = self.random.sample(STRENGTHS, 4)
+        shares = sorted((self.random.uniform(5, 45) for _ in strengths), reverse=True)
+        total = sum(shares)
+        lines = [
+            f"### {self._person()} ({self.random.choice(ROLES)})",
+            f"Location: Austin, TX",
+            f"Background: {self._sentence()}",
+            '',
+            '**Strengths Profile:**'
+        ]
+        for rank, (strength, share) in enumerate(zip(strengths, shares), start=1):
+            lines.append(f"{rank}. {strength} ({share / total * 100:.1f}%) - {' '.join(self.random.choices(WORDS, k=5))}")
+        lines.extend(['', '**Flow State Indicators:**'])
+        lines.extend(f"- {indicator}" for indicator in self.random.sample(INDICATORS, 4))
+        lines.extend(['', '**Personal Flow Reflection:**', f'"{self._paragraph(3)}"', ''])
+        return lines
+
+    def team_file(self, index: int, target_bytes: int) -> str:
+        department = DEPARTMENTS[index % len(DEPARTMENTS)]
+        members = [self._person() for _ in range(self.random.randint(3, 5))]
+
+        lines = [f"# {department.upper()} TEAM {index} - COMPREHENSIVE TEAM ANALYSIS", '',
+                 f"**Team Purpose:** {self._paragraph(2)}", '', '## TEAM STRENGTHS & FLOW STATES', '']
+        for _ in members:
+            lines.extend(self._profile())
+
+        lines.extend(['## TEAM DYNAMICS & COMPLEMENTARY STRENGTHS', ''])
+        lines.extend(
+            f"- **{member.title()}** ({self.random.choice(ROLES)}) – {self._sentence()}" for member in members
+        )
+        lines.append('')
+        for strength in self.random.sample(STRENGTHS, 3):
+            names = ', '.join(member.split()[0].title() for member in self.random.sample(members, 2))
+            lines.append(f"**{strength} Dominant**: {names}")
+        lines.extend(['', '### Flow Synergies'])
+        lines.extend(f"- **{a.title()} & {b.title()}**: {self._sentence()}" for a, b in zip(members, members[1:]))
+        lines.extend(['', '### Key Insights', self._paragraph(4), ''])
+
+        # Shorter development sections pad the file out to its target size
+        size = sum(len(line) + 1 for line in lines)
+        section = 0
+        while size < target_bytes:
+            section_lines = [f"## TEAM DEVELOPMENT AREA {section + 1}", '', f"### {self._sentence()[:-1][:40].strip().title()}"]
+            section_lines.extend(f"- {self._sentence()}" for _ in range(self.random.randint(3, 6)))
+            section_lines.append('')
+            lines.extend(section_lines)
+            size += sum(len(line) + 1 for line in section_lines)
+            section += 1
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self, out_dir: str, scale: float, baseline: Dict[str, int]) -> Dict[str, Any]:
+        """Write ``AST_Compendium.md`` and team files to out_dir; returns their paths and sizes."""
+        os.makedirs(out_dir, exist_ok=True)
+        compendium_path = os.path.join(out_dir, 'AST_Compendium.md')
+        with open(compendium_path, 'w', encoding='utf-8') as f:
+            f.write(self.compendium(int(baseline['compendium_bytes'] * scale)))
+
+        team_files = max(1, round(baseline['team_files'] * scale))
+        bytes_per_file = baseline['team_bytes'] // baseline['team_files']
+        team_paths = []
+        for index in range(team_files):
+            path = os.path.join(out_dir, f"{index:04d}_synthetic-team.md")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.team_file(index, bytes_per_file))
+            team_paths.append(path)
+
+        return {
+            'compendium_path': compendium_path,
+            'team_pattern': os.path.join(out_dir, '*team*.md'),
+            'team_files': len(team_paths),
+            'bytes': os.path.getsize(compendium_path) + sum(os.path.getsize(path) for path in team_paths)
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic AST corpus")
+    parser.add_argument('--scale', type=float, default=1.0, help="Size as a multiple of source-files")
+    parser.add_argument('--out', required=True, help="Directory to write the corpus to")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = SyntheticCorpusGenerator(args.seed).write(args.out, args.scale, corpus_baseline())
+    print(f"✅ Wrote {corpus['team_files']} team files and a compendium ({corpus['bytes']:,} bytes) to {args.out}")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Team Section Extraction Engine
+==============================
+
+Tokenizes a team profile section once into a heading/bullet tree and answers
+every metadata extractor (composition, strengths distribution, flow synergies,
+insights, individual profiles) from that tree. Replaces the per-extractor
+regex scans, whose lazy DOTALL lookaheads rescanned the whole section each time.
+
+Body text of a heading runs until the next heading of any level, which is what
+the ``([^#]+?)(?=\\n###|$)`` patterns intended.
+"""
+
+import re
+from typing import List, Dict, Any, Optional
+
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.+?)\s*$')
+DOMINANT_HINT_RE = re.compile(r'dominant', re.IGNORECASE)
+MEMBER_RE = re.compile(r'[*-]\s*\*\*([^*]+)\*\*\s*\(([^)]+)\)\s*[–-]\s*([^\n]+)')
+BOLD_DOMINANT_RE = re.compile(r'\*\*(\w+)\s+Dominant\*\*:\s*([^\n]+)', re.IGNORECASE)
+PLAIN_DOMINANT_RE = re.compile(r'(\w+)\s+Dominant:\s*([^\n]+)', re.IGNORECASE)
+SYNERGY_RE = re.compile(r'[*-]\s*\*\*([^*]+)\*\*:\s*([^\n]+)')
+SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+PROFILE_TITLE_RE = re.compile(r"[A-Z][A-Z\s.'’-]*(?:\([^)]+\))?")
+STRENGTH_LINE_RE = re.compile(r'\d+\.\s+(\w+)\s+\(([^)]+)\)\s*[–-]\s*([^\n]+)')
+NUMBERED_LINE_RE = re.compile(r'\d+\.\s+\S')
+LIST_ITEM_RE = re.compile(r'[*-]\s*([^\n]+)')
+
+INSIGHT_HEADINGS = ('Key Insights', 'Insights')
+
+
+class SectionNode:
+    """A heading and the lines (and bullet lines) of its body."""
+
+    __slots__ = ('level', 'title', 'lines', 'bullets', 'children')
+
+    def __init__(self, level: int, title: str):
+        self.level = level
+        self.title = title
+        self.lines: List[str] = []
+        self.bullets: List[str] = []
+        self.children: List['SectionNode'] = []
+
+    @property
+    def body(self) -> str:
+        return '\n'.join(self.lines).strip()
+
+
+class TeamSectionExtractor:
+    """Single-pass heading/bullet tree over one team section, with extractors answered from it."""
+
+    def __init__(self, section: str):
+        self.root = SectionNode(0, '')
+        self.headings: List[SectionNode] = []
+        self.dominant_lines: List[str] = []
+        self._tokenize(section)
+
+    def _tokenize(self, section: str):
+        stack = [self.root]
+        current = self.root
+
+        for line in section.split('\n'):
+            stripped = line.strip()
+
+            if stripped.startswith('#'):
+                heading = HEADING_RE.match(stripped)
+                if heading:
+                    current = SectionNode(len(heading.group(1)), heading.group(2))
+                    while stack[-1].level >= current.level:
+                        stack.pop()
+                    stack[-1].children.append(current)
+                    stack.append(current)
+                    self.headings.append(current)
+                    continue
+
+            current.lines.append(line)
+            if stripped[:1] in ('*', '-'):
+                current.bullets.append(stripped)
+            if DOMINANT_HINT_RE.search(line):
+                self.dominant_lines.append(line)
+
+    def find(self, title: str, level: Optional[int] = None) -> Optional[SectionNode]:
+        """First heading with exactly this title (and level, if given)."""
+        for node in self.headings:
+            if node.title == title and (level is None or node.level == level):
+                return node
+        return None
+
+    def team_name(self) -> Optional[str]:
+        """Title of the first level-2-or-deeper heading."""
+        for node in self.headings:
+            if node.level >= 2:
+                return node.title
+        return None
+
+    def team_composition(self) -> List[Dict[str, str]]:
+        composition = []
+        for node in [self.root] + self.headings:
+            for bullet in node.bullets:
+                match = MEMBER_RE.search(bullet)
+                if match:
+                    composition.append({
+                        'name': match.group(1).strip(),
+                        'role': match.group(2).strip(),
+                        'background': match.group(3).strip()
+                    })
+        return composition
+
+    def strengths_distribution(self) -> Dict[str, List[str]]:
+        distribution = {}
+        for pattern in (BOLD_DOMINANT_RE, PLAIN_DOMINANT_RE):
+            for line in self.dominant_lines:
+                for match in pattern.finditer(line):
+                    strength = match.group(1).strip().title()
+                    distribution[strength] = [m.strip() for m in match.group(2).split(',')]
+        return distribution
+
+    def flow_synergies(self) -> List[str]:
+        node = self.find('Flow Synergies', level=3)
+        if not node:
+            return []
+
+        synergies = []
+        for bullet in node.bullets:
+            match = SYNERGY_RE.match(bullet)
+            if match:
+                synergies.append(f"{match.group(1).strip()}: {match.group(2).strip()}")
+        return synergies
+
+    def team_insights(self) -> List[str]:
+        insights = []
+        for title in INSIGHT_HEADINGS:
+            node = self.find(title, level=3)
+            if node:
+                sentences = SENTENCE_SPLIT_RE.split(node.body)
+                insights.extend([s.strip() for s in sentences if len(s.strip()) > 20])
+        return insights
+
+    def individual_profiles(self) -> List[Dict[str, Any]]:
+        profiles = []
+        for node in self.headings:
+            if node.level != 3 or not PROFILE_TITLE_RE.fullmatch(node.title):
+                continue
+            profiles.append({
+                'name_role': node.title,
+                'content': node.body,
+                'strengths': self._individual_strengths(node.lines),
+                'flow_indicators': self._flow_indicators(node.lines)
+            })
+        return profiles
+
+    def _labelled_block(self, lines: List[str], label: str) -> List[str]:
+        """Lines following a bold ``**Label:**`` line, up to the next bold label."""
+        block = None
+        for line in lines:
+            stripped = line.strip()
+            if block is None:
+                if stripped == label:
+                    block = []
+                continue
+            if stripped.startswith('**'):
+                break
+            block.append(stripped)
+        return block or []
+
+    def _individual_strengths(self, lines: List[str]) -> Dict[str, Dict[str, str]]:
+        strengths = {}
+        for line in self._labelled_block(lines, '**Strengths Profile:**'):
+            if not line:
+                continue
+            if not NUMBERED_LINE_RE.match(line):
+                break
+            match = STRENGTH_LINE_RE.match(line)
+            if match:
+                strengths[match.group(1)] = {
+                    'percentage': match.group(2),
+                    'description': match.group(3)
+                }
+        return strengths
+
+    def _flow_indicators(self, lines: List[str]) -> List[str]:
+        indicators = []
+        for line in self._labelled_block(lines, '**Flow State Indicators:**'):
+            match = LIST_ITEM_RE.match(line)
+            if match:
+                indicators.append(match.group(1).strip())
+        return indicators
@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+"""
+Vector Store Backends
+=====================
+
+Chooses where the coaching collections live, selected with
+``VECTOR_STORE_BACKEND`` (or ``process_ast_knowledge.py --vector-store``):
+
+- ``http``:       ChromaDB server (``CHROMA_HOST``/``CHROMA_PORT``), the default
+- ``persistent``: embedded ChromaDB ``PersistentClient`` at ``VECTOR_STORE_PATH``
+- ``numpy``:      in-process brute-force cosine index over vectors stored at
+                  ``VECTOR_STORE_PATH``
+
+NumPy collections persist writes append-only: each ``upsert``/``delete`` adds
+a line to ``log.jsonl`` (upserted vectors go to a ``shard-*.npy`` beside it), so
+a write costs I/O proportional to its batch rather than to the collection.
+Loading replays the log over the last snapshot; ``flush()`` (and ``modify()``,
+which ingestion calls when it publishes a new ``ingest_version``) compacts
+them into a new snapshot. ``get_collection`` reloads a collection whose files
+another process has changed.
+
+Every backend returns a client with ``get_or_create_collection``,
+``get_collection`` and ``delete_collection``, and collections support the
+subset of the Chroma collection API the processors and demo use: ``upsert``,
+``delete``, ``get``, ``query`` (with equality ``where`` filters), ``count``,
+``metadata`` and ``modify``.
+
+The NumPy index can keep a scalar-quantized copy of its vectors
+(``VECTOR_STORE_QUANTIZATION``): ``float16`` halves index memory, ``int8``
+(one float32 scale per vector) cuts it to about a quarter and is also the
+faster of the two to score, since NumPy widens float16 without hardware help. Queries score the
+compact copy, then rescore the best ``VECTOR_STORE_RESCORE`` x ``n_results``
+candidates exactly against the float32 vectors, which stay memory-mapped on
+disk so only those rows are read. Run directly to compare memory, recall and
+latency of the formats:
+
+    python3 coaching-data/vector_store.py --vectors 20000 --dimensions 1024
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+from typing import List, Dict, Any, Optional, Callable, Tuple
+import logging
+
+import numpy as np
+
+from embedding_engine import hashing_embedding
+
+logger = logging.getLogger(__name__)
+
+VECTOR_STORE_BACKENDS = ('http', 'persistent', 'numpy')
+DEFAULT_VECTOR_STORE_PATH = "coaching-data/vector_store"
+QUANTIZATIONS = ('float32', 'float16', 'int8')
+# Rows of compact vectors widened to float32 at a time while scoring
+SCORE_BLOCK_ROWS = 1024
+
+
+def quantize(vectors: np.ndarray, quantization: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Compact copy of unit vectors and, for ``int8``, per-vector scales
+    (``vector ~= codes * scale``). ``float32`` returns the vectors unchanged.
+    """
+    if quantization == 'float16':
+        return vectors.astype(np.float16), None
+    if quantization == 'int8':
+        scales = np.abs(vectors).max(axis=1) / 127.0 if len(vectors) else np.zeros(0)
+        scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+        return np.rint(vectors / scales[:, None]).astype(np.int8), scales
+    if quantization == 'float32':
+        return vectors, None
+    raise ValueError(f"Unknown quantization {quantization!r} (expected one of {', '.join(QUANTIZATIONS)})")
+
+
+class NumpyCollection:
+    """
+    One collection of unit-normalized float32 vectors plus documents and
+    metadata. Queries are a single matrix-vector product; distances are cosine
+    distances (1 - similarity). Records without embeddings are embedded with
+    ``embedding_function``, as are ``query_texts``.
+
+    With ``float16`` or ``int8`` quantization the compact vectors are scored
+    first and the top ``rescore_factor * n_results`` candidates are rescored
+    with their float32 vectors, so returned distances are always exact.
+
+    Upserted rows are appended to buffers whose capacity doubles as they fill,
+    so streaming many small batches copies each vector a constant number of
+    times rather than once per batch; the arrays used for scoring are views of them.
+    """
+
+    def __init__(self, directory: str, name: str, metadata: Optional[Dict[str, Any]] = None,
+                 embedding_function: Callable[[str], List[float]] = hashing_embedding,
+                 quantization: Optional[str] = None, rescore_factor: Optional[int] = None):
+        self.name = name
+        self.directory = directory
+        self.embedding_function = embedding_function
+        self.metadata = metadata
+        self.quantization = quantization or os.getenv('VECTOR_STORE_QUANTIZATION', 'float32')
+        if self.quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization {self.quantization!r} (expected one of {', '.join(QUANTIZATIONS)})")
+        self.rescore_factor = max(1, rescore_factor or int(os.getenv('VECTOR_STORE_RESCORE', '4')))
+        self._lock = threading.Lock()
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Optional[Dict[str, Any]]] = []
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._codes, self._scales = quantize(self._vectors, self.quantization)
+        self._positions: Dict[str, int] = {}
+        self._buffers: Dict[str, np.ndarray] = {}
+        self._signature: Optional[Tuple[int, int]] = None
+
+    @property
+    def quantized(self) -> bool:
+        return self.quantization != 'float32'
+
+    @property
+    def _records_path(self) -> str:
+        return os.path.join(self.directory, 'records.json')
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.directory, 'vectors.npy')
+
+    @property
+    def _codes_path(self) -> str:
+        return os.path.join(self.directory, f'vectors.{self.quantization}.npy')
+
+    @property
+    def _scales_path(self) -> str:
+        return os.path.join(self.directory, 'scales.npy')
+
+    @property
+    def _log_path(self) -> str:
+        return os.path.join(self.directory, 'log.jsonl')
+
+    def _disk_signature(self) -> Tuple[int, int]:
+        """(snapshot mtime, log size): changes whenever anyone writes the collection."""
+        try:
+            snapshot = os.stat(self._records_path).st_mtime_ns
+        except FileNotFoundError:
+            snapshot = 0
+        try:
+            log = os.stat(self._log_path).st_size
+        except FileNotFoundError:
+            log = 0
+        return snapshot, log
+
+    def stale(self) -> bool:
+        """True if the files on disk changed since this collection last loaded or wrote them."""
+        return self._disk_signature() != self._signature
+
+    def load(self) -> 'NumpyCollection':
+        with open(self._records_path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        self.metadata = records.get('metadata')
+        self._ids = records['ids']
+        self._documents = records['documents']
+        self._metadatas = records['metadatas']
+        self._positions = {record_id: i for i, record_id in enumerate(self._ids)}
+        # Read-only mapping; the first write copies it into memory
+        self._vectors = np.load(self._vectors_path, mmap_mode='r')
+        if not self.quantized:
+            self._codes, self._scales = self._vectors, None
+        elif records.get('quantization') == self.quantization and os.path.exists(self._codes_path):
+            # Compact vectors are read into memory; float32 rows are only paged in for rescoring
+            self._codes = np.load(self._codes_path)
+            self._scales = np.load(self._scales_path) if self.quantization == 'int8' else None
+        else:
+            self._codes, self._scales = quantize(np.asarray(self._vectors), self.quantization)
+        self._replay_log()
+        self._signature = self._disk_signature()
+        return self
+
+    def _replay_log(self):
+        """Apply the writes logged since the snapshot; a torn last line (crash mid-append) is dropped."""
+        if not os.path.exists(self._log_path):
+            return
+        with open(self._log_path, 'rb+') as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Drop the torn line so later appends start on a fresh one
+                    f.truncate(offset)
+                    break
+                if entry['op'] == 'upsert':
+                    vectors = np.load(os.path.join(self.directory, entry['shard']))
+                    self._apply_upsert(entry['ids'], entry['documents'], entry['metadatas'], vectors)
+                elif entry['op'] == 'delete':
+                    self._apply_delete(entry['ids'])
+
+    def _append_log(self, entry: Dict[str, Any], vectors: Optional[np.ndarray] = None):
+        """Persist one write: its vectors as a new shard, then one log line referencing it."""
+        os.makedirs(self.directory, exist_ok=True)
+        if vectors is not None:
+            entry['shard'] = f"shard-{time.time_ns()}-{os.getpid()}.npy"
+            np.save(os.path.join(self.directory, entry['shard']), vectors)
+        with open(self._log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._signature = self._disk_signature()
+
+    def flush(self):
+        """Compact the snapshot and write log into a new snapshot."""
+        with self._lock:
+            if os.path.exists(self._log_path):
+                self._compact()
+
+    def _compact(self):
+        self._save()
+        # The snapshot now holds every logged write; replaying a leftover log is harmless
+        if os.path.exists(self._log_path):
+            os.remove(self._log_path)
+        for filename in os.listdir(self.directory):
+            if filename.startswith('shard-') and filename.endswith('.npy'):
+                os.remove(os.path.join(self.directory, filename))
+        self._signature = self._disk_signature()
+
+    def _save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        vectors_tmp = self._vectors_path + '.tmp.npy'
+        np.save(vectors_tmp, self._vectors)
+        if self.quantized:
+            codes_tmp = self._codes_path + '.tmp.npy'
+            np.save(codes_tmp, self._codes)
+            if self._scales is not None:
+                scales_tmp = self._scales_path + '.tmp.npy'
+                np.save(scales_tmp, self._scales)
+        records_tmp = self._records_path + '.tmp'
+        with open(records_tmp, 'w', encoding='utf-8') as f:
+            json.dump({
+                'name': self.name,
+                'metadata': self.metadata,
+                'quantization': self.quantization,
+                'ids': self._ids,
+                'documents': self._documents,
+                'metadatas': self._metadatas
+            }, f, ensure_ascii=False)
+        os.replace(vectors_tmp, self._vectors_path)
+        if self.quantized:
+            os.replace(codes_tmp, self._codes_path)
+            if self._scales is not None:
+                os.replace(scales_tmp, self._scales_path)
+            # Release the float32 copy; rescoring reads it back through the mapping
+            self._vectors = np.load(self._vectors_path, mmap_mode='r')
+            self._buffers.pop('vectors', None)
+        os.replace(records_tmp, self._records_path)
+
+    def _normalize(self, vectors: List[List[float]]) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2:
+            raise ValueError(f"Embeddings for {self.name} must be a list of equal-length vectors")
+        if self._vectors.shape[0] and matrix.shape[1] != self._vectors.shape[1]:
+            raise ValueError(f"Collection {self.name} expects embeddings with dimension "
+                             f"{self._vectors.shape[1]}, got {matrix.shape[1]}")
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def memory_bytes(self) -> int:
+        """Bytes of vector data the index keeps in memory for scoring."""
+        return int(self._codes.nbytes + (self._scales.nbytes if self._scales is not None else 0))
+
+    def modify(self, metadata: Optional[Dict[str, Any]] = None):
+        with self._lock:
+            if metadata is not None:
+                self.metadata = metadata
+            self._compact()
+
+    def upsert(self, ids: List[str], documents: Optional[List[str]] = None,
+               metadatas: Optional[List[Dict[str, Any]]] = None,
+               embeddings: Optional[List[List[float]]] = None):
+        documents = documents if documents is not None else [''] * len(ids)
+        metadatas = metadatas if metadatas is not None else [None] * len(ids)
+        if embeddings is None:
+            embeddings = [self.embedding_function(document) for document in documents]
+        if not (len(ids) == len(documents) == len(metadatas) == len(embeddings)):
+            raise ValueError("ids, documents, metadatas and embeddings must have the same length")
+
+        with self._lock:
+            vectors = self._normalize(embeddings)
+            self._apply_upsert(ids, documents, metadatas, vectors)
+            self._append_log({'op': 'upsert', 'ids': ids, 'documents': documents, 'metadatas': metadatas}, vectors)
+
+    def _reserve(self, name: str, array: np.ndarray, extra: int) -> np.ndarray:
+        """
+        Writable buffer whose first rows are ``array`` with room for ``extra``
+        more, reused while ``array`` is a view of it and reallocated at double
+        the size when full (or when ``array`` is a mapping or a fresh copy).
+        """
+        rows = len(array)
+        buffer = self._buffers.get(name)
+        if buffer is None or array.base is not buffer or len(buffer) < rows + extra:
+            buffer = np.empty((max(rows + extra, 2 * rows),) + array.shape[1:], dtype=array.dtype)
+            buffer[:rows] = array
+            self._buffers[name] = buffer
+        return buffer
+
+    def _apply_upsert(self, ids: List[str], documents: List[str], metadatas: List[Optional[Dict[str, Any]]],
+                      vectors: np.ndarray):
+        codes, scales = quantize(vectors, self.quantization)
+        if not self._vectors.shape[0]:
+            self._vectors = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+            self._codes, self._scales = quantize(self._vectors, self.quantization)
+
+        # At most every ID is new, so the buffers have room for all of them
+        vector_buffer = self._reserve('vectors', self._vectors, len(ids))
+        if self.quantized:
+            code_buffer = self._reserve('codes', self._codes, len(ids))
+            scale_buffer = self._reserve('scales', self._scales, len(ids)) if scales is not None else None
+
+        for i, record_id in enumerate(ids):
+            position = self._positions.get(record_id)
+            if position is None:
+                position = self._positions[record_id] = len(self._ids)
+                self._ids.append(record_id)
+                self._documents.append(documents[i])
+                self._metadatas.append(metadatas[i])
+            else:
+                self._documents[position] = documents[i]
+                self._metadatas[position] = metadatas[i]
+            vector_buffer[position] = vectors[i]
+            if self.quantized:
+                code_buffer[position] = codes[i]
+                if scale_buffer is not None:
+                    scale_buffer[position] = scales[i]
+
+        rows = len(self._ids)
+        self._vectors = vector_buffer[:rows]
+        if self.quantized:
+            self._codes = code_buffer[:rows]
+            if scale_buffer is not None:
+                self._scales = scale_buffer[:rows]
+        else:
+            self._codes = self._vectors
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            if self._apply_delete(ids):
+                self._append_log({'op': 'delete', 'ids': ids})
+
+    def _apply_delete(self, ids: List[str]) -> bool:
+        doomed = {self._positions[record_id] for record_id in ids if record_id in self._positions}
+        if not doomed:
+            return False
+        keep = [i for i in range(len(self._ids)) if i not in doomed]
+        self._ids = [self._ids[i] for i in keep]
+        self._documents = [self._documents[i] for i in keep]
+        self._metadatas = [self._metadatas[i] for i in keep]
+        self._vectors = np.array(self._vectors[keep])
+        if self.quantized:
+            self._codes = self._codes[keep]
+            if self._scales is not None:
+                self._scales = self._scales[keep]
+        else:
+            self._codes = self._vectors
+        self._positions = {record_id: i for i, record_id in enumerate(self._ids)}
+        return True
+
+    def _matches(self, where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Positions whose metadata satisfies equality filters (plain or under ``$and``), None for all."""
+        if not where:
+            return None
+        conditions = {}
+        for clause in where.get('$and', [where]):
+            conditions.update(clause)
+        return np.array([
+            i for i, metadata in enumerate(self._metadatas)
+            if all((metadata or {}).get(field) == value for field, value in conditions.items())
+        ], dtype=np.int64)
+
+    def get(self, ids: Optional[List[str]] = None, include: Optional[List[str]] = None) -> Dict[str, List[Any]]:
+        with self._lock:
+            if ids is None:
+                positions = list(range(len(self._ids)))
+            else:
+                positions = [self._positions[record_id] for record_id in ids if record_id in self._positions]
+            return {
+                'ids': [self._ids[i] for i in positions],
+                'documents': [self._documents[i] for i in positions],
+                'metadatas': [self._metadatas[i] for i in positions]
+            }
+
+    def query(self, query_embeddings: Optional[List[List[float]]] = None,
+              query_texts: Optional[List[str]] = None, n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None) -> Dict[str, List[List[Any]]]:
+        if query_embeddings is None:
+            if query_texts is None:
+                raise ValueError("query needs query_embeddings or query_texts")
+            query_embeddings = [self.embedding_function(text) for text in query_texts]
+
+        with self._lock:
+            return self._query(query_embeddings, n_results, self._matches(where))
+
+    def _scores(self, queries: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """Similarities of the queries to the candidates' compact vectors, widened to float32 a block at a time."""
+        codes = self._codes if len(candidates) == len(self._ids) else self._codes[candidates]
+        if not self.quantized:
+            return queries @ np.asarray(codes).T
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK_ROWS):
+            block = codes[start:start + SCORE_BLOCK_ROWS].astype(np.float32)
+            scores[:, start:start + len(block)] = queries @ block.T
+        if self._scales is not None:
+            scores *= self._scales[candidates]
+        return scores
+
+    def _query(self, query_embeddings: List[List[float]], n_results: int,
+               candidates: Optional[np.ndarray]) -> Dict[str, List[List[Any]]]:
+        results = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+        if candidates is None:
+            candidates = np.arange(len(self._ids))
+        if not len(candidates):
+            for key in results:
+                results[key] = [[] for _ in query_embeddings]
+            return results
+
+        queries = self._normalize(query_embeddings)
+        similarities = self._scores(queries, candidates)
+        k = min(n_results, len(candidates))
+        shortlist = min(len(candidates), k * self.rescore_factor) if self.quantized else k
+        for query, row in zip(queries, similarities):
+            top = np.argpartition(-row, shortlist - 1)[:shortlist] if shortlist < len(row) else np.arange(len(row))
+            if self.quantized:
+                # Exact float32 similarities for the shortlist, read from the mapped vectors in row order
+                top = np.sort(top)
+                exact = np.asarray(self._vectors[candidates[top]]) @ query
+                order = np.argsort(-exact, kind='stable')[:k]
+                top, similarity = top[order], exact[order]
+            else:
+                top = top[np.argsort(-row[top], kind='stable')]
+                similarity = row[top]
+            positions = candidates[top]
+            results['ids'].append([self._ids[i] for i in positions])
+            results['documents'].append([self._documents[i] for i in positions])
+            results['metadatas'].append([self._metadatas[i] for i in positions])
+            results['distances'].append([float(1.0 - value) for value in similarity])
+        return results
+
+
+class NumpyVectorStore:
+    """Directory of ``NumpyCollection``s, one subdirectory per collection."""
+
+    def __init__(self, path: str = DEFAULT_VECTOR_STORE_PATH,
+                 embedding_function: Callable[[str], List[float]] = hashing_embedding,
+                 quantization: Optional[str] = None, rescore_factor: Optional[int] = None):
+        self.path = path
+        self.embedding_function = embedding_function
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor
+        self._collections: Dict[str, NumpyCollection] = {}
+        self._lock = threading.Lock()
+
+    def _directory(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def get_collection(self, name: str, **kwargs) -> NumpyCollection:
+        """
+        The named collection, reloaded from disk if another process wrote it
+        since it was loaded (so long-running readers see new ingests).
+        """
+        with self._lock:
+            cached = self._collections.get(name)
+            if cached is None or cached.stale():
+                directory = self._directory(name)
+                if not os.path.exists(os.path.join(directory, 'records.json')):
+                    raise ValueError(f"Collection {name} does not exist")
+                self._collections[name] = NumpyCollection(
+                    directory, name, embedding_function=self.embedding_function,
+                    quantization=self.quantization, rescore_factor=self.rescore_factor
+                ).load()
+            return self._collections[name]
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None,
+                                 **kwargs) -> NumpyCollection:
+        try:
+            return self.get_collection(name)
+        except ValueError:
+            pass
+        with self._lock:
+            collection = NumpyCollection(self._directory(name), name, metadata, self.embedding_function,
+                                         self.quantization, self.rescore_factor)
+            collection._compact()
+            self._collections[name] = collection
+            return collection
+
+    def create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None, **kwargs) -> NumpyCollection:
+        if os.path.exists(os.path.join(self._directory(name), 'records.json')):
+            raise ValueError(f"Collection {name} already exists")
+        return self.get_or_create_collection(name, metadata)
+
+    def delete_collection(self, name: str):
+        with self._lock:
+            self._collections.pop(name, None)
+            directory = self._directory(name)
+            if not os.path.exists(directory):
+                raise ValueError(f"Collection {name} does not exist")
+            for filename in os.listdir(directory):
+                os.remove(os.path.join(directory, filename))
+            os.rmdir(directory)
+
+
+def open_vector_store(backend: Optional[str] = None, path: Optional[str] = None,
+                      quantization: Optional[str] = None):
+    """Client for the configured vector-store backend (``quantization`` applies to ``numpy`` only)."""
+    backend = backend or os.getenv('VECTOR_STORE_BACKEND', 'http')
+    path = path or os.getenv('VECTOR_STORE_PATH', DEFAULT_VECTOR_STORE_PATH)
+
+    if backend == 'numpy':
+        quantization = quantization or os.getenv('VECTOR_STORE_QUANTIZATION', 'float32')
+        logger.info(f"🧮 Using in-process NumPy vector index at {path} ({quantization})")
+        return NumpyVectorStore(path, quantization=quantization)
+
+    import chromadb
+    from chromadb.config import Settings
+
+    if backend == 'persistent':
+        logger.info(f"🗄️ Using embedded ChromaDB at {path}")
+        return chromadb.PersistentClient(path=path, settings=Settings(allow_reset=True))
+    if backend == 'http':
+        return chromadb.HttpClient(
+            host=os.getenv('CHROMA_HOST', 'localhost'),
+            port=int(os.getenv('CHROMA_PORT', '8000')),
+            settings=Settings(allow_reset=True)
+        )
+    raise ValueError(f"Unknown vector store backend {backend!r} (expected one of {', '.join(VECTOR_STORE_BACKENDS)})")
+
+
+def synthetic_embeddings(count: int, dimensions: int, seed: int = 7) -> np.ndarray:
+    """Unit vectors scattered around topic centroids, so neighbours are close as in real embeddings."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((max(1, count // 50), dimensions)).astype(np.float32)
+    vectors = centroids[rng.integers(0, len(centroids), count)] + \
+        0.8 * rng.standard_normal((count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def compare_quantization(args) -> Dict[str, Any]:
+    """Index memory, recall@k against exact float32 search and query latency for each format."""
+    import tempfile
+    import shutil
+
+    vectors = synthetic_embeddings(args.vectors + args.queries, args.dimensions)
+    corpus, queries = vectors[:args.vectors], vectors[args.vectors:]
+    ids = [f"v{i}" for i in range(args.vectors)]
+    exact = np.argsort(-(queries @ corpus.T), axis=1)[:, :args.k]
+    truth = [{ids[i] for i in row} for row in exact]
+
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix='ast-quantization-')
+    try:
+        for quantization in args.formats:
+            directory = os.path.join(work_dir, quantization)
+            writer = NumpyCollection(directory, quantization, quantization=quantization)
+            for start in range(0, args.vectors, 1000):
+                writer.upsert(ids[start:start + 1000], embeddings=corpus[start:start + 1000])
+            factors = [1, args.rescore] if quantization != 'float32' else [1]
+            for factor in factors:
+                # Fresh load, as a query-time process would see the index
+                collection = NumpyCollection(directory, quantization, quantization=quantization,
+                                             rescore_factor=factor).load()
+                found, latencies = [], []
+                for query in queries:
+                    start = time.perf_counter()
+                    matches = collection.query(query_embeddings=[query], n_results=args.k)
+                    latencies.append(time.perf_counter() - start)
+                    found.append(set(matches['ids'][0]))
+                label = quantization if quantization == 'float32' else f"{quantization}/rescore x{factor}"
+                results[label] = {
+                    'index_bytes': collection.memory_bytes(),
+                    f'recall@{args.k}': round(float(np.mean([len(f & t) / args.k for f, t in zip(found, truth)])), 4),
+                    'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 3),
+                    'p95_ms': round(float(np.percentile(latencies, 95)) * 1000, 3)
+                }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline = results.get('float32', {}).get('index_bytes')
+    if baseline:
+        for result in results.values():
+            result['memory_reduction'] = round(baseline / result['index_bytes'], 2)
+    return {
+        'config': {'vectors': args.vectors, 'dimensions': args.dimensions, 'queries': args.queries,
+                   'k': args.k, 'rescore_factor': args.rescore},
+        'formats': results
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare NumPy index memory, recall and latency across vector formats")
+    parser.add_argument('--vectors', type=int, default=20000)
+    parser.add_argument('--dimensions', type=int, default=1024)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--rescore', type=int, default=4, help="Candidates rescored per result")
+    parser.add_argument('--formats', nargs='+', choices=QUANTIZATIONS, default=list(QUANTIZATIONS))
+    parser.add_argument('--output', help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    comparison = compare_quantization(args)
+    print(json.dumps(comparison, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(comparison, f, indent=2)
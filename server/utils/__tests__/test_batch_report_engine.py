@@ -0,0 +1,152 @@
+import asyncio
+import copy
+import json
+import os
+import time
+
+import pytest
+
+from batch_report_engine import BatchReportEngine, TokenBudget, load_exports, report_filename
+from mock_completion_server import start_mock_server
+from report_cache import DirectoryReportStore, ReportCache
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "testy_two_export.json")
+
+
+def test_acquire_reserves_tokens_capped_at_capacity():
+    budget = TokenBudget(6000)
+
+    assert asyncio.run(budget.acquire(1000)) == 1000
+    assert 5000 <= budget.available < 5100
+    assert asyncio.run(TokenBudget(6000).acquire(100000)) == 6000
+
+
+def test_settle_returns_unused_tokens_without_exceeding_capacity():
+    budget = TokenBudget(6000)
+    reserved = asyncio.run(budget.acquire(4000))
+
+    budget.settle(reserved, 1000)
+    assert 5000 <= budget.available < 5100
+    budget.settle(reserved, 0)
+    assert budget.available == budget.capacity
+
+
+def test_failed_request_settled_with_no_usage_restores_the_budget():
+    budget = TokenBudget(6000)
+
+    async def fail_many():
+        for _ in range(10):
+            reserved = await budget.acquire(3000)
+            budget.settle(reserved, 0)
+
+    asyncio.run(fail_many())
+    assert budget.available == budget.capacity
+    assert budget.waited == 0
+
+
+def test_acquire_waits_for_the_budget_to_refill():
+    # 6000 tokens per minute refill at 100 tokens per second
+    budget = TokenBudget(6000)
+
+    async def run():
+        await budget.acquire(6000)
+        started = time.monotonic()
+        await budget.acquire(20)
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(run())
+    assert 0.15 <= elapsed < 1.0
+    assert 0.15 <= budget.waited < 1.0
+
+
+def test_report_filename_is_numbered_and_slugged():
+    assert report_filename(0, "Ana María O'Neil") == "0001-ana-mar-a-o-neil.md"
+    assert report_filename(41, "!!!") == "0042-participant.md"
+
+
+def test_load_exports_reads_files_lists_and_directories(tmp_path):
+    (tmp_path / "one.json").write_text(json.dumps({"name": "one"}))
+    (tmp_path / "many.json").write_text(json.dumps([{"name": "two"}, {"name": "three"}]))
+
+    exports = load_exports([str(tmp_path)])
+    assert [data["name"] for _, data in exports] == ["two", "three", "one"]
+    assert exports[0][0].endswith("many.json[0]")
+
+
+@pytest.fixture
+def mock_server():
+    server, _ = start_mock_server(latency=0.05)
+    yield server
+    server.shutdown()
+
+
+def cohort(size):
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        export = json.load(f)
+    exports = []
+    for i in range(size):
+        data = copy.deepcopy(export)
+        data["userInfo"].update(firstName=f"Testy{i}", userName=f"Testy{i} Two", email=f"testy{i}@example.com")
+        exports.append((f"export-{i}.json", data))
+    return exports
+
+
+def read_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_engine_generates_every_report_within_the_concurrency_cap(tmp_path, mock_server):
+    exports = cohort(8)
+    cache = ReportCache(DirectoryReportStore(str(tmp_path / "cache")), max_age_days=30, max_mb=100)
+    engine = BatchReportEngine(output_dir=str(tmp_path / "reports"), api_key="mock", base_url=mock_server.base_url,
+                               concurrency=3, tokens_per_minute=10_000_000, cache=cache)
+
+    summary = asyncio.run(engine.run(exports))
+
+    assert summary["generated"] == 8 and summary["failed"] == 0
+    assert mock_server.stats()["requests"] == 8
+    assert 1 < mock_server.stats()["peak_in_flight"] <= 3
+    assert sorted(p.name for p in (tmp_path / "reports").glob("*.md")) == \
+        [f"{i + 1:04d}-testy{i}-two.md" for i in range(8)]
+    report = (tmp_path / "reports" / "0001-testy0-two.md").read_text(encoding="utf-8")
+    assert report.startswith("# Testy0 Two's AST Personal Development Report") and "using gpt-4o-mini*" in report
+
+    lines = read_jsonl(tmp_path / "reports" / "reports.jsonl")
+    assert sorted(line["index"] for line in lines) == list(range(8))
+    assert all(line["status"] == "ok" and line["tokens"] > 0 for line in lines)
+    assert engine.budget.available > engine.budget.capacity - 1000
+
+
+def test_second_run_reuses_cached_reports(tmp_path, mock_server):
+    exports = cohort(3)
+    cache = ReportCache(DirectoryReportStore(str(tmp_path / "cache")), max_age_days=30, max_mb=100)
+
+    def run():
+        engine = BatchReportEngine(output_dir=str(tmp_path / "reports"), api_key="mock",
+                                   base_url=mock_server.base_url, concurrency=2, cache=cache)
+        return asyncio.run(engine.run(exports))
+
+    assert run()["generated"] == 3
+    summary = run()
+
+    assert summary["cached"] == 3 and summary["generated"] == 0
+    assert mock_server.stats()["requests"] == 3
+    assert [line["status"] for line in read_jsonl(tmp_path / "reports" / "reports.jsonl")] == ["cached"] * 3
+    assert len(list((tmp_path / "reports").glob("*.md"))) == 3
+
+
+def test_failed_requests_are_recorded_and_release_their_budget(tmp_path):
+    # A server that has gone away: every completion fails to connect
+    server, _ = start_mock_server(latency=0.05)
+    server.shutdown()
+    server.server_close()
+    engine = BatchReportEngine(output_dir=str(tmp_path / "reports"), api_key="mock", base_url=server.base_url,
+                               concurrency=2, tokens_per_minute=60_000, max_retries=0)
+
+    summary = asyncio.run(engine.run(cohort(4)))
+
+    assert summary["failed"] == 4
+    assert all(line["status"] == "failed" and line["error"] for line in read_jsonl(tmp_path / "reports" / "reports.jsonl"))
+    assert not list((tmp_path / "reports").glob("*.md"))
+    assert engine.budget.available == engine.budget.capacity
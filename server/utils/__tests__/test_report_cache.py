@@ -0,0 +1,139 @@
+import time
+
+import pytest
+
+from report_cache import (
+    DirectoryReportStore, ReportCache, SqliteReportStore, cache_key, cache_variant,
+    open_report_cache, participant_id
+)
+
+KEY_ARGS = ('{"name":"Ana"}', "gpt-4o-mini", 0.7, 4000, "1", "prefix")
+REPORT = "# Report\n\n" + "x" * 1000
+
+
+@pytest.fixture(params=["directory", "sqlite"])
+def store(request, tmp_path):
+    store = (DirectoryReportStore(str(tmp_path / "reports")) if request.param == "directory"
+             else SqliteReportStore(str(tmp_path / "reports.sqlite")))
+    yield store
+    store.close()
+
+
+def keys(cache):
+    return sorted(entry["key"] for entry in cache.store.entries())
+
+
+def test_cache_key_changes_with_every_input():
+    key = cache_key(*KEY_ARGS)
+    assert key == cache_key(*KEY_ARGS)
+    for position, value in enumerate(('{"name":"Bo"}', "gpt-4o", 0.2, 2000, "2", "other")):
+        args = list(KEY_ARGS)
+        args[position] = value
+        assert cache_key(*args) != key
+
+
+def test_cache_variant_separates_report_types_and_settings():
+    variant = cache_variant("personal", "default", "gpt-4o-mini", 0.7, 4000)
+    assert len(variant) == 16
+    assert variant != cache_variant("sharable", "default", "gpt-4o-mini", 0.7, 4000)
+    assert variant != cache_variant("personal", "default", "gpt-4o", 0.7, 4000)
+
+
+def test_participant_id_prefers_stable_fields():
+    assert participant_id({"userInfo": {"id": 7, "email": "ana@example.com"}}) == "7"
+    assert participant_id({"userInfo": {"email": "ana@example.com", "userName": "ana"}}) == "ana@example.com"
+    assert participant_id({"userInfo": {"firstName": "Ana", "lastName": "Lee"}}) == "Ana Lee"
+    assert participant_id({}) == ""
+
+
+def test_put_and_get_round_trip(store):
+    cache = ReportCache(store, max_age_days=30, max_mb=100)
+    assert cache.get("missing") is None
+    cache.put("k1", "ana", REPORT, variant="personal", model="gpt-4o-mini")
+
+    entry = cache.get("k1")
+    assert entry["report"] == REPORT and entry["model"] == "gpt-4o-mini"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_new_input_replaces_only_the_same_variant(store):
+    cache = ReportCache(store, max_age_days=30, max_mb=100)
+    cache.put("personal-old", "ana", REPORT, variant="personal")
+    cache.put("sharable", "ana", REPORT, variant="sharable")
+    cache.put("other-participant", "bo", REPORT, variant="personal")
+    cache.put("personal-new", "ana", REPORT, variant="personal")
+
+    assert keys(cache) == ["other-participant", "personal-new", "sharable"]
+
+
+def test_expired_entries_are_dropped(store):
+    cache = ReportCache(store, max_age_days=0.05 / 86400, max_mb=100)
+    cache.put("k1", "ana", REPORT)
+    time.sleep(0.1)
+
+    assert cache.get("k1") is None
+    assert keys(cache) == []
+
+
+def test_least_recently_used_entries_are_evicted_over_the_size_limit(store):
+    cache = ReportCache(store, max_age_days=30, max_mb=2500 / (1024 * 1024))
+    cache.put("a", "ana", REPORT)
+    time.sleep(0.01)
+    cache.put("b", "bo", REPORT)
+    time.sleep(0.01)
+    assert cache.get("a")
+    time.sleep(0.01)
+    cache.put("c", "cy", REPORT)
+
+    assert keys(cache) == ["a", "c"]
+    assert cache.evicted == 1
+
+
+def test_open_report_cache_picks_the_store_from_the_path(tmp_path):
+    assert open_report_cache("off") is None
+    sqlite_cache = open_report_cache(str(tmp_path / "reports.db"))
+    directory_cache = open_report_cache(str(tmp_path / "reports"))
+    assert isinstance(sqlite_cache.store, SqliteReportStore)
+    assert isinstance(directory_cache.store, DirectoryReportStore)
+    sqlite_cache.close()
+    directory_cache.close()
+
+
+def test_directory_store_names_files_by_key(tmp_path):
+    store = DirectoryReportStore(str(tmp_path / "reports"))
+    cache = ReportCache(store, max_age_days=30, max_mb=100)
+    cache.put("k1", "ana", REPORT, variant="personal")
+    cache.put("k2", "ana", REPORT, variant="personal")
+
+    assert sorted(file.name for file in (tmp_path / "reports").glob("*.json")) == ["k2.json"]
+    assert cache.get("k2")["participant"] == "ana"
+    store.delete(["k2"])
+    assert keys(cache) == []
+
+
+def test_directory_store_migrates_scope_prefixed_files(tmp_path):
+    path = tmp_path / "reports"
+    path.mkdir()
+    scope = DirectoryReportStore._scope_hash("ana", "personal")
+    (path / f"{scope}.old.json").write_text('{"participant": "ana", "variant": "personal", "report": "r", "created_at": 1}')
+
+    cache = ReportCache(DirectoryReportStore(str(path)), max_age_days=0, max_mb=100)
+    assert cache.get("old")["report"] == "r"
+    cache.put("new", "ana", REPORT, variant="personal")
+
+    assert keys(cache) == ["new"]
+
+
+def test_put_scans_the_store_only_when_a_limit_may_be_passed(store):
+    cache = ReportCache(store, max_age_days=30, max_mb=2500 / (1024 * 1024))
+    scans = []
+    entries = store.entries
+    store.entries = lambda: scans.append(1) or entries()
+
+    cache.put("a", "ana", REPORT)
+    cache.put("b", "bo", REPORT)
+    assert len(scans) == 1
+
+    cache.put("c", "cy", REPORT)
+    assert len(scans) == 2
+    assert keys(cache) == ["b", "c"]
@@ -0,0 +1,62 @@
+import json
+import os
+
+from example_api_call import (
+    CACHEABLE_PREFIX_TOKENS, ReportRequestBuilder, canonical_json, normalize_context,
+    report_cache_key, transform_export_to_assistant_input
+)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "testy_two_export.json")
+
+
+def assistant_input():
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        return transform_export_to_assistant_input(json.load(f))
+
+
+def test_canonical_json_is_compact_sorted_and_keeps_unicode():
+    assert canonical_json({"b": 1, "a": {"d": [1, 2], "c": "café"}}) == '{"a":{"c":"café","d":[1,2]},"b":1}'
+    assert canonical_json({"x": 1, "y": 2}) == canonical_json({"y": 2, "x": 1})
+
+
+def test_normalize_context_ignores_line_endings_and_trailing_whitespace():
+    assert normalize_context("\n# Title  \r\nBody\t\r\n\n") == "# Title\nBody"
+    assert normalize_context("a\r\nb \n") == normalize_context("a\nb")
+
+
+def test_prefix_is_byte_identical_across_builders_and_participants(tmp_path):
+    context = tmp_path / "context.md"
+    context.write_text("# Compendium  \r\nFlow needs clear goals.\r\n", encoding="utf-8")
+    first = ReportRequestBuilder(context_path=str(context))
+    context.write_text("# Compendium\nFlow needs clear goals.\n", encoding="utf-8")
+    second = ReportRequestBuilder(context_path=str(context))
+    assert first.prefix == second.prefix
+    assert first.prefix_hash == second.prefix_hash
+    assert "## Reference Context" in first.prefix and "## Participant Data Schema" in first.prefix
+
+    data = assistant_input()
+    other = dict(data, participant_name="Someone Else")
+    request, other_request = first.build(data), first.build(other)
+    assert request["messages"][0] == other_request["messages"][0]
+    assert request["messages"][1]["content"] == canonical_json(data)
+    assert request["messages"][1] != other_request["messages"][1]
+
+
+def test_build_reports_prefix_and_payload_token_stats():
+    builder = ReportRequestBuilder(schema_path=None)
+    stats = builder.build(assistant_input())["stats"]
+    assert stats["prompt_tokens"] == stats["prefix_tokens"] + stats["payload_tokens"]
+    assert stats["cacheable"] == (stats["prefix_tokens"] >= CACHEABLE_PREFIX_TOKENS)
+    assert "## Participant Data Schema" not in builder.prefix
+
+
+def test_report_cache_key_follows_payload_prefix_and_settings():
+    data = assistant_input()
+    builder = ReportRequestBuilder()
+    request = builder.build(data)
+    key = report_cache_key(request, "gpt-4o-mini", 0.7, 4000)
+
+    assert key == report_cache_key(ReportRequestBuilder().build(json.loads(json.dumps(data))), "gpt-4o-mini", 0.7, 4000)
+    assert key != report_cache_key(request, "gpt-4o-mini", 0.2, 4000)
+    assert key != report_cache_key(ReportRequestBuilder(context="Extra context").build(data), "gpt-4o-mini", 0.7, 4000)
+    assert key != report_cache_key(builder.build(dict(data, participant_name="Someone Else")), "gpt-4o-mini", 0.7, 4000)
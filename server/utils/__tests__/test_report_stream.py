@@ -0,0 +1,171 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+from openai import AsyncOpenAI, OpenAI
+
+from example_api_call import ReportStream, _replay_cached_report, astream_ast_report, stream_ast_report
+from mock_completion_server import start_mock_server
+from report_cache import DirectoryReportStore, ReportCache
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "testy_two_export.json")
+
+REPORT = "# Your Report\n\nIntro line.\n\n## Strengths\n\nThinking and planning.\n\n### Detail\n\nNested.\n\n## Flow\n\nClear goals."
+
+
+def sections_of(events):
+    return [event for event in events if event["type"] == "section"]
+
+
+def feed_in_pieces(stream, text, size):
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(stream.feed(text[start:start + size]))
+    return events + stream.close()
+
+
+def test_sections_split_on_level_two_headings_across_chunk_boundaries():
+    for size in (1, 3, 7, len(REPORT)):
+        stream = ReportStream(time.time())
+        sections = sections_of(feed_in_pieces(stream, REPORT, size))
+
+        assert [s["title"] for s in sections] == ["Your Report", "Strengths", "Flow"]
+        assert sections[1]["markdown"] == "## Strengths\n\nThinking and planning.\n\n### Detail\n\nNested."
+        assert sections[2]["markdown"] == "## Flow\n\nClear goals."
+        assert stream.report == REPORT
+        assert stream.sections == [{k: v for k, v in s.items() if k != "type"} for s in sections]
+
+
+def test_section_level_controls_which_headings_split():
+    stream = ReportStream(time.time(), section_level=3)
+    sections = sections_of(feed_in_pieces(stream, REPORT, 5))
+    assert [s["title"] for s in sections] == ["Your Report", "Strengths", "Detail", "Flow"]
+
+
+def test_every_feed_emits_a_token_event_and_records_first_token_time():
+    stream = ReportStream(time.time() - 0.05)
+    events = stream.feed("Hello")
+
+    assert events[0]["type"] == "token" and events[0]["text"] == "Hello"
+    assert stream.first_token_ms >= 50
+    assert stream.first_token_ms == events[0]["elapsed_ms"]
+    stream.feed(" world")
+    assert stream.first_token_ms == events[0]["elapsed_ms"]
+
+
+def test_text_before_the_first_heading_is_its_own_untitled_section():
+    stream = ReportStream(time.time())
+    sections = sections_of(feed_in_pieces(stream, "Preamble\n## One\nBody\n", 4))
+    assert [(s["title"], s["markdown"]) for s in sections] == [("", "Preamble"), ("One", "## One\nBody")]
+
+
+def test_empty_stream_has_no_sections():
+    stream = ReportStream(time.time())
+    assert stream.close() == []
+    assert stream.first_token_ms is None
+
+
+def test_cached_report_is_replayed_as_sections_and_done():
+    cached = {"report": REPORT, "timing_ms": {"ai_generation": 12000}}
+    events = _replay_cached_report(cached, time.time(), 5.0, "gpt-4o-mini")
+
+    assert [event["type"] for event in events] == ["section", "section", "section", "done"]
+    assert events[-1]["cached"] is True
+    assert events[-1]["report"].startswith(REPORT)
+    assert "originally generated in 12.0s" in events[-1]["report"]
+
+
+@pytest.fixture
+def mock_server():
+    server, _ = start_mock_server(latency=0.1)
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def export_data():
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class StreamRecorder:
+    """Wraps a client's completions.create to keep the streams it returns."""
+
+    def __init__(self, client):
+        self.streams = []
+        create = client.chat.completions.create
+
+        def record(stream):
+            self.streams.append(stream)
+            return stream
+
+        if isinstance(client, AsyncOpenAI):
+            async def recording_create(**kwargs):
+                return record(await create(**kwargs))
+        else:
+            def recording_create(**kwargs):
+                return record(create(**kwargs))
+        client.chat.completions.create = recording_create
+
+
+def assert_streamed_report(events):
+    kinds = [event["type"] for event in events]
+    assert kinds[0] == "token" and kinds[-1] == "done" and kinds.count("done") == 1
+    sections = [event for event in events if event["type"] == "section"]
+    assert [section["title"] for section in sections] == [
+        "Testy Two's AST Personal Development Report", "Your Strengths Profile", "Flow and Optimization",
+        "Reflections and Future Self", "Next Steps"
+    ]
+
+    done = events[-1]
+    timing = done["timing_ms"]
+    assert done["cached"] is False
+    # The mock sends its first token after a fifth of its latency
+    assert 20 <= timing["first_token"] < timing["ai_generation"]
+    assert timing["sections"] == [section["elapsed_ms"] for section in sections]
+    assert done["report"].startswith("".join(event["text"] for event in events if event["type"] == "token"))
+    assert "*Streamed: first token after " in done["report"]
+    assert "sections completed at " in done["report"] and "sections completed at n/a" not in done["report"]
+
+
+def test_stream_ast_report_against_the_mock_server(tmp_path, mock_server, export_data):
+    client = OpenAI(api_key="mock", base_url=mock_server.base_url)
+    recorder = StreamRecorder(client)
+    cache = ReportCache(DirectoryReportStore(str(tmp_path / "cache")), max_age_days=30, max_mb=100)
+
+    events = list(stream_ast_report(export_data, client=client, cache=cache))
+
+    assert_streamed_report(events)
+    assert recorder.streams[0].response.is_closed
+
+    replayed = list(stream_ast_report(export_data, client=client, cache=cache))
+    assert replayed[-1]["cached"] is True
+    assert [event["type"] for event in replayed].count("section") == 5
+    assert mock_server.stats()["requests"] == 1
+
+
+def test_abandoned_stream_closes_the_response(mock_server, export_data):
+    client = OpenAI(api_key="mock", base_url=mock_server.base_url)
+    recorder = StreamRecorder(client)
+
+    events = stream_ast_report(export_data, client=client)
+    assert next(event for event in events if event["type"] == "section")
+    events.close()
+
+    assert recorder.streams[0].response.is_closed
+
+
+def test_astream_ast_report_against_the_mock_server(mock_server, export_data):
+    async def run():
+        client = AsyncOpenAI(api_key="mock", base_url=mock_server.base_url)
+        recorder = StreamRecorder(client)
+        events = [event async for event in astream_ast_report(export_data, client=client)]
+        await client.close()
+        return events, recorder
+
+    events, recorder = asyncio.run(run())
+
+    assert_streamed_report(events)
+    assert recorder.streams[0].response.is_closed
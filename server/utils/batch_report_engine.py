@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Batch AST report generation for a whole workshop cohort.
+
+generate_ast_report handles one participant per call with its own client and a
+blocking completion, so a cohort of N takes N serial round-trips. The batch
+engine shares one AsyncOpenAI client (and its connection pool) across every
+report and keeps several generations in flight at once:
+
+- at most ``concurrency`` completions run at a time
+- a tokens-per-minute budget holds requests back before they would exceed the
+  account's rate limit (estimated up front, settled with the reported usage)
+- each report is written to disk as soon as it finishes, with a line in
+  ``reports.jsonl`` recording its timing in the format_duration style
+- every request shares one byte-identical prompt prefix (ReportRequestBuilder),
+  so the provider's prompt cache serves it after the first report
+- with a report cache, participants whose export is unchanged get their stored
+  report without an API call (``--bypass-cache`` regenerates them)
+
+    python server/utils/batch_report_engine.py exports/ --output-dir reports/ --concurrency 8
+    python server/utils/batch_report_engine.py exports/ --mock --mock-latency 2.0
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+
+from openai import AsyncOpenAI
+
+from example_api_call import (
+    transform_export_to_assistant_input,
+    ReportRequestBuilder,
+    CACHEABLE_PREFIX_TOKENS,
+    report_cache_key,
+    report_cache_variant,
+    cached_prompt_tokens,
+    add_timing_footer,
+    add_cached_timing_footer,
+    format_duration
+)
+from report_cache import ReportCache, open_report_cache, participant_id
+
+
+class TokenBudget:
+    """
+    Tokens-per-minute bucket: holds up to one minute of tokens and refills continuously
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.available = self.capacity
+        self.rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+        self.waited = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: int) -> int:
+        """
+        Waits until the tokens fit in the budget and reserves them; returns the amount reserved
+        """
+        tokens = min(tokens, int(self.capacity))
+        async with self._lock:
+            self._refill()
+            while self.available < tokens:
+                delay = (tokens - self.available) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+                self._refill()
+            self.available -= tokens
+        return tokens
+
+    def settle(self, reserved: int, used: int):
+        """
+        Corrects a reservation once the real usage is known
+        """
+        self._refill()
+        self.available = min(self.capacity, self.available + reserved - used)
+
+
+def load_exports(paths: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Reads export payloads from JSON files, directories of JSON files, or files holding a list of exports
+    """
+    exports = []
+    for path in map(Path, paths):
+        files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+        for file in files:
+            with open(file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, list):
+                exports.extend((f"{file}[{i}]", item) for i, item in enumerate(data))
+            else:
+                exports.append((str(file), data))
+    return exports
+
+
+def report_filename(index: int, participant_name: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", participant_name.lower()).strip("-") or "participant"
+    return f"{index + 1:04d}-{slug}.md"
+
+
+class BatchReportEngine:
+    """
+    Generates AST reports for many export payloads concurrently through one pooled client
+    """
+
+    def __init__(
+        self,
+        output_dir: str = "ast-reports",
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model: str = "gpt-4o-mini",
+        temperature: float = 0.7,
+        max_tokens: int = 4000,
+        concurrency: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        transform_options: Optional[Dict[str, str]] = None,
+        request_builder: Optional[ReportRequestBuilder] = None,
+        cache: Optional[ReportCache] = None,
+        bypass_cache: bool = False,
+        max_retries: int = 3
+    ):
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable or pass api_key parameter.")
+
+        self.output_dir = Path(output_dir)
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.transform_options = transform_options
+        self.request_builder = request_builder or ReportRequestBuilder(model=model)
+        self.cache = cache
+        self.bypass_cache = bypass_cache
+        self.concurrency = concurrency or int(os.getenv("REPORT_CONCURRENCY", "8"))
+        tokens_per_minute = tokens_per_minute if tokens_per_minute is not None else int(os.getenv("REPORT_TOKENS_PER_MINUTE", "0"))
+        self.budget = TokenBudget(tokens_per_minute) if tokens_per_minute > 0 else None
+
+        # One client for the whole cohort; the SDK retries 429s and 5xx with backoff
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url or os.getenv("OPENAI_BASE_URL"), max_retries=max_retries)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self.tokens_used = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    async def generate(self, index: int, source: str, export_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generates one report and writes it to the output directory
+        """
+        queued_at = time.time()
+        result = {"index": index, "source": source}
+        try:
+            transform_start_time = time.time()
+            assistant_input = transform_export_to_assistant_input(export_data, self.transform_options)
+            transform_duration = (time.time() - transform_start_time) * 1000
+            request = self.request_builder.build(assistant_input)
+            result["participant_name"] = assistant_input["participant_name"]
+            result["request"] = request["stats"]
+            path = self.output_dir / report_filename(index, assistant_input["participant_name"])
+
+            key = report_cache_key(request, self.model, self.temperature, self.max_tokens) if self.cache else None
+            cached = await asyncio.to_thread(self.cache.get, key) if self.cache and not self.bypass_cache else None
+            if cached:
+                total_duration = (time.time() - queued_at) * 1000
+                await asyncio.to_thread(path.write_text,
+                                        add_cached_timing_footer(cached["report"], total_duration, transform_duration,
+                                                                 cached["timing_ms"]["ai_generation"], self.model),
+                                        encoding="utf-8")
+                result.update({
+                    "status": "cached",
+                    "path": str(path),
+                    "timing": {"total": format_duration(total_duration), "transform": format_duration(transform_duration)},
+                    "timing_ms": {"total": round(total_duration, 1), "transform": round(transform_duration, 1)}
+                })
+                return result
+
+            async with self._slots:
+                reserved = 0
+                if self.budget:
+                    reserved = await self.budget.acquire(request["stats"]["prompt_tokens"] + self.max_tokens)
+                queue_duration = (time.time() - queued_at) * 1000 - transform_duration
+
+                api_start_time = time.time()
+                # A failed request consumed no tokens; give its reservation back either way
+                used = 0
+                try:
+                    response = await self.client.chat.completions.create(
+                        model=self.model,
+                        temperature=self.temperature,
+                        max_tokens=self.max_tokens,
+                        messages=request["messages"]
+                    )
+                    used = response.usage.total_tokens if response.usage else reserved
+                finally:
+                    api_duration = (time.time() - api_start_time) * 1000
+                    if self.budget:
+                        self.budget.settle(reserved, used)
+
+                self.tokens_used += used
+                if response.usage:
+                    result["cached_tokens"] = cached_prompt_tokens(response.usage)
+                    self.prompt_tokens += response.usage.prompt_tokens
+                    self.cached_tokens += result["cached_tokens"]
+
+            report = response.choices[0].message.content
+            if not report:
+                raise ValueError("No content returned from OpenAI API")
+
+            total_duration = transform_duration + api_duration
+            if self.cache:
+                await asyncio.to_thread(self.cache.put, key, participant_id(export_data) or result["participant_name"], report,
+                                        variant=report_cache_variant(assistant_input, self.model, self.temperature, self.max_tokens),
+                                        model=self.model, timing_ms={"transform": transform_duration, "ai_generation": api_duration})
+            await asyncio.to_thread(path.write_text,
+                                    add_timing_footer(report, total_duration, transform_duration, api_duration, self.model),
+                                    encoding="utf-8")
+
+            result.update({
+                "status": "ok",
+                "path": str(path),
+                "tokens": used,
+                "timing": {
+                    "total": format_duration(total_duration),
+                    "transform": format_duration(transform_duration),
+                    "ai_generation": format_duration(api_duration),
+                    "queued": format_duration(queue_duration)
+                },
+                "timing_ms": {
+                    "total": round(total_duration, 1),
+                    "transform": round(transform_duration, 1),
+                    "ai_generation": round(api_duration, 1),
+                    "queued": round(queue_duration, 1)
+                }
+            })
+            print(f"Generated report {index + 1} for {result['participant_name']} in {format_duration(total_duration)}")
+
+        except Exception as error:
+            result.update({"status": "failed", "error": str(error)})
+            print(f"Error generating AST report for {source}: {error}")
+
+        return result
+
+    async def run(self, exports: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Generates every report, appending each result to reports.jsonl as it completes
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        start_time = time.time()
+        print(f"Starting batch AST report generation for {len(exports)} participants (concurrency {self.concurrency})")
+
+        tasks = [asyncio.create_task(self.generate(i, source, data)) for i, (source, data) in enumerate(exports)]
+        results = []
+        try:
+            with open(self.output_dir / "reports.jsonl", "w", encoding="utf-8") as manifest:
+                for finished in asyncio.as_completed(tasks):
+                    result = await finished
+                    results.append(result)
+                    manifest.write(json.dumps(result) + "\n")
+                    manifest.flush()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await self.client.close()
+
+        total_duration = (time.time() - start_time) * 1000
+        generated = [r for r in results if r["status"] == "ok"]
+        cached = [r for r in results if r["status"] == "cached"]
+        generation_ms = sum(r["timing_ms"]["ai_generation"] for r in generated)
+        print(f"Generated {len(generated)} and reused {len(cached)} of {len(exports)} reports in {format_duration(total_duration)}")
+
+        return {
+            "reports": len(exports),
+            "succeeded": len(generated) + len(cached),
+            "generated": len(generated),
+            "cached": len(cached),
+            "failed": len(results) - len(generated) - len(cached),
+            "output_dir": str(self.output_dir),
+            "model": self.model,
+            "concurrency": self.concurrency,
+            "tokens_per_minute": int(self.budget.capacity) if self.budget else None,
+            "tokens_used": self.tokens_used,
+            "prompt_prefix": {
+                "hash": self.request_builder.prefix_hash,
+                "tokens": self.request_builder.prefix_tokens,
+                "cacheable": self.request_builder.prefix_tokens >= CACHEABLE_PREFIX_TOKENS
+            },
+            "prompt_cache_hit_rate": round(self.cached_tokens / self.prompt_tokens, 3) if self.prompt_tokens else None,
+            "budget_wait": format_duration(self.budget.waited * 1000) if self.budget else None,
+            "elapsed": format_duration(total_duration),
+            "elapsed_ms": round(total_duration, 1),
+            "serial_generation": format_duration(generation_ms),
+            "reports_per_minute": round((len(generated) + len(cached)) / (total_duration / 60000), 1) if total_duration > 0 else None,
+            "report_cache": self.cache.stats() if self.cache else None,
+            "results": sorted(results, key=lambda r: r["index"])
+        }
+
+
+async def generate_cohort_reports(exports: List[Tuple[str, Dict[str, Any]]], **engine_options) -> Dict[str, Any]:
+    """
+    Convenience wrapper: generate reports for (source, export_data) pairs with one engine
+    """
+    return await BatchReportEngine(**engine_options).run(exports)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate AST reports for a cohort of export payloads")
+    parser.add_argument("inputs", nargs="+", help="Export JSON files, directories of them, or files holding a list of exports")
+    parser.add_argument("--output-dir", default="ast-reports", help="Where reports and reports.jsonl are written")
+    parser.add_argument("--concurrency", type=int, default=None, help="Completions in flight at once (default REPORT_CONCURRENCY or 8)")
+    parser.add_argument("--tokens-per-minute", type=int, default=None,
+                        help="Token budget per minute, 0 for none (default REPORT_TOKENS_PER_MINUTE or 0)")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--temperature", type=float, default=0.7)
+    parser.add_argument("--max-tokens", type=int, default=4000)
+    parser.add_argument("--report-type", choices=["personal", "sharable"], default="personal")
+    parser.add_argument("--imagination-mode", choices=["default", "low"], default="default")
+    parser.add_argument("--context", help="Compendium/context file added to the shared prompt prefix (default REPORT_CONTEXT_PATH)")
+    parser.add_argument("--cache", help="Report cache directory or .sqlite file, 'off' to disable (default REPORT_CACHE or .report-cache)")
+    parser.add_argument("--bypass-cache", action="store_true", help="Regenerate every report and refresh its cached copy")
+    parser.add_argument("--base-url", help="OpenAI-compatible endpoint (default OPENAI_BASE_URL)")
+    parser.add_argument("--mock", action="store_true", help="Run against a local mock completion server")
+    parser.add_argument("--mock-latency", type=float, default=1.0, help="Seconds per mock completion")
+    parser.add_argument("--output", help="Also write the batch summary to this JSON file")
+    args = parser.parse_args()
+
+    exports = load_exports(args.inputs)
+    if not exports:
+        sys.exit("No export payloads found")
+
+    options = {
+        "output_dir": args.output_dir,
+        "base_url": args.base_url,
+        "model": args.model,
+        "temperature": args.temperature,
+        "max_tokens": args.max_tokens,
+        "concurrency": args.concurrency,
+        "tokens_per_minute": args.tokens_per_minute,
+        "transform_options": {"report_type": args.report_type, "imagination_mode": args.imagination_mode},
+        "request_builder": ReportRequestBuilder(context_path=args.context, model=args.model),
+        "cache": open_report_cache(args.cache),
+        "bypass_cache": args.bypass_cache
+    }
+
+    mock_server = None
+    if args.mock:
+        from mock_completion_server import start_mock_server
+        mock_server, _ = start_mock_server(latency=args.mock_latency)
+        options.update(base_url=mock_server.base_url, api_key="mock")
+
+    try:
+        summary = asyncio.run(generate_cohort_reports(exports, **options))
+    finally:
+        if mock_server:
+            mock_server.shutdown()
+        if options["cache"]:
+            options["cache"].close()
+
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
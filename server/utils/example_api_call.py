@@ -6,9 +6,20 @@ This demonstrates how to use the transformation logic in a Python environment.
 
 import json
 import os
+import re
 import sys
-from typing import Dict, List, Optional, Any, Union
-from openai import OpenAI
+import time
+import hashlib
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Union, Iterator, AsyncIterator
+from openai import OpenAI, AsyncOpenAI
+
+from report_cache import ReportCache, cache_key, cache_variant, participant_id
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
 
 # Master prompt for the AST report assistant
 MASTER_PROMPT = """You are an AI assistant specialized in generating personalized AST (AllStarTeams) reports. You will receive a JSON object containing participant data including strengths, flow assessment, reflections, and future self visualization.
@@ -25,6 +36,15 @@ If you encounter a participant with mostly invalid reflections (indicated by ref
 
 Generate the report in markdown format with clear sections and engaging content."""
 
+# JSON Schema of the assistant input, sent in the static prompt prefix
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assistantInputSchema.json")
+
+# Providers only cache prompt prefixes of at least this many tokens
+CACHEABLE_PREFIX_TOKENS = 1024
+
+# Part of every report cache key; bump when report output changes in ways the prompt prefix does not show
+PROMPT_VERSION = "1"
+
 def is_likely_gibberish(text: str) -> bool:
     """
     Detects if text appears to be gibberish based on multiple criteria
@@ -263,16 +283,125 @@ def transform_export_to_assistant_input(
     print("Successfully transformed export data to assistant input")
     return result
 
+def canonical_json(data: Any) -> str:
+    """
+    Compact JSON with sorted keys, so equal data always serializes to the same bytes
+    """
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+def normalize_context(text: str) -> str:
+    """
+    Normalizes line endings and trailing whitespace so re-saved context files keep the same bytes
+    """
+    return "\n".join(line.rstrip() for line in text.replace("\r\n", "\n").split("\n")).strip()
+
+class ReportRequestBuilder:
+    """
+    Builds report requests whose static prefix is byte-identical across calls
+
+    The system message holds everything that is the same for every participant
+    (master prompt, optional compendium context, input schema) and is built once.
+    Participant data follows as compact, key-sorted JSON, so provider-side prompt
+    caching can reuse the prefix for every report in a cohort.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str = MASTER_PROMPT,
+        context: Optional[str] = None,
+        context_path: Optional[str] = None,
+        schema_path: Optional[str] = SCHEMA_PATH,
+        model: str = "gpt-4o-mini"
+    ):
+        context_path = context_path or os.getenv("REPORT_CONTEXT_PATH")
+        if context is None and context_path:
+            with open(context_path, "r", encoding="utf-8") as f:
+                context = f.read()
+
+        parts = [system_prompt.strip()]
+        if context:
+            parts.append("## Reference Context\n\n" + normalize_context(context))
+        if schema_path and os.path.exists(schema_path):
+            with open(schema_path, "r", encoding="utf-8") as f:
+                schema = json.load(f)
+            parts.append("## Participant Data Schema\n\nThe user message is one JSON object matching this schema:\n\n" + canonical_json(schema))
+
+        self.prefix = "\n\n".join(parts)
+        self.prefix_hash = hashlib.sha256(self.prefix.encode("utf-8")).hexdigest()[:16]
+
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("o200k_base")
+        self.token_counter = "tiktoken" if self._encoding else "estimate"
+        self.prefix_tokens = self.count_tokens(self.prefix)
+
+    def count_tokens(self, text: str) -> int:
+        if self._encoding:
+            return len(self._encoding.encode(text))
+        return estimate_tokens(text)
+
+    def build(self, assistant_input: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Returns the chat messages for one report and their prefix/token statistics
+        """
+        payload = canonical_json(assistant_input)
+        payload_tokens = self.count_tokens(payload)
+        return {
+            "messages": [
+                {"role": "system", "content": self.prefix},
+                {"role": "user", "content": payload}
+            ],
+            "stats": {
+                "prefix_hash": self.prefix_hash,
+                "prefix_chars": len(self.prefix),
+                "prefix_tokens": self.prefix_tokens,
+                "payload_chars": len(payload),
+                "payload_tokens": payload_tokens,
+                "prompt_tokens": self.prefix_tokens + payload_tokens,
+                "cacheable": self.prefix_tokens >= CACHEABLE_PREFIX_TOKENS,
+                "token_counter": self.token_counter
+            }
+        }
+
+@lru_cache(maxsize=None)
+def default_request_builder(model: str = "gpt-4o-mini") -> ReportRequestBuilder:
+    """
+    Shared builder, so the prefix is assembled once per process
+    """
+    return ReportRequestBuilder(model=model)
+
+def report_cache_key(request: Dict[str, Any], model: str, temperature: float, max_tokens: int) -> str:
+    """
+    Report cache key for a built request: its participant payload, prompt prefix and generation settings
+    """
+    return cache_key(request["messages"][1]["content"], model, temperature, max_tokens,
+                     PROMPT_VERSION, request["stats"]["prefix_hash"])
+
+def report_cache_variant(assistant_input: Dict[str, Any], model: str, temperature: float, max_tokens: int) -> str:
+    """
+    Report cache variant for a participant's report: its type, imagination mode and generation settings
+    """
+    return cache_variant(assistant_input["report_type"], assistant_input["imagination_mode"], model, temperature, max_tokens)
+
 def generate_ast_report(
     export_data: Dict[str, Any],
     transform_options: Optional[Dict[str, str]] = None,
     api_key: Optional[str] = None,
     model: str = "gpt-4o-mini",
     temperature: float = 0.7,
-    max_tokens: int = 4000
+    max_tokens: int = 4000,
+    request_builder: Optional[ReportRequestBuilder] = None,
+    cache: Optional[ReportCache] = None,
+    bypass_cache: bool = False
 ) -> str:
     """
     Makes an OpenAI API call to generate an AST report with timing information
+
+    With a cache, an unchanged export returns the stored report without an API call;
+    bypass_cache regenerates it and replaces the stored copy.
     """
     import time
 
@@ -285,6 +414,18 @@ def generate_ast_report(
     transform_duration = (time.time() - transform_start_time) * 1000  # Convert to ms
     print(f"Successfully transformed export data to assistant input ({transform_duration:.0f}ms)")
 
+    request = (request_builder or default_request_builder(model)).build(assistant_input)
+    stats = request["stats"]
+    print(f"Prompt: {stats['prefix_tokens']} prefix tokens ({stats['prefix_hash']}) + {stats['payload_tokens']} participant tokens")
+
+    key = report_cache_key(request, model, temperature, max_tokens) if cache else None
+    cached = cache.get(key) if cache and not bypass_cache else None
+    if cached:
+        total_duration = (time.time() - start_time) * 1000
+        print(f"Report cache hit for {assistant_input['participant_name']} ({format_duration(total_duration)})")
+        return add_cached_timing_footer(cached["report"], total_duration, transform_duration,
+                                        cached["timing_ms"]["ai_generation"], model)
+
     # Initialize OpenAI client
     api_key = api_key or os.getenv("OPENAI_API_KEY")
     if not api_key:
@@ -299,16 +440,7 @@ def generate_ast_report(
             model=model,
             temperature=temperature,
             max_tokens=max_tokens,
-            messages=[
-                {
-                    "role": "system",
-                    "content": MASTER_PROMPT
-                },
-                {
-                    "role": "user",
-                    "content": json.dumps(assistant_input, indent=2)
-                }
-            ]
+            messages=request["messages"]
         )
         api_duration = (time.time() - api_start_time) * 1000  # Convert to ms
 
@@ -317,14 +449,17 @@ def generate_ast_report(
         if not report:
             raise ValueError("No content returned from OpenAI API")
 
-        total_duration = (time.time() - start_time) * 1000  # Convert to ms
+        if response.usage:
+            print(f"Prompt cache: {cached_prompt_tokens(response.usage)}/{response.usage.prompt_tokens} prompt tokens cached")
 
-        # Add timing information to the bottom of the report
-        report_with_timing = f"""{report}
+        total_duration = (time.time() - start_time) * 1000  # Convert to ms
 
----
+        if cache:
+            cache.put(key, participant_id(export_data) or assistant_input["participant_name"], report,
+                      variant=report_cache_variant(assistant_input, model, temperature, max_tokens), model=model, timing_ms={"transform": transform_duration, "ai_generation": api_duration})
 
-*Report generated in {format_duration(total_duration)} (Transform: {format_duration(transform_duration)}, AI Generation: {format_duration(api_duration)}) using {model}*"""
+        # Add timing information to the bottom of the report
+        report_with_timing = add_timing_footer(report, total_duration, transform_duration, api_duration, model)
 
         print(f"Successfully generated AST report in {format_duration(total_duration)}")
         return report_with_timing
@@ -333,6 +468,314 @@ def generate_ast_report(
         print(f"Error generating AST report: {error}")
         raise Exception(f"Failed to generate AST report: {error}")
 
+class ReportStream:
+    """
+    Turns streamed completion text into token and section events
+
+    A section is complete when the next heading of level section_level or higher
+    starts (or the stream ends). Times are milliseconds since the API request.
+    """
+
+    def __init__(self, api_start_time: float, section_level: int = 2):
+        self.api_start_time = api_start_time
+        self.heading = re.compile(rf"^#{{1,{section_level}}}\s")
+        self.first_token_ms: Optional[float] = None
+        self.sections: List[Dict[str, Any]] = []
+        self._chunks: List[str] = []
+        self._line = ""
+        self._section_lines: List[str] = []
+
+    @property
+    def report(self) -> str:
+        return "".join(self._chunks)
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Takes the next piece of streamed text; returns the token event and any sections it completed
+        """
+        elapsed = (time.time() - self.api_start_time) * 1000
+        if self.first_token_ms is None:
+            self.first_token_ms = elapsed
+        self._chunks.append(text)
+
+        events = [{"type": "token", "text": text, "elapsed_ms": elapsed}]
+        self._line += text
+        while "\n" in self._line:
+            line, self._line = self._line.split("\n", 1)
+            if self.heading.match(line) and any(l.strip() for l in self._section_lines):
+                events.append(self._close_section(elapsed))
+            self._section_lines.append(line)
+        return events
+
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        Ends the stream, completing the last section
+        """
+        self._section_lines.append(self._line)
+        self._line = ""
+        if not any(l.strip() for l in self._section_lines):
+            return []
+        return [self._close_section((time.time() - self.api_start_time) * 1000)]
+
+    def _close_section(self, elapsed: float) -> Dict[str, Any]:
+        markdown = "\n".join(self._section_lines).strip()
+        self._section_lines = []
+        first_line = markdown.split("\n", 1)[0]
+        section = {
+            "title": first_line.lstrip("#").strip() if self.heading.match(first_line) else "",
+            "markdown": markdown,
+            "elapsed_ms": elapsed
+        }
+        self.sections.append(section)
+        return {"type": "section", **section}
+
+def _prepare_report_request(
+    export_data: Dict[str, Any],
+    transform_options: Optional[Dict[str, str]],
+    model: str,
+    request_builder: Optional[ReportRequestBuilder]
+) -> tuple:
+    """
+    Transforms the export and builds its request; returns (assistant_input, request, transform_ms)
+    """
+    transform_start_time = time.time()
+    assistant_input = transform_export_to_assistant_input(export_data, transform_options)
+    transform_duration = (time.time() - transform_start_time) * 1000
+    request = (request_builder or default_request_builder(model)).build(assistant_input)
+    return assistant_input, request, transform_duration
+
+def _replay_cached_report(cached: Dict[str, Any], start_time: float, transform_duration: float, model: str) -> List[Dict[str, Any]]:
+    """
+    Section and done events for a report served from the report cache
+    """
+    stream = ReportStream(time.time())
+    stream.feed(cached["report"])
+    stream.close()
+    events = [{"type": "section", **section} for section in stream.sections]
+    total_duration = (time.time() - start_time) * 1000
+    events.append({
+        "type": "done",
+        "cached": True,
+        "report": add_cached_timing_footer(cached["report"], total_duration, transform_duration,
+                                           cached["timing_ms"]["ai_generation"], model),
+        "timing_ms": {"total": total_duration, "transform": transform_duration}
+    })
+    return events
+
+def _finish_streamed_report(
+    stream: ReportStream,
+    export_data: Dict[str, Any],
+    assistant_input: Dict[str, Any],
+    start_time: float,
+    transform_duration: float,
+    api_duration: float,
+    model: str,
+    cache: Optional[ReportCache],
+    key: Optional[str],
+    variant: str = ""
+) -> Dict[str, Any]:
+    """
+    The done event: the full report with its timing footer, stored in the cache if there is one
+    """
+    report = stream.report
+    if not report:
+        raise ValueError("No content returned from OpenAI API")
+
+    if cache:
+        cache.put(key, participant_id(export_data) or assistant_input["participant_name"], report,
+                  variant=variant, model=model, timing_ms={"transform": transform_duration, "ai_generation": api_duration})
+
+    total_duration = (time.time() - start_time) * 1000
+    section_times = [section["elapsed_ms"] for section in stream.sections]
+    print(f"Successfully streamed AST report in {format_duration(total_duration)} (first token after {format_duration(stream.first_token_ms)})")
+    return {
+        "type": "done",
+        "cached": False,
+        "report": add_timing_footer(report, total_duration, transform_duration, api_duration, model,
+                                    first_token_ms=stream.first_token_ms, section_ms=section_times),
+        "timing_ms": {
+            "total": total_duration,
+            "transform": transform_duration,
+            "ai_generation": api_duration,
+            "first_token": stream.first_token_ms,
+            "sections": section_times
+        }
+    }
+
+def stream_ast_report(
+    export_data: Dict[str, Any],
+    transform_options: Optional[Dict[str, str]] = None,
+    api_key: Optional[str] = None,
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.7,
+    max_tokens: int = 4000,
+    request_builder: Optional[ReportRequestBuilder] = None,
+    cache: Optional[ReportCache] = None,
+    bypass_cache: bool = False,
+    client: Optional[OpenAI] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Generates an AST report as a stream of events, so it can be shown while it is written:
+
+    - {"type": "token", "text", "elapsed_ms"} for each piece of streamed text
+    - {"type": "section", "title", "markdown", "elapsed_ms"} when a markdown section is complete
+    - {"type": "done", "report", "timing_ms", "cached"} last, with the full report and timing footer
+    """
+    start_time = time.time()
+    print("Starting streamed AST report generation")
+    assistant_input, request, transform_duration = _prepare_report_request(export_data, transform_options, model, request_builder)
+
+    key = report_cache_key(request, model, temperature, max_tokens) if cache else None
+    cached = cache.get(key) if cache and not bypass_cache else None
+    if cached:
+        yield from _replay_cached_report(cached, start_time, transform_duration, model)
+        return
+
+    if client is None:
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable or pass api_key parameter.")
+        client = OpenAI(api_key=api_key)
+
+    try:
+        api_start_time = time.time()
+        response = client.chat.completions.create(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            messages=request["messages"],
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        stream = ReportStream(api_start_time)
+        try:
+            for chunk in response:
+                for choice in chunk.choices:
+                    if choice.delta.content:
+                        yield from stream.feed(choice.delta.content)
+        finally:
+            response.close()
+        yield from stream.close()
+        api_duration = (time.time() - api_start_time) * 1000
+
+        yield _finish_streamed_report(stream, export_data, assistant_input, start_time, transform_duration,
+                                      api_duration, model, cache, key,
+                                      report_cache_variant(assistant_input, model, temperature, max_tokens))
+
+    except Exception as error:
+        print(f"Error generating AST report: {error}")
+        raise Exception(f"Failed to generate AST report: {error}")
+
+async def astream_ast_report(
+    export_data: Dict[str, Any],
+    transform_options: Optional[Dict[str, str]] = None,
+    api_key: Optional[str] = None,
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.7,
+    max_tokens: int = 4000,
+    request_builder: Optional[ReportRequestBuilder] = None,
+    cache: Optional[ReportCache] = None,
+    bypass_cache: bool = False,
+    client: Optional[AsyncOpenAI] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Async iterator version of stream_ast_report, yielding the same events
+    """
+    start_time = time.time()
+    print("Starting streamed AST report generation")
+    assistant_input, request, transform_duration = _prepare_report_request(export_data, transform_options, model, request_builder)
+
+    key = report_cache_key(request, model, temperature, max_tokens) if cache else None
+    cached = cache.get(key) if cache and not bypass_cache else None
+    if cached:
+        for event in _replay_cached_report(cached, start_time, transform_duration, model):
+            yield event
+        return
+
+    if client is None:
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable or pass api_key parameter.")
+        client = AsyncOpenAI(api_key=api_key)
+
+    try:
+        api_start_time = time.time()
+        response = await client.chat.completions.create(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            messages=request["messages"],
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        stream = ReportStream(api_start_time)
+        try:
+            async for chunk in response:
+                for choice in chunk.choices:
+                    if choice.delta.content:
+                        for event in stream.feed(choice.delta.content):
+                            yield event
+        finally:
+            await response.close()
+        for event in stream.close():
+            yield event
+        api_duration = (time.time() - api_start_time) * 1000
+
+        yield _finish_streamed_report(stream, export_data, assistant_input, start_time, transform_duration,
+                                      api_duration, model, cache, key,
+                                      report_cache_variant(assistant_input, model, temperature, max_tokens))
+
+    except Exception as error:
+        print(f"Error generating AST report: {error}")
+        raise Exception(f"Failed to generate AST report: {error}")
+
+def cached_prompt_tokens(usage: Any) -> int:
+    """
+    Prompt tokens the provider served from its prompt cache (0 if not reported)
+    """
+    details = getattr(usage, "prompt_tokens_details", None) if usage else None
+    return getattr(details, "cached_tokens", None) or 0
+
+def add_timing_footer(
+    report: str,
+    total_ms: float,
+    transform_ms: float,
+    api_ms: float,
+    model: str,
+    first_token_ms: Optional[float] = None,
+    section_ms: Optional[List[float]] = None
+) -> str:
+    """
+    Appends the timing footer shown at the bottom of every generated report,
+    plus time to first token and to each section for streamed reports
+    """
+    footer = f"""{report}
+
+---
+
+*Report generated in {format_duration(total_ms)} (Transform: {format_duration(transform_ms)}, AI Generation: {format_duration(api_ms)}) using {model}*"""
+
+    if first_token_ms is not None:
+        sections = ", ".join(format_duration(ms) for ms in section_ms or [])
+        footer += f"\n\n*Streamed: first token after {format_duration(first_token_ms)}, sections completed at {sections or 'n/a'}*"
+    return footer
+
+def add_cached_timing_footer(report: str, total_ms: float, transform_ms: float, generated_ms: float, model: str) -> str:
+    """
+    Timing footer for a report served from the report cache
+    """
+    return f"""{report}
+
+---
+
+*Report served from cache in {format_duration(total_ms)} (Transform: {format_duration(transform_ms)}, originally generated in {format_duration(generated_ms)}) using {model}*"""
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for budgeting (about 4 characters per token)
+    """
+    return max(1, len(text) // 4)
+
 def format_duration(ms: float) -> str:
     """
     Formats duration in milliseconds to a human-readable string
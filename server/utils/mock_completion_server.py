@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Local mock of the OpenAI chat completions endpoint for exercising the report
+generators without an API key or network access.
+
+Each request sleeps for a configurable latency and then answers with a short
+markdown report for the participant named in the request. Like provider-side
+prompt caching, a repeated system prompt of 1024+ tokens is reported as cached
+(in 128-token blocks) in ``usage.prompt_tokens_details``. With ``stream``,
+the report is sent as server-sent events: the first token after a fifth of the
+latency, the rest spread evenly over the remainder. GET /stats returns
+how many requests were served, the peak number handled at once and the share
+of prompt tokens served from the cache.
+
+    python server/utils/mock_completion_server.py --port 8099 --latency 2.0
+    OPENAI_BASE_URL=http://127.0.0.1:8099/v1 python server/utils/batch_report_engine.py exports/
+"""
+
+import json
+import time
+import hashlib
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Tuple
+
+from example_api_call import estimate_tokens, CACHEABLE_PREFIX_TOKENS
+
+
+def mock_report(messages: list) -> str:
+    """
+    Builds a small markdown report for the participant in the last message
+    """
+    name = "Participant"
+    try:
+        name = json.loads(messages[-1]["content"]).get("participant_name", name)
+    except (ValueError, KeyError, IndexError, AttributeError):
+        pass
+
+    return f"""# {name}'s AST Personal Development Report
+
+## Your Strengths Profile
+
+{name} brings a distinctive balance of strengths to their team.
+
+## Flow and Optimization
+
+Protecting focused time keeps {name} in flow more often.
+
+## Reflections and Future Self
+
+{name}'s future self vision ties these strengths to meaningful growth.
+
+## Next Steps
+
+Pick one quarterly action and share it with a teammate."""
+
+
+class MockCompletionHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+        try:
+            latency = max(0.0, server.latency + random.uniform(-server.jitter, server.jitter))
+            messages = body.get("messages", [])
+            report = mock_report(messages)
+            prompt_tokens = sum(estimate_tokens(message.get("content", "")) for message in messages)
+            completion_tokens = estimate_tokens(report)
+            cached_tokens = server.cached_tokens(messages)
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens}
+            }
+            if body.get("stream"):
+                self._stream_report(body, report, usage, latency)
+                return
+
+            time.sleep(latency)
+            self._send_json({
+                "id": f"chatcmpl-mock-{server.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": report},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            })
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+                server.requests += 1
+                server.prompt_tokens += prompt_tokens
+                server.cached_prompt_tokens += cached_tokens
+
+    def _stream_report(self, body: Dict[str, Any], report: str, usage: Dict[str, Any], latency: float):
+        """
+        Sends the report as chat.completion.chunk events, ending with usage (if requested) and [DONE]
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def event(choices: list, **extra):
+            chunk = {"id": "chatcmpl-mock-stream", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": body.get("model", "mock"), "choices": choices, **extra}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        pieces = report.split(" ")
+        time.sleep(latency / 5)
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(latency * 4 / 5 / len(pieces))
+            event([{"index": 0, "delta": {"content": piece if i == 0 else " " + piece}, "finish_reason": None}])
+        event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if body.get("stream_options", {}).get("include_usage"):
+            event([], usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/stats":
+            self.send_error(404)
+            return
+        self._send_json(self.server.stats())
+
+    def _send_json(self, payload: Dict[str, Any]):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockCompletionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 1.0, jitter: float = 0.0):
+        super().__init__(("127.0.0.1", port), MockCompletionHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.seen_prefixes = set()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def cached_tokens(self, messages: list) -> int:
+        """
+        Cached prompt tokens for a request: its system prompt, if an earlier request sent the same bytes
+        """
+        if not messages or messages[0].get("role") != "system":
+            return 0
+        prefix = messages[0].get("content", "")
+        tokens = estimate_tokens(prefix)
+        key = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        with self.lock:
+            seen = key in self.seen_prefixes
+            self.seen_prefixes.add(key)
+        return tokens // 128 * 128 if seen and tokens >= CACHEABLE_PREFIX_TOKENS else 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "peak_in_flight": self.peak_in_flight,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_prompt_tokens": self.cached_prompt_tokens
+            }
+
+
+def start_mock_server(port: int = 0, latency: float = 1.0, jitter: float = 0.0) -> Tuple[MockCompletionServer, threading.Thread]:
+    """
+    Starts the mock server on a background thread; call server.shutdown() when done
+    """
+    server = MockCompletionServer(port, latency, jitter)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock OpenAI chat completions server for report generation tests")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds each completion takes")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- seconds added to the latency")
+    args = parser.parse_args()
+
+    server = MockCompletionServer(args.port, args.latency, args.jitter)
+    print(f"Mock completion server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
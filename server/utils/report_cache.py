@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of generated AST reports.
+
+A report is keyed by a SHA-256 of everything that determines it: the
+canonical participant payload, model, temperature, max_tokens, the prompt
+prefix hash and PROMPT_VERSION. Re-requesting a report for an unchanged export
+returns the stored one instantly; any change to the participant's data gives a
+new key, and storing it drops that participant's older entries for the same
+variant (report type, imagination mode, model and generation settings), so only
+that report is regenerated. A participant's personal and sharable reports, or
+reports from different models, are cached side by side.
+
+Two stores are available, chosen by the REPORT_CACHE path:
+
+- a directory of one JSON file per report (the default, ``.report-cache``)
+- a SQLite database (any path ending in ``.sqlite`` or ``.db``)
+
+Entries older than REPORT_CACHE_MAX_AGE_DAYS are dropped, and the least
+recently used ones are evicted once the cache exceeds REPORT_CACHE_MAX_MB.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+DEFAULT_CACHE_PATH = ".report-cache"
+
+
+def participant_id(export_data: Dict[str, Any]) -> str:
+    """
+    Stable identifier for the participant an export belongs to
+    """
+    user_info = export_data.get("userInfo", {})
+    for field in ("id", "userId", "email", "userName"):
+        if user_info.get(field):
+            return str(user_info[field])
+    return f"{user_info.get('firstName', '')} {user_info.get('lastName', '')}".strip()
+
+
+def cache_key(payload: str, model: str, temperature: float, max_tokens: int, prompt_version: str, prefix_hash: str) -> str:
+    """
+    Key for a report request; payload is the canonical participant JSON sent to the model
+    """
+    header = json.dumps([model, temperature, max_tokens, prompt_version, prefix_hash])
+    return hashlib.sha256(f"{header}\n{payload}".encode("utf-8")).hexdigest()
+
+
+def cache_variant(report_type: str, imagination_mode: str, model: str, temperature: float, max_tokens: int) -> str:
+    """
+    Which of a participant's reports an entry is; a newer input replaces only entries of the same variant
+    """
+    header = json.dumps([report_type, imagination_mode, model, temperature, max_tokens])
+    return hashlib.sha256(header.encode("utf-8")).hexdigest()[:16]
+
+
+class DirectoryReportStore:
+    """
+    One JSON file per report, named <key>.json, so lookups open a known path;
+    a file's modification time is its creation time and its access time its last use.
+    scopes/<participant and variant hash> holds the key currently stored for that scope
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.scopes = self.path / "scopes"
+        self.scopes.mkdir(parents=True, exist_ok=True)
+        self._migrate()
+
+    @staticmethod
+    def _scope_hash(participant: str, variant: str) -> str:
+        return hashlib.sha256(f"{participant}\n{variant}".encode("utf-8")).hexdigest()[:16]
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{key}.json"
+
+    def _migrate(self):
+        """
+        Renames files from the earlier <scope>.<key>.json layout and records their scopes
+        """
+        for file in self.path.glob("*.*.json"):
+            key = file.name.split(".")[1]
+            try:
+                with open(file, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                stat = file.stat()
+                os.replace(file, self._file(key))
+                os.utime(self._file(key), (stat.st_atime, stat.st_mtime))
+            except (FileNotFoundError, ValueError):
+                continue
+            if entry.get("participant"):
+                (self.scopes / self._scope_hash(entry["participant"], entry.get("variant", ""))).write_text(key)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        file = self._file(key)
+        try:
+            with open(file, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(file, (time.time(), file.stat().st_mtime))
+            return entry
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, key: str, entry: Dict[str, Any]) -> int:
+        temp = self.path / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        size = temp.stat().st_size
+        os.utime(temp, (time.time(), entry["created_at"]))
+        os.replace(temp, self._file(key))
+        if entry.get("participant"):
+            (self.scopes / self._scope_hash(entry["participant"], entry.get("variant", ""))).write_text(key)
+        return size
+
+    def delete_participant(self, participant: str, variant: str, keep: str):
+        try:
+            stored = (self.scopes / self._scope_hash(participant, variant)).read_text()
+        except FileNotFoundError:
+            return
+        if stored != keep:
+            self._file(stored).unlink(missing_ok=True)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        Key, size, creation and last-use time of every entry
+        """
+        entries = []
+        for file in self.path.glob("*.json"):
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            entries.append({
+                "key": file.stem,
+                "size": stat.st_size,
+                "created_at": stat.st_mtime,
+                "accessed_at": stat.st_atime
+            })
+        return entries
+
+    def delete(self, keys: List[str]):
+        for key in keys:
+            self._file(key).unlink(missing_ok=True)
+
+    def close(self):
+        pass
+
+
+class SqliteReportStore:
+    """
+    Reports in one SQLite table with their participant, variant, size and timestamps
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS reports (
+                key TEXT PRIMARY KEY,
+                participant TEXT NOT NULL,
+                variant TEXT NOT NULL DEFAULT '',
+                entry TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(reports)")]
+        if "variant" not in columns:
+            self._conn.execute("ALTER TABLE reports ADD COLUMN variant TEXT NOT NULL DEFAULT ''")
+        self._conn.execute("DROP INDEX IF EXISTS reports_participant")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS reports_variant ON reports (participant, variant)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT entry FROM reports WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE reports SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, entry: Dict[str, Any]) -> int:
+        data = json.dumps(entry)
+        size = len(data.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reports (key, participant, variant, entry, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, entry.get("participant", ""), entry.get("variant", ""), data, size, entry["created_at"], time.time())
+            )
+            self._conn.commit()
+        return size
+
+    def delete_participant(self, participant: str, variant: str, keep: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM reports WHERE participant = ? AND variant = ? AND key != ?",
+                               (participant, variant, keep))
+            self._conn.commit()
+
+    def entries(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, size, created_at, accessed_at FROM reports").fetchall()
+        return [dict(zip(("key", "size", "created_at", "accessed_at"), row)) for row in rows]
+
+    def delete(self, keys: List[str]):
+        with self._lock:
+            self._conn.executemany("DELETE FROM reports WHERE key = ?", [(key,) for key in keys])
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ReportCache:
+    """
+    Report lookups and stores over a pluggable store, with age and size eviction
+    """
+
+    def __init__(self, store, max_age_days: Optional[float] = None, max_mb: Optional[float] = None):
+        self.store = store
+        self.max_age = (max_age_days if max_age_days is not None else float(os.getenv("REPORT_CACHE_MAX_AGE_DAYS", "30"))) * 86400
+        self.max_bytes = (max_mb if max_mb is not None else float(os.getenv("REPORT_CACHE_MAX_MB", "100"))) * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        # Size and oldest creation time as of the last eviction pass plus later puts;
+        # None until the first pass, which puts runs to learn the store's contents
+        self._bytes: Optional[int] = None
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.store.get(key)
+        if entry and self.max_age and time.time() - entry["created_at"] > self.max_age:
+            self.store.delete([key])
+            entry = None
+        if entry:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def put(self, key: str, participant: str, report: str, variant: str = "", **metadata):
+        """
+        Stores a report, replacing the participant's entries of the same variant for earlier inputs,
+        and evicts once the size or age limit may have been passed
+        """
+        if participant:
+            self.store.delete_participant(participant, variant, keep=key)
+        created_at = time.time()
+        size = self.store.put(key, {"participant": participant, "variant": variant, "report": report,
+                                    "created_at": created_at, **metadata})
+        with self._lock:
+            if self._bytes is not None:
+                # Replaced entries are not subtracted, so the total only overestimates
+                self._bytes += size
+                self._oldest = created_at if self._oldest is None else min(self._oldest, created_at)
+            over_size = self._bytes is None or (self.max_bytes and self._bytes > self.max_bytes)
+            over_age = self.max_age and self._oldest is not None and created_at - self._oldest > self.max_age
+        if over_size or over_age:
+            self.evict()
+
+    def evict(self):
+        """
+        Drops entries past the maximum age, then least recently used ones until under the size limit
+        """
+        now = time.time()
+        removed, kept = [], []
+        for entry in self.store.entries():
+            expired = self.max_age and now - entry["created_at"] > self.max_age
+            (removed if expired else kept).append(entry)
+
+        kept.sort(key=lambda e: e["accessed_at"])
+        total = sum(e["size"] for e in kept)
+        while kept and self.max_bytes and total > self.max_bytes:
+            entry = kept.pop(0)
+            total -= entry["size"]
+            removed.append(entry)
+
+        removed = [e["key"] for e in removed]
+        if removed:
+            self.store.delete(removed)
+        with self._lock:
+            self.evicted += len(removed)
+            self._bytes = total
+            self._oldest = min((e["created_at"] for e in kept), default=None)
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self.store.entries()
+        return {
+            "store": type(self.store).__name__,
+            "entries": len(entries),
+            "bytes": sum(e["size"] for e in entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted
+        }
+
+    def close(self):
+        self.store.close()
+
+
+def open_report_cache(path: Optional[str] = None) -> Optional[ReportCache]:
+    """
+    Opens the cache at path or REPORT_CACHE ('off' disables caching)
+    """
+    path = path or os.getenv("REPORT_CACHE", DEFAULT_CACHE_PATH)
+    if path.lower() in ("", "off", "none"):
+        return None
+    if path.endswith((".sqlite", ".db")):
+        return ReportCache(SqliteReportStore(path))
+    return ReportCache(DirectoryReportStore(path))